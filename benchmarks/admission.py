@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+
+from benchmarks.pipelining import free_port
+from benchmarks.utils import run
+from server.main import build_server
+from server.src.admission import AdmissionControl
+from server.src.metrics import Metrics
+from server.src.models import ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.actions import ActionTypes, BroadcastMessageActionFrame, BroadcastMessagePayload
+
+LINES = 100_000
+MODES = (
+    ('unlimited', {'SERVER_RATE_LIMIT': 0}),
+    ('rate limited', {}),
+    ('muted', {}),
+)
+
+
+async def flood(name: str, options: dict) -> tuple[int, float]:
+    """Returns how many lines reached the handler and the server's CPU time per line."""
+    port = free_port()
+    server = build_server(ServerSettings(SERVER_HOST='127.0.0.1', SERVER_PORT=port, **options))
+    await server.start()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while not ClientManager.get_current().all():
+        await asyncio.sleep(0.01)
+    client = next(iter(ClientManager.get_current().all()))
+    if name == 'muted':
+        # reports only count from distinct connections
+        reporters = [await asyncio.open_connection('127.0.0.1', port) for _ in range(2)]
+        while len(ClientManager.get_current().all()) < 3:
+            await asyncio.sleep(0.01)
+        admission = AdmissionControl.get_current()
+        for reporter in list(ClientManager.get_current().all())[1:]:
+            admission.report(client, reporter)
+
+    handled = Metrics.get_current().handler_latency.get(ActionTypes.BROADCAST_MESSAGE)
+    handled_before = handled.count if handled is not None else 0
+    payload = BroadcastMessagePayload(text='spam' * 16)
+    data = (BroadcastMessageActionFrame(payload=payload).model_dump_json().encode() + b'\n') * LINES
+    started_at = time.process_time()
+    writer.write(data)
+    # the flooder never reads, so its own copies of the broadcasts pile up and get dropped server side
+    while client.transport_stats.frames_in < LINES:
+        await asyncio.sleep(0.01)
+    elapsed = time.process_time() - started_at
+
+    handled = Metrics.get_current().handler_latency.get(ActionTypes.BROADCAST_MESSAGE)
+    writer.transport.abort()
+    if name == 'muted':
+        for _, reporter_writer in reporters:
+            reporter_writer.transport.abort()
+    while ClientManager.get_current().all():
+        await asyncio.sleep(0.01)
+    await server.stop()
+    return (handled.count if handled is not None else 0) - handled_before, elapsed / LINES
+
+
+async def main() -> None:
+    logging.disable(logging.CRITICAL)
+    results = [(name, await flood(name, options)) for name, options in MODES]
+    print(f'one client writes {LINES:,} broadcast lines as fast as it can')
+    print(f"{'admission':>12} | {'handled':>8} | {'server CPU, us/line':>19}")
+    for name, (handled, seconds) in results:
+        print(f'{name:>12} | {handled:>8,} | {seconds * 1e6:>19.2f}')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,51 @@
+import asyncio
+import random
+import time
+
+from benchmarks.utils import FakeStreamWriter, depopulate, populate, run
+from server.src.models import ClientManager
+from server.src.utils import UserIdAllocator
+
+POPULATION = 300_000
+CHURN_OPERATIONS = 1_000_000
+MANAGER_POPULATION = 50_000
+MANAGER_CHURN_OPERATIONS = 100_000
+
+
+def allocator_churn() -> None:
+    allocator = UserIdAllocator()
+    started_at = time.perf_counter()
+    user_ids = [allocator.acquire() for _ in range(POPULATION)]
+    elapsed = time.perf_counter() - started_at
+    print(f'acquire x{POPULATION}: {POPULATION / elapsed:,.0f} ops/s')
+
+    rng = random.Random(0)
+    started_at = time.perf_counter()
+    for _ in range(CHURN_OPERATIONS // 2):
+        position = rng.randrange(POPULATION)
+        allocator.release(user_ids[position])
+        user_ids[position] = allocator.acquire()
+    elapsed = time.perf_counter() - started_at
+    print(f'release+acquire churn x{CHURN_OPERATIONS}: {CHURN_OPERATIONS / elapsed:,.0f} ops/s')
+    assert len(set(user_ids)) == POPULATION == len(allocator)
+
+
+async def manager_churn() -> None:
+    manager = ClientManager.get_current()
+    clients = populate(manager, MANAGER_POPULATION)
+    rng = random.Random(0)
+    started_at = time.perf_counter()
+    for _ in range(MANAGER_CHURN_OPERATIONS // 2):
+        position = rng.randrange(MANAGER_POPULATION)
+        await manager.drop(clients[position])
+        clients[position] = manager.create(asyncio.StreamReader(), FakeStreamWriter())
+        clients[position].start()
+    elapsed = time.perf_counter() - started_at
+    print(f'ClientManager drop+create churn x{MANAGER_CHURN_OPERATIONS}: '
+          f'{MANAGER_CHURN_OPERATIONS / elapsed:,.0f} ops/s')
+    await depopulate(manager)
+
+
+if __name__ == '__main__':
+    allocator_churn()
+    run(manager_churn())
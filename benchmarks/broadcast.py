@@ -0,0 +1,72 @@
+import asyncio
+import datetime as dt
+import logging
+import time
+
+from benchmarks.utils import FakeStreamWriter, depopulate, measure, populate, run
+from server.src.handlers import BroadcastMessageHandler
+from server.src.models import Client, ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.actions import BroadcastMessagePayload
+from shared.schemas.notifications import BroadcastMessageNotificationFrame, BroadcastMessageNotificationPayload
+
+ROOM_SIZES = (10, 100, 1_000, 10_000)
+REPEAT = 20
+TEXT = 'Not all those who wander are lost.' * 4
+BURST = 100
+BURST_RECIPIENTS = 1_000
+COALESCING = ((1, 0), (64, 0), (64, 200))
+
+
+async def per_recipient_serialization(clients: list[Client]) -> None:
+    payload = BroadcastMessageNotificationPayload(
+        text=TEXT,
+        sender=clients[0].user.id,
+        created_at=dt.datetime.now(dt.UTC),
+    )
+    frame = BroadcastMessageNotificationFrame(payload=payload)
+    await asyncio.gather(*(client.send(frame) for client in clients))
+
+
+async def burst(manager: ClientManager, logger: logging.Logger, batch_size: int, window_us: int) -> tuple[float, int]:
+    settings = ServerSettings(
+        SERVER_HOST='127.0.0.1',
+        SERVER_PORT=0,
+        SERVER_WRITE_BATCH_SIZE=batch_size,
+        SERVER_WRITE_COALESCE_US=window_us,
+    )
+    manager.configure(settings)
+    writers: list[FakeStreamWriter] = []
+    clients = populate(manager, BURST_RECIPIENTS, writers)
+    handler = BroadcastMessageHandler(BroadcastMessagePayload(text=TEXT), clients[0], logger)
+    started_at = time.perf_counter()
+    for _ in range(BURST):
+        await handler.handle()
+    while sum(client.transport_stats.frames_out for client in clients) < BURST * BURST_RECIPIENTS:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started_at
+    await depopulate(manager)
+    return elapsed, sum(writer.writes for writer in writers)
+
+
+async def main() -> None:
+    manager = ClientManager.get_current()
+    logger = logging.getLogger('benchmark')
+    print(f"{'recipients':>10} | {'per-recipient dump, us':>22} | {'encoded once, us':>16}")
+    for size in ROOM_SIZES:
+        clients = populate(manager, size)
+        handler = BroadcastMessageHandler(BroadcastMessagePayload(text=TEXT), clients[0], logger)
+        legacy = await measure(lambda: per_recipient_serialization(clients), REPEAT)
+        current = await measure(handler.handle, REPEAT)
+        print(f'{size:>10} | {legacy / size * 1e6:>22.2f} | {current / size * 1e6:>16.2f}')
+        await depopulate(manager)
+
+    print(f'\nburst of {BURST} broadcasts to {BURST_RECIPIENTS:,} recipients')
+    print(f"{'batch':>5} | {'window, us':>10} | {'writes':>7} | {'frames/s':>10}")
+    for batch_size, window_us in COALESCING:
+        elapsed, writes = await burst(manager, logger, batch_size, window_us)
+        print(f'{batch_size:>5} | {window_us:>10} | {writes:>7,} | {BURST * BURST_RECIPIENTS / elapsed:>10,.0f}')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.cluster import free_port, wait_for_server
+from benchmarks.transfer import peak_rss
+from benchmarks.utils import run
+from shared.transport import HANDSHAKE_MAGIC, TransportFlags
+
+CONNECTIONS = 100_000
+# one loopback source address runs out of ephemeral ports at ~28k connections to the same port
+CONNECTIONS_PER_ADDRESS = 20_000
+CONCURRENCY = 500
+SETTLE_TIME = 3.0
+
+
+class IdleProtocol(asyncio.Protocol):
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        transport.write(HANDSHAKE_MAGIC + bytes((TransportFlags.LENGTH_FRAMING,)))
+
+
+def raise_file_limit() -> int:
+    """Lifts the soft limit of open files to the hard one, returns how many connections a process can hold."""
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard - 100
+
+
+async def connect(port: int, count: int) -> list[asyncio.Transport]:
+    loop = asyncio.get_running_loop()
+    transports = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def open_one(index: int) -> None:
+        local_address = f'127.0.0.{index // CONNECTIONS_PER_ADDRESS + 1}'
+        async with semaphore:
+            transport, _ = await loop.create_connection(IdleProtocol, '127.0.0.1', port, local_addr=(local_address, 0))
+        transports.append(transport)
+
+    await asyncio.gather(*(open_one(index) for index in range(count)))
+    return transports
+
+
+async def main() -> None:
+    # the server inherits the lifted limit, both sides hold one descriptor per connection
+    connections = min(CONNECTIONS, raise_file_limit())
+    port = free_port()
+    env = os.environ | {
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_PORT': str(port),
+        'SERVER_HEARTBEAT_INTERVAL': '3600',
+        'SERVER_IDLE_TIMEOUT': '3600',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'server.main'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_server(port)
+        await asyncio.sleep(SETTLE_TIME)
+        rss_before, _ = peak_rss(server.pid)
+        started_at = time.perf_counter()
+        transports = await connect(port, connections)
+        elapsed = time.perf_counter() - started_at
+        await asyncio.sleep(SETTLE_TIME)
+        rss_after, rss_peak = peak_rss(server.pid)
+        for transport in transports:
+            transport.abort()
+    finally:
+        server.terminate()
+        server.wait()
+
+    if connections < CONNECTIONS:
+        print(f'open files are limited, {connections:,} of {CONNECTIONS:,} connections opened')
+    print(f'{connections:,} idle connections opened in {elapsed:.1f} s')
+    print(f'server RSS: {rss_before / 2 ** 20:.0f} MiB empty, {rss_after / 2 ** 20:.0f} MiB loaded, '
+          f'{rss_peak / 2 ** 20:.0f} MiB peak')
+    per_connection = (rss_after - rss_before) / connections
+    print(f'{per_connection / 1024:.2f} KiB per connection, '
+          f'{CONNECTIONS * per_connection / 2 ** 30:.2f} GiB for {CONNECTIONS:,} connections')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,47 @@
+import logging
+import random
+import timeit
+
+from benchmarks.utils import depopulate, measure, populate, run
+from server.src.handlers import BroadcastMessageHandler, ChannelMessageHandler
+from server.src.models import ClientManager
+from shared.schemas.actions import BroadcastMessagePayload, ChannelMessagePayload
+from shared.schemas.types import ChannelName
+
+POPULATION = 100_000
+CHANNELS = 10_000
+CHANNEL_SIZES = (10, 100, 1_000, 10_000)
+REPEAT = 20
+TEXT = 'Not all those who wander are lost.' * 4
+
+
+async def main() -> None:
+    manager = ClientManager.get_current()
+    logger = logging.getLogger('benchmark')
+    clients = populate(manager, POPULATION)
+    channels = [ChannelName(f'channel-{index}') for index in range(CHANNELS)]
+    memberships = [(client, random.choice(channels)) for client in clients]
+
+    joined = timeit.timeit(lambda: [manager.join(client, channel) for client, channel in memberships], number=1)
+    left = timeit.timeit(lambda: [manager.leave(client, channel) for client, channel in memberships], number=1)
+    print(f'{POPULATION:,} users in {CHANNELS:,} channels')
+    print(f'join {joined / POPULATION * 1e9:,.0f} ns, leave {left / POPULATION * 1e9:,.0f} ns per membership change')
+    for client, channel in memberships:
+        manager.join(client, channel)
+
+    broadcast = BroadcastMessageHandler(BroadcastMessagePayload(text=TEXT), clients[0], logger)
+    everyone = await measure(broadcast.handle, REPEAT)
+    print(f"\n{'members':>7} | {'channel message, us':>19} | {'broadcast to everyone, us':>25}")
+    for size in CHANNEL_SIZES:
+        channel = ChannelName(f'sweep-{size}')
+        for client in clients[:size]:
+            manager.join(client, channel)
+        handler = ChannelMessageHandler(ChannelMessagePayload(text=TEXT, channel=channel), clients[0], logger)
+        targeted = await measure(handler.handle, REPEAT)
+        print(f'{size:>7} | {targeted * 1e6:>19,.0f} | {everyone * 1e6:>25,.0f}')
+
+    await depopulate(manager)
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from multiprocessing.connection import Connection
+
+from benchmarks.utils import run
+from shared.schemas.actions import HelpActionFrame
+from shared.transport import DataTransport
+
+WORKERS = (1, 2, 4)
+CLIENT_PROCESSES = max(os.cpu_count() or 1, 2)
+CONNECTIONS_PER_PROCESS = 16
+DURATION = 3.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+        else:
+            writer.close()
+            await writer.wait_closed()
+            return
+
+
+async def load(port: int, deadline: float) -> int:
+    data = DataTransport.encode(HelpActionFrame().model_dump_json())
+
+    async def connection() -> int:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        transport = DataTransport(writer, reader)
+        completed = 0
+        while time.time() < deadline:
+            await transport.transfer_encoded(data)
+            await transport.receive()
+            completed += 1
+        await transport.close()
+        return completed
+
+    return sum(await asyncio.gather(*(connection() for _ in range(CONNECTIONS_PER_PROCESS))))
+
+
+def client_process(port: int, deadline: float, results: Connection) -> None:
+    results.send(asyncio.run(load(port, deadline)))
+
+
+async def measure(workers: int) -> float:
+    port = free_port()
+    env = os.environ | {
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_PORT': str(port),
+        'SERVER_WORKERS': str(workers),
+        'SERVER_RATE_LIMIT': '0',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'server.main'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_server(port)
+        await asyncio.sleep(0.5)
+        context = multiprocessing.get_context('spawn')
+        deadline = time.time() + DURATION
+        pipes = [context.Pipe(duplex=False) for _ in range(CLIENT_PROCESSES)]
+        clients = [context.Process(target=client_process, args=(port, deadline, sender)) for _, sender in pipes]
+        for client in clients:
+            client.start()
+        completed = sum([await asyncio.to_thread(receiver.recv) for receiver, _ in pipes])
+        for client in clients:
+            client.join()
+        return completed / DURATION
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main() -> None:
+    print(f'{os.cpu_count()} cores, {CLIENT_PROCESSES}x{CONNECTIONS_PER_PROCESS} connections, {DURATION:.0f} s each')
+    print(f"{'workers':>7} | {'requests/s':>10} | {'speedup':>7}")
+    baseline = None
+    for workers in WORKERS:
+        throughput = await measure(workers)
+        baseline = baseline or throughput
+        print(f'{workers:>7} | {throughput:>10,.0f} | {throughput / baseline:>6.2f}x')
+
+
+if __name__ == '__main__':
+    run(main())
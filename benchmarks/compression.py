@@ -0,0 +1,92 @@
+import asyncio
+import datetime as dt
+import random
+import time
+
+from benchmarks.utils import FakeStreamWriter, run
+from server.src.models import Client
+from shared.schemas.notifications import BroadcastMessageNotificationFrame, BroadcastMessageNotificationPayload
+from shared.schemas.types import UserId
+from shared.transport import DataTransport, HANDSHAKE_MAGIC, shared_frames, TransportFlags
+
+RECIPIENTS = 1_000
+ROUNDS = 20
+HISTORY_SIZE = 100
+TEXT_SIZES = (64, 512, 4 * 1024)
+WORDS = (
+    'the', 'ring', 'shire', 'hobbit', 'mountain', 'road', 'goes', 'ever', 'on', 'and', 'down', 'from', 'door',
+    'where', 'it', 'began', 'now', 'far', 'ahead', 'has', 'gone', 'I', 'must', 'follow', 'if', 'can', 'pursuing',
+    'with', 'eager', 'feet', 'until', 'joins', 'some', 'larger', 'way', 'many', 'paths', 'errands', 'meet',
+)
+MODES = (
+    ('off', TransportFlags.LENGTH_FRAMING, False),
+    ('stream', TransportFlags.LENGTH_FRAMING | TransportFlags.COMPRESSION, False),
+    ('shared', TransportFlags.LENGTH_FRAMING | TransportFlags.COMPRESSION, True),
+)
+
+
+def build_frame(size: int, rng: random.Random) -> bytes:
+    text = ' '.join(rng.choice(WORDS) for _ in range(size // 4))[:size]
+    payload = BroadcastMessageNotificationPayload(
+        text=text,
+        sender=UserId(f'user-{rng.randrange(RECIPIENTS)}'),
+        created_at=dt.datetime.now(dt.UTC),
+    )
+    return Client.encode(BroadcastMessageNotificationFrame(payload=payload))
+
+
+async def accepted(flags: int) -> tuple[DataTransport, FakeStreamWriter]:
+    reader, writer = asyncio.StreamReader(), FakeStreamWriter()
+    reader.feed_data(HANDSHAKE_MAGIC + bytes((flags,)))
+    transport = DataTransport(writer=writer, reader=reader)
+    await transport.accept(timeout=1.0, supported_flags=flags)
+    writer.bytes_written = 0
+    return transport, writer
+
+
+async def broadcast(flags: int, share: bool, frames: list[bytes]) -> tuple[float, float]:
+    """Returns wire bytes and CPU microseconds per delivered frame."""
+    recipients = [await accepted(flags) for _ in range(RECIPIENTS)]
+    started_at = time.process_time()
+    for data in frames:
+        if share:
+            shared_frames.share(data)
+        for transport, _ in recipients:
+            await transport.transfer_encoded(data)
+    elapsed = time.process_time() - started_at
+    delivered = len(frames) * RECIPIENTS
+    return sum(writer.bytes_written for _, writer in recipients) / delivered, elapsed / delivered * 1e6
+
+
+async def replay(flags: int, frames: list[bytes]) -> tuple[float, float]:
+    """A history page sent to one newcomer, the way the history handler does it."""
+    transport, writer = await accepted(flags)
+    started_at = time.process_time()
+    for _ in range(ROUNDS):
+        await transport.transfer_encoded_many(frames)
+    elapsed = time.process_time() - started_at
+    return writer.bytes_written / len(frames) / ROUNDS, elapsed / len(frames) / ROUNDS * 1e6
+
+
+async def main() -> None:
+    rng = random.Random(42)
+    print(f'broadcast to {RECIPIENTS:,} connections, wire bytes and CPU per delivered frame')
+    print(f"{'text':>6} | {'raw':>6} | {'mode':>6} | {'bytes':>7} | {'saved':>6} | {'us/frame':>8}")
+    for size in TEXT_SIZES:
+        frames = [build_frame(size, rng) for _ in range(ROUNDS)]
+        raw = sum(map(len, frames)) / len(frames)
+        for name, flags, share in MODES:
+            wire, cpu = await broadcast(flags, share, frames)
+            print(f'{size:>6} | {raw:>6.0f} | {name:>6} | {wire:>7.1f} | {1 - wire / raw:>6.1%} | {cpu:>8.2f}')
+
+    print(f'\nhistory replay of {HISTORY_SIZE} mixed messages to one connection')
+    print(f"{'mode':>6} | {'bytes':>7} | {'saved':>6} | {'us/frame':>8}")
+    frames = [build_frame(rng.choice(TEXT_SIZES), rng) for _ in range(HISTORY_SIZE)]
+    raw = sum(map(len, frames)) / len(frames)
+    for name, flags, share in MODES[:2]:
+        wire, cpu = await replay(flags, frames)
+        print(f'{name:>6} | {wire:>7.1f} | {1 - wire / raw:>6.1%} | {cpu:>8.2f}')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+import tracemalloc
+import uuid
+from typing import override
+
+from benchmarks.utils import FakeStreamWriter, run
+from server.src.handlers import BaseHandler
+from server.src.models import Client, ClientManager
+from server.src.server import Server
+from server.src.settings import ServerSettings
+from shared.schemas.actions import ActionTypes, HelpActionFrame
+
+REQUESTS = 100_000
+TRACED_REQUESTS = 1_000
+
+
+class NoopHandler(BaseHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        pass
+
+
+async def legacy_dispatch(frame: HelpActionFrame, client: Client, server_logger: logging.Logger) -> None:
+    logger = logging.LoggerAdapter(server_logger, extra={"request_id": str(uuid.uuid4())})
+    handler = NoopHandler(frame.payload, client, logger)
+    logger.info(f"Handling request '{handler.__class__.__name__}' from '{handler.client.user.id}'...")
+    await handler.handle()
+    logger.info(f"Request '{handler.__class__.__name__}' from '{handler.client.user.id}' handled successfully")
+
+
+async def profile(dispatch) -> tuple[float, int, int]:
+    """Returns seconds, peak allocated bytes and bytes left allocated per request."""
+    started_at = time.perf_counter()
+    for _ in range(REQUESTS):
+        await dispatch()
+    elapsed = time.perf_counter() - started_at
+
+    # timed apart from the traced run, tracemalloc slows every allocation down
+    tracemalloc.start()
+    peak = 0
+    retained_before = tracemalloc.get_traced_memory()[0]
+    for _ in range(TRACED_REQUESTS):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await dispatch()
+        peak += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - retained_before
+    tracemalloc.stop()
+    return elapsed / REQUESTS, peak // TRACED_REQUESTS, retained // TRACED_REQUESTS
+
+
+async def main() -> None:
+    settings = ServerSettings(SERVER_HOST='127.0.0.1', SERVER_PORT=0)
+    server = Server(settings).on_action(ActionTypes.HELP, NoopHandler)
+    server_logger = logging.getLogger('server')
+    server_logger.setLevel(logging.WARNING)
+    client = ClientManager.get_current().create(asyncio.StreamReader(), FakeStreamWriter())
+    frame = HelpActionFrame()
+
+    legacy = await profile(lambda: legacy_dispatch(frame, client, server_logger))
+    current = await profile(lambda: server._handle_client_request(frame, client))
+    print(f'{REQUESTS:,} requests, INFO logging disabled')
+    print(f"{'dispatch':>8} | {'us/request':>10} | {'peak bytes/request':>18} | {'retained bytes/request':>22}")
+    for name, (seconds, peak, retained) in (('legacy', legacy), ('current', current)):
+        print(f'{name:>8} | {seconds * 1e6:>10.2f} | {peak:>18} | {retained:>22}')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import time
+
+from benchmarks.utils import run
+from shared.transport import DataTransport, Framing
+
+PAYLOAD_SIZES = (64, 4 * 1024, 256 * 1024)
+TOTAL_BYTES = 64 * 1024 * 1024
+MAX_FRAMES = 200_000
+LIMIT = 2 * max(PAYLOAD_SIZES)
+
+
+async def connect(framing: Framing) -> tuple[DataTransport, DataTransport]:
+    accepted: asyncio.Future[DataTransport] = asyncio.get_running_loop().create_future()
+    listener = await asyncio.start_server(
+        lambda reader, writer: accepted.set_result(DataTransport(writer, reader)),
+        '127.0.0.1', 0, limit=LIMIT,
+    )
+    port = listener.sockets[0].getsockname()[1]
+    client_reader, client_writer = await asyncio.open_connection('127.0.0.1', port, limit=LIMIT)
+    client = DataTransport(client_writer, client_reader)
+    server = await accepted
+    listener.close()
+    if framing is Framing.LENGTH:
+        await asyncio.gather(server.accept(timeout=1.0), client.negotiate(framing))
+    return server, client
+
+
+async def measure(framing: Framing, size: int) -> float:
+    sender, receiver = await connect(framing)
+    data = DataTransport.encode(json.dumps({'type': 'broadcast-message', 'payload': {'text': 'x' * size}}))
+    frames = min(MAX_FRAMES, TOTAL_BYTES // size)
+
+    async def produce() -> None:
+        for _ in range(frames):
+            await sender.transfer_encoded(data)
+
+    async def consume() -> None:
+        for _ in range(frames):
+            await receiver.receive()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(produce(), consume())
+    elapsed = time.perf_counter() - started_at
+    await sender.close()
+    await receiver.close()
+    return frames / elapsed
+
+
+async def main() -> None:
+    print(f"{'payload':>8} | {'line, frames/s':>14} | {'length, frames/s':>16}")
+    for size in PAYLOAD_SIZES:
+        line = await measure(Framing.LINE, size)
+        length = await measure(Framing.LENGTH, size)
+        print(f'{size:>8} | {line:>14,.0f} | {length:>16,.0f}')
+
+
+if __name__ == '__main__':
+    run(main())
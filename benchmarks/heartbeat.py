@@ -0,0 +1,61 @@
+import asyncio
+import gc
+import logging
+import time
+import tracemalloc
+
+from benchmarks.utils import measure, populate, run
+from server.src.handlers import BroadcastMessageHandler
+from server.src.models import ClientManager
+from server.src.services import IdleSweeper
+from shared.schemas.actions import BroadcastMessagePayload
+
+CLIENTS = 100_000
+INTERVAL = 15.0
+TIMEOUT = 45.0
+REPEAT = 5
+
+
+async def scenario(trace: bool) -> tuple[float, float, float, int, int, int]:
+    """Half of the clients go silent, returns broadcast and sweep times and traced memory around the sweep."""
+    manager = ClientManager.get_current()
+    if trace:
+        tracemalloc.start()
+    populate(manager, CLIENTS // 2)
+    # everyone connected before this moment has been silent for the whole timeout when the sweep runs
+    boundary = time.monotonic()
+    live = populate(manager, CLIENTS - CLIENTS // 2)
+    await asyncio.sleep(0)
+    handler = BroadcastMessageHandler(BroadcastMessagePayload(text='ping'), live[0], logging.getLogger('benchmark'))
+    sweeper = IdleSweeper(INTERVAL, TIMEOUT)
+
+    before = await measure(handler.handle, REPEAT)
+    memory_before = tracemalloc.get_traced_memory()[0] if trace else 0
+    started_at = time.perf_counter()
+    dropped = await sweeper.sweep(boundary + TIMEOUT)
+    sweep = time.perf_counter() - started_at
+    await asyncio.sleep(0)
+    gc.collect()
+    memory_after = tracemalloc.get_traced_memory()[0] if trace else 0
+    after = await measure(handler.handle, REPEAT)
+
+    for client in live:
+        await manager.drop(client)
+    if trace:
+        tracemalloc.stop()
+    return before, after, sweep, dropped, memory_before, memory_after
+
+
+async def main() -> None:
+    logging.disable(logging.CRITICAL)
+    before, after, sweep, dropped, _, _ = await scenario(trace=False)
+    *_, memory_before, memory_after = await scenario(trace=True)
+    print(f'{CLIENTS:,} clients, {dropped:,} of them silent past the {TIMEOUT:.0f} s timeout')
+    print(f'one sweep, pinging the live half and dropping the rest: {sweep * 1e3:.0f} ms')
+    print(f"{'':>14} | {'broadcast, ms':>13} | {'traced memory, MiB':>18}")
+    print(f"{'before sweep':>14} | {before * 1e3:>13.1f} | {memory_before / 2 ** 20:>18.1f}")
+    print(f"{'after sweep':>14} | {after * 1e3:>13.1f} | {memory_after / 2 ** 20:>18.1f}")
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,84 @@
+import asyncio
+import datetime as dt
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import run
+from server.src.models import Client, HistoryStore, private_channel
+from server.src.models.history import GENERAL_CHANNEL
+from server.src.models.journal import Journal
+from server.src.settings import ServerSettings
+from shared.schemas.notifications import BroadcastMessageNotificationFrame, BroadcastMessageNotificationPayload
+from shared.schemas.types import UserId
+
+MESSAGES = 10_000_000
+USERS = 1_000
+CHUNK = 10_000
+
+
+def build_settings(directory: Path) -> ServerSettings:
+    # retention is raised so that every record written below is still there to be scanned
+    return ServerSettings(
+        SERVER_HOST='127.0.0.1',
+        SERVER_PORT=0,
+        SERVER_JOURNAL_DIR=directory,
+        SERVER_JOURNAL_SEGMENTS=1_000,
+    )
+
+
+async def fill(settings: ServerSettings) -> tuple[float, float]:
+    """Returns seconds spent in `append_frame` on the loop and seconds until everything is on disk."""
+    journal = Journal().configure(settings)
+    await journal.start()
+    payload = BroadcastMessageNotificationPayload(
+        text='x' * 64,
+        sender=UserId('Gandalf'),
+        created_at=dt.datetime.now(dt.UTC),
+    )
+    data = Client.encode(BroadcastMessageNotificationFrame(payload=payload))
+    sender = private_channel(UserId('Gandalf'))
+    directs = [(private_channel(UserId(f'user-{index}')), sender) for index in range(USERS)]
+
+    started_at = time.perf_counter()
+    appending = 0.0
+    for offset in range(0, MESSAGES, CHUNK):
+        chunk_started_at = time.perf_counter()
+        for seq in range(offset + 1, offset + CHUNK + 1):
+            channels = directs[seq % USERS] if seq % 10 == 0 else (GENERAL_CHANNEL,)
+            journal.append_frame(seq, channels, data)
+        appending += time.perf_counter() - chunk_started_at
+        # gives the writer thread the interpreter, a real loop would be waiting on sockets here
+        await asyncio.sleep(0.005)
+    await journal.stop()
+    return appending, time.perf_counter() - started_at
+
+
+async def replay(settings: ServerSettings) -> tuple[float, int]:
+    history = HistoryStore().configure(settings)
+    journal = Journal().configure(settings)
+    started_at = time.perf_counter()
+    await journal.start()
+    elapsed = time.perf_counter() - started_at
+    await journal.stop()
+    channels = [GENERAL_CHANNEL, private_channel(UserId('Gandalf'))]
+    channels.extend(private_channel(UserId(f'user-{index}')) for index in range(USERS))
+    return elapsed, sum(len(list(history.last(channel, history.capacity))) for channel in channels)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        settings = build_settings(Path(directory))
+        appending, writing = await fill(settings)
+        size = sum(path.stat().st_size for path in Path(directory).iterdir())
+        elapsed, restored = await replay(settings)
+
+    print(f'{MESSAGES:,} messages, {size / 2 ** 20:,.0f} MiB in {size // settings.journal_segment_size + 1} segments')
+    print(f'append on the loop: {appending / MESSAGES * 1e9:,.0f} ns/message')
+    print(f'written and fsynced: {MESSAGES / writing:,.0f} messages/s')
+    print(f'replay: {elapsed:.2f} s, {MESSAGES / elapsed:,.0f} records/s scanned')
+    print(f'restored {restored:,} messages into {USERS + 2:,} channels')
+
+
+if __name__ == '__main__':
+    run(main())
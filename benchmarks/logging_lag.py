@@ -0,0 +1,82 @@
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.pipelining import free_port
+from benchmarks.utils import run
+from server.main import build_server
+from server.src.settings import ServerSettings
+from shared.schemas.actions import HelpActionFrame
+from shared.transport import DataTransport
+
+CONNECTIONS = 16
+DURATION = 3.0
+TICK = 0.001
+WRITE_LATENCY = 0.0002
+MODES = (
+    ('sync', {}),
+    ('queue', {'SERVER_LOG_MODE': 'queue'}),
+    ('queue + 1% sampling', {'SERVER_LOG_MODE': 'queue', 'SERVER_LOG_SAMPLING': {'server': 0.01}}),
+)
+
+
+class SlowStream:
+    """Stands in for a terminal or a pipe whose reader falls behind."""
+
+    def write(self, data: str) -> int:
+        time.sleep(WRITE_LATENCY)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+async def monitor_lag(lags: list[float], deadline: float) -> None:
+    while time.monotonic() < deadline:
+        started_at = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started_at - TICK)
+
+
+async def load(port: int, deadline: float) -> int:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    transport = DataTransport(writer, reader)
+    data = DataTransport.encode(HelpActionFrame().model_dump_json())
+    completed = 0
+    while time.monotonic() < deadline:
+        await transport.transfer_encoded(data)
+        await transport.receive()
+        completed += 1
+    await transport.close()
+    return completed
+
+
+async def measure(options: dict) -> tuple[float, float, float]:
+    port = free_port()
+    server = build_server(ServerSettings(SERVER_HOST='127.0.0.1', SERVER_PORT=port, SERVER_RATE_LIMIT=0, **options))
+    await server.start()
+    lags: list[float] = []
+    deadline = time.monotonic() + DURATION
+    _, *completed = await asyncio.gather(
+        monitor_lag(lags, deadline),
+        *(load(port, deadline) for _ in range(CONNECTIONS)),
+    )
+    await asyncio.sleep(0.01)
+    await server.stop()
+    percentiles = statistics.quantiles(lags, n=100)
+    return percentiles[49], percentiles[98], sum(completed) / DURATION
+
+
+async def main() -> None:
+    stderr, sys.stderr = sys.stderr, SlowStream()
+    results = [(name, await measure(options)) for name, options in MODES]
+    sys.stderr = stderr
+    print(f'{CONNECTIONS} connections, {WRITE_LATENCY * 1e6:.0f} us per log write, {DURATION:.0f} s each')
+    print(f"{'logging':>19} | {'lag p50, ms':>11} | {'lag p99, ms':>11} | {'requests/s':>10}")
+    for name, (p50, p99, throughput) in results:
+        print(f'{name:>19} | {p50 * 1e3:>11.2f} | {p99 * 1e3:>11.2f} | {throughput:>10,.0f}')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,32 @@
+import logging
+import timeit
+
+from benchmarks.utils import depopulate, populate, run
+from server.src.models import Client, ClientManager
+from shared.schemas.types import UserId
+
+POPULATIONS = (100, 1_000, 10_000, 50_000, 100_000)
+LOOKUPS = 1_000
+
+logger = logging.getLogger('benchmark')
+
+
+def linear_get(clients: list[Client], user_id: UserId) -> Client | None:
+    return next(filter(lambda client: client.user.id == user_id, clients), None)
+
+
+async def main() -> None:
+    manager = ClientManager.get_current()
+    print(f"{'population':>10} | {'linear scan, us':>15} | {'index, us':>9}")
+    for size in POPULATIONS:
+        clients = populate(manager, size)
+        targets = [clients[index * size // LOOKUPS].user.id for index in range(LOOKUPS)]
+        sampled = targets[::max(1, size // 1_000)]
+        linear = timeit.timeit(lambda: [linear_get(clients, target) for target in sampled], number=1)
+        indexed = timeit.timeit(lambda: [manager.get(target) for target in targets], number=1)
+        print(f'{size:>10} | {linear / len(sampled) * 1e6:>15.2f} | {indexed / LOOKUPS * 1e6:>9.3f}')
+        await depopulate(manager)
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,73 @@
+import datetime as dt
+import time
+import tracemalloc
+
+from benchmarks.utils import FakeStreamWriter, populate, run
+from server.src.models import Client, ClientManager
+from server.src.models.mailbox import Mailbox
+from server.src.settings import ServerSettings
+from shared.schemas.notifications import PrivateMessageNotificationFrame, PrivateMessageNotificationPayload
+from shared.schemas.types import UserId
+
+USERS = 10_000
+MESSAGES_PER_USER = 100
+
+
+def build_frames(user_id: UserId) -> list[bytes]:
+    payload = PrivateMessageNotificationPayload(
+        text='see you at the prancing pony tonight',
+        sender=UserId('Gandalf'),
+        to=user_id,
+        created_at=dt.datetime.now(dt.UTC),
+    )
+    template = Client.encode(PrivateMessageNotificationFrame(payload=payload))
+    # every message is a bytes object of its own, as it would be if it came off the wire
+    return [template.replace(b'tonight', b'tonight %d' % index) for index in range(MESSAGES_PER_USER)]
+
+
+async def main() -> None:
+    manager = ClientManager.get_current()
+    writers: list[FakeStreamWriter] = []
+    clients = populate(manager, USERS, writers)
+    mailbox = Mailbox().configure(ServerSettings(
+        SERVER_HOST='127.0.0.1',
+        SERVER_PORT=0,
+        SERVER_MAILBOX_SIZE=1024 * 1024,
+        SERVER_MAILBOX_TOTAL_SIZE=4 * 1024 ** 3,
+    ))
+    frames = {client.user.id: build_frames(client.user.id) for client in clients}
+    messages = USERS * MESSAGES_PER_USER
+
+    def deposit() -> float:
+        started_at = time.perf_counter()
+        for user_id, user_frames in frames.items():
+            for data in user_frames:
+                mailbox.deposit(user_id, data)
+        return time.perf_counter() - started_at
+
+    tracemalloc.start()
+    deposit()
+    overhead = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    payload = mailbox.size
+    for client in clients:
+        await mailbox.flush(client)
+    # timed apart from the traced run, tracemalloc slows every allocation down
+    depositing = deposit()
+
+    for writer in writers:
+        writer.writes = writer.bytes_written = 0
+    started_at = time.perf_counter()
+    for client in clients:
+        await mailbox.flush(client)
+    flushing = time.perf_counter() - started_at
+    writes = sum(writer.writes for writer in writers)
+
+    print(f'{messages:,} messages kept for {USERS:,} offline users')
+    print(f'payload: {payload / messages:.0f} bytes/message, bookkeeping: {overhead / messages:.1f} bytes/message')
+    print(f'deposit: {depositing / messages * 1e9:,.0f} ns/message')
+    print(f'flush: {messages / flushing:,.0f} messages/s, {writes / USERS:.0f} write per reconnecting user')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,29 @@
+import random
+import timeit
+
+from benchmarks.utils import depopulate, populate, run
+from server.src.metrics import Histogram, Metrics
+from server.src.models import ClientManager
+
+OBSERVATIONS = 1_000_000
+POPULATIONS = (1_000, 10_000, 100_000)
+
+
+async def main() -> None:
+    histogram = Histogram()
+    values = [random.expovariate(1_000) for _ in range(OBSERVATIONS)]
+    observe = timeit.timeit(lambda: [histogram.observe(value) for value in values], number=1)
+    print(f'histogram observe: {observe / OBSERVATIONS * 1e9:.0f} ns')
+
+    manager = ClientManager.get_current()
+    metrics = Metrics.get_current()
+    print(f"\n{'clients':>7} | {'render, ms':>10}")
+    for size in POPULATIONS:
+        populate(manager, size)
+        elapsed = timeit.timeit(metrics.render, number=1)
+        print(f'{size:>7} | {elapsed * 1e3:>10.2f}')
+        await depopulate(manager)
+
+
+if __name__ == '__main__':
+    run(main())
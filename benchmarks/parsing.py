@@ -0,0 +1,58 @@
+import datetime as dt
+import json
+import timeit
+from typing import Callable
+
+from pydantic import BaseModel
+
+from shared.schemas.actions import ActionFrame, BroadcastMessagePayload, action_frame_adapter
+from shared.schemas.notifications import BroadcastMessageNotificationPayload, NotificationFrame, \
+    notification_frame_adapter
+
+NUMBER = 100_000
+REPEAT = 5
+
+ACTION = json.dumps({'type': 'broadcast-message', 'payload': {'text': 'One ring to rule them all'}}).encode()
+NOTIFICATION = json.dumps({
+    'type': 'broadcast-message',
+    'payload': {
+        'text': 'One ring to rule them all',
+        'sender': 'Frodo',
+        'created_at': dt.datetime.now(dt.UTC).isoformat(),
+    },
+    'seq': 1,
+}).encode()
+
+
+def two_pass(data: bytes, frame_type: type[BaseModel], payload_type: type[BaseModel]) -> BaseModel:
+    frame = frame_type.model_validate_json(data)
+    return payload_type.model_validate(frame.payload)
+
+
+def measure(parse: Callable[[], BaseModel]) -> float:
+    # the best of several runs, a busy machine only ever adds time
+    return min(timeit.repeat(parse, number=NUMBER, repeat=REPEAT))
+
+
+def report(name: str, legacy: float, first_pass: float, current: float) -> None:
+    print(
+        f'{name:<13} | {legacy / NUMBER * 1e6:>14.2f} | {first_pass / NUMBER * 1e6:>16.2f} '
+        f'| {current / NUMBER * 1e6:>15.2f} | {legacy / current:>5.2f}x | {legacy / first_pass:>5.2f}x'
+    )
+
+
+def main() -> None:
+    # one pass can't beat the first pass of the legacy parse alone, which bounds the possible speedup
+    print(f"{'frame':<13} | {'two-pass, us':>14} | {'first pass, us':>16} | {'one-pass, us':>15} | speedup | bound")
+    legacy = measure(lambda: two_pass(ACTION, ActionFrame, BroadcastMessagePayload))
+    first_pass = measure(lambda: ActionFrame.model_validate_json(ACTION))
+    current = measure(lambda: action_frame_adapter.validate_json(ACTION))
+    report('action', legacy, first_pass, current)
+    legacy = measure(lambda: two_pass(NOTIFICATION, NotificationFrame, BroadcastMessageNotificationPayload))
+    first_pass = measure(lambda: NotificationFrame.model_validate_json(NOTIFICATION))
+    current = measure(lambda: notification_frame_adapter.validate_json(NOTIFICATION))
+    report('notification', legacy, first_pass, current)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import socket
+import time
+from typing import override
+
+from benchmarks.utils import run
+from server.src.handlers import BaseHandler
+from server.src.server import Server
+from server.src.settings import ServerSettings
+from shared.schemas.actions import ActionTypes, HelpActionFrame
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
+from shared.transport import DataTransport
+
+WINDOWS = (1, 4, 16, 64)
+REQUESTS = 2_000
+HANDLER_LATENCY = 0.001
+
+
+class SlowHelpHandler(BaseHandler):
+    @override
+    async def handle(self) -> None:
+        await asyncio.sleep(HANDLER_LATENCY)
+        await self.client.send(ErrorNotificationFrame(payload=ErrorNotificationPayload(text='help', created_at=0)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def measure(window: int) -> float:
+    port = free_port()
+    settings = ServerSettings(
+        SERVER_HOST='127.0.0.1',
+        SERVER_PORT=port,
+        SERVER_MAX_INFLIGHT_REQUESTS=window,
+        SERVER_RATE_LIMIT=0,
+    )
+    server = Server(settings).on_action(ActionTypes.HELP, SlowHelpHandler)
+    logging.disable(logging.CRITICAL)
+    await server.start()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    transport = DataTransport(writer, reader)
+    data = DataTransport.encode(HelpActionFrame().model_dump_json())
+
+    async def produce() -> None:
+        for _ in range(REQUESTS):
+            await transport.transfer_encoded(data)
+
+    async def consume() -> None:
+        for _ in range(REQUESTS):
+            await transport.receive()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(produce(), consume())
+    elapsed = time.perf_counter() - started_at
+    await transport.close()
+    await asyncio.sleep(0.01)
+    await server.stop()
+    return REQUESTS / elapsed
+
+
+async def main() -> None:
+    print(f'handler latency {HANDLER_LATENCY * 1e3:.1f} ms, unordered requests on one connection')
+    print(f"{'in flight':>9} | {'requests/s':>10}")
+    for window in WINDOWS:
+        print(f'{window:>9} | {await measure(window):>10,.0f}')
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from benchmarks.utils import populate, run
+from server.src.models import Client, ClientManager
+from server.src.presence import Presence
+from server.src.settings import ServerSettings
+from shared.schemas.notifications import UsersNotificationFrame, UsersNotificationPayload
+from shared.schemas.types import UserId
+
+CLIENTS = 50_000
+POLLS = 20
+CHANGES = 20
+
+
+def naive_snapshot(manager: ClientManager) -> bytes:
+    """What a `users` reply costs when every request walks the clients."""
+    payload = UsersNotificationPayload(version=0, users=sorted(client.user.id for client in manager.all()))
+    return Client.encode(UsersNotificationFrame(payload=payload))
+
+
+def per_call(func, repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started_at) / repeat
+
+
+async def main() -> None:
+    manager = ClientManager.get_current()
+    clients = populate(manager, CLIENTS)
+    # the interval is long enough for every change below to land in one delta, it is flushed by hand
+    settings = ServerSettings(SERVER_HOST='127.0.0.1', SERVER_PORT=0, SERVER_PRESENCE_INTERVAL=3600)
+    presence = Presence().configure(settings)
+    await asyncio.sleep(0)
+
+    naive = per_call(lambda: naive_snapshot(manager), POLLS)
+    cached = per_call(presence.snapshot, POLLS * 1_000)
+
+    def rebuild() -> None:
+        presence.left(UserId('Nobody'))
+        presence.joined(UserId('Nobody'))
+        presence.snapshot()
+
+    rebuilt = per_call(rebuild, POLLS)
+    snapshot_size = len(presence.snapshot())
+
+    for client in clients:
+        presence.subscribe(client)
+    writes_before = sum(client.transport_stats.bytes_out for client in clients)
+    started_at = time.perf_counter()
+    for index in range(CHANGES):
+        presence.joined(UserId(f'visitor-{index}'))
+    presence._flush()
+    fan_out = time.perf_counter() - started_at
+    # lets the writers put the delta on the wire, that part is the same for any notification
+    await asyncio.sleep(0)
+    delta_size = (sum(client.transport_stats.bytes_out for client in clients) - writes_before) / CLIENTS
+
+    print(f'{CLIENTS:,} users online, every one of them subscribed')
+    print(f'users reply: {snapshot_size / 1024:,.0f} KiB, presence delta of {CHANGES} changes: {delta_size:.0f} bytes')
+    print(f'naive users reply: {naive * 1e3:.2f} ms per request')
+    print(f'cached snapshot: {cached * 1e9:,.0f} ns per request, rebuilt after a change in {rebuilt * 1e3:.2f} ms')
+    print(f'{CHANGES} joins within one interval queued for everyone: {fan_out * 1e3:.2f} ms')
+    print(
+        f'{CLIENTS:,} clients polling once vs following {CHANGES} changes: '
+        f'{CLIENTS * snapshot_size / 2 ** 30:.1f} GiB vs {CLIENTS * delta_size / 2 ** 20:.1f} MiB'
+    )
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.cluster import free_port, wait_for_server
+from benchmarks.utils import run
+from client.src.backoff import reconnect_delay
+from shared.schemas import actions
+from shared.schemas.notifications import NotificationTypes, notification_frame_adapter
+from shared.schemas.types import SessionToken, UserId
+from shared.transport import DataTransport, Framing
+
+CLIENTS = 1_000
+HISTORY_MESSAGES = 100
+GAP_MESSAGES = 10
+RECONNECT_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+
+
+class SessionPeer:
+    def __init__(self) -> None:
+        self.transport: DataTransport | None = None
+        self.token: SessionToken | None = None
+        self.username: UserId | None = None
+        self.last_seq = 0
+        self.replayed = 0
+        self.replayed_bytes = 0
+        self.session = asyncio.Event()
+
+    async def connect(self, port: int) -> None:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        self.transport = DataTransport(writer, reader)
+        await self.transport.negotiate(Framing.LENGTH)
+        self.session.clear()
+        if self.token is not None:
+            payload = actions.ResumePayload(token=self.token, last_seq=self.last_seq)
+            await self.transport.transfer(actions.ResumeActionFrame(payload=payload).model_dump_json())
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                data = await self.transport.receive()
+            except ConnectionError:
+                return
+            frame = notification_frame_adapter.validate_json(data)
+            if frame.seq is not None:
+                self.last_seq = max(self.last_seq, frame.seq)
+            match frame.type:
+                case NotificationTypes.SESSION if self.username in (None, frame.payload.username):
+                    self.token, self.username = frame.payload.token, frame.payload.username
+                    self.session.set()
+                case NotificationTypes.BROADCAST_MESSAGE:
+                    self.replayed += 1
+                    self.replayed_bytes += len(data)
+                case NotificationTypes.PING:
+                    await self.transport.transfer(actions.PongActionFrame().model_dump_json())
+
+
+async def broadcast(talker: DataTransport, count: int, prefix: str) -> None:
+    for index in range(count):
+        payload = actions.BroadcastMessagePayload(text=f'{prefix} message #{index} ' + 'x' * 64)
+        await talker.transfer(actions.BroadcastMessageActionFrame(payload=payload).model_dump_json())
+
+
+async def history_size(port: int) -> int:
+    """Bytes a client downloads to catch up without a session, by re-fetching the history."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    transport = DataTransport(writer, reader)
+    await transport.negotiate(Framing.LENGTH)
+    payload = actions.HistoryPayload(limit=HISTORY_MESSAGES)
+    await transport.transfer(actions.HistoryActionFrame(payload=payload).model_dump_json())
+    size = 0
+    while True:
+        try:
+            data = await asyncio.wait_for(transport.receive(), 0.5)
+        except TimeoutError:
+            break
+        if notification_frame_adapter.validate_json(data).type is NotificationTypes.BROADCAST_MESSAGE:
+            size += len(data)
+    transport.abort()
+    return size
+
+
+async def reconnect_round(port: int, peers: list[SessionPeer], jitter: bool) -> tuple[float, list[float]]:
+    """Resumes every peer, returns the time until all of them are back and how long each reconnect took."""
+
+    async def resume(peer: SessionPeer) -> float:
+        if jitter:
+            await asyncio.sleep(reconnect_delay(0, RECONNECT_DELAY, RECONNECT_MAX_DELAY))
+        started_at = time.perf_counter()
+        peer.replayed = peer.replayed_bytes = 0
+        await peer.connect(port)
+        asyncio.ensure_future(peer.listen())
+        await peer.session.wait()
+        return time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    latencies = await asyncio.gather(*(resume(peer) for peer in peers))
+    return time.perf_counter() - started_at, latencies
+
+
+async def main() -> None:
+    port = free_port()
+    env = os.environ | {
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_PORT': str(port),
+        'SERVER_RATE_LIMIT': '0',
+        'SERVER_HISTORY_SIZE': str(HISTORY_MESSAGES),
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'server.main'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_server(port)
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        talker = DataTransport(writer, reader)
+        await talker.negotiate(Framing.LENGTH)
+        await broadcast(talker, HISTORY_MESSAGES, 'old')
+
+        peers = [SessionPeer() for _ in range(CLIENTS)]
+        await asyncio.gather(*(peer.connect(port) for peer in peers))
+        for peer in peers:
+            asyncio.ensure_future(peer.listen())
+        await asyncio.gather(*(peer.session.wait() for peer in peers))
+
+        results = {}
+        for jitter in (False, True):
+            for peer in peers:
+                peer.transport.abort()
+            await asyncio.sleep(0.5)
+            await broadcast(talker, GAP_MESSAGES, 'missed')
+            await asyncio.sleep(0.5)
+            results[jitter] = await reconnect_round(port, peers, jitter)
+        refetch = await history_size(port)
+        talker.abort()
+    finally:
+        server.terminate()
+        server.wait()
+
+    resumed = sum(peer.username is not None and peer.session.is_set() for peer in peers)
+    replayed = statistics.mean(peer.replayed for peer in peers)
+    replayed_bytes = statistics.mean(peer.replayed_bytes for peer in peers)
+    print(f'{CLIENTS:,} clients dropped at once, {GAP_MESSAGES} messages missed, {resumed:,} resumed their session')
+    print('reconnect      | all back, s | per client p50, ms | max, ms')
+    for jitter, name in ((False, 'immediately'), (True, 'full jitter')):
+        elapsed, latencies = results[jitter]
+        print(
+            f'{name:<14} | {elapsed:11.2f} | {statistics.median(latencies) * 1e3:18.1f} '
+            f'| {max(latencies) * 1e3:7.1f}'
+        )
+    print(
+        f'catching up: {replayed:.0f} messages, {replayed_bytes / 1024:.1f} KiB replayed per client '
+        f'vs {refetch / 1024:.1f} KiB re-fetching the history'
+    )
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,60 @@
+import asyncio
+import random
+import time
+
+from benchmarks.utils import run
+from server.src.services import Scheduler
+
+PENDING = 100_000
+OWNERS = 10_000
+
+
+async def noop() -> None:
+    pass
+
+
+def report(name: str, operations: int, elapsed: float) -> None:
+    print(f'{name:<32} {operations / elapsed:>12,.0f} ops/s')
+
+
+async def main() -> None:
+    scheduler = Scheduler.get_current()
+    await scheduler.start()
+    rng = random.Random(0)
+    delays = [rng.uniform(60, 120) for _ in range(PENDING)]
+
+    started_at = time.perf_counter()
+    entries = [scheduler.schedule(delay, index % OWNERS, noop) for index, delay in enumerate(delays)]
+    report(f'schedule x{PENDING}', PENDING, time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    for owner in range(OWNERS):
+        scheduler.cancel_last(owner)
+    report(f'cancel last x{OWNERS}', OWNERS, time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    cancelled = sum(scheduler.cancel(entry) for entry in entries[::2])
+    report(f'cancel x{cancelled}', cancelled, time.perf_counter() - started_at)
+
+    await scheduler.stop()
+    for entry in list(entries):
+        scheduler.cancel(entry)
+
+    fired = 0
+
+    async def count() -> None:
+        nonlocal fired
+        fired += 1
+
+    await scheduler.start()
+    for index in range(PENDING):
+        scheduler.schedule(rng.uniform(0, 0.01), index % OWNERS, count)
+    started_at = time.perf_counter()
+    while fired < PENDING:
+        await asyncio.sleep(0.001)
+    report(f'fire x{PENDING} (10ms spread)', PENDING, time.perf_counter() - started_at)
+    await scheduler.stop()
+
+
+if __name__ == '__main__':
+    run(main())
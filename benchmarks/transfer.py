@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.cluster import free_port, wait_for_server
+from benchmarks.utils import run
+from client.src.transfers import Download, Transfers
+from shared.schemas import actions
+from shared.schemas.actions import ActionFrame
+from shared.schemas.notifications import NotificationTypes, notification_frame_adapter
+from shared.schemas.types import UserId
+from shared.transport import DataTransport, Framing
+
+FILE_SIZE = 300 * 1024 * 1024
+RECIPIENTS = 3
+CHAT_INTERVAL = 0.1
+TRANSFER_NOTIFICATIONS = frozenset({
+    NotificationTypes.FILE_OFFER, NotificationTypes.FILE_CREDIT, NotificationTypes.FILE_CHUNK,
+    NotificationTypes.FILE_END,
+})
+
+
+class HashingSink:
+    def __init__(self) -> None:
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        self.hash.update(data)
+
+    def close(self) -> None:
+        pass
+
+
+class Peer:
+    def __init__(self, transport: DataTransport) -> None:
+        self.transport = transport
+        self.sink = HashingSink()
+        self.transfers = Transfers(self.send, lambda name: self.sink, FILE_SIZE)
+        self.download: asyncio.Future[Download] = asyncio.get_running_loop().create_future()
+        self.chat_latencies: list[float] = []
+
+    @classmethod
+    async def connect(cls, port: int, name: str) -> 'Peer':
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        transport = DataTransport(writer, reader)
+        await transport.negotiate(Framing.LENGTH)
+        peer = cls(transport)
+        await peer.send(actions.RenameActionFrame(payload=actions.RenamePayload(username=name)))
+        return peer
+
+    async def send(self, frame: ActionFrame) -> None:
+        await self.transport.transfer(frame.model_dump_json())
+
+    async def listen(self) -> None:
+        while True:
+            frame = notification_frame_adapter.validate_json(await self.transport.receive())
+            if frame.type in TRANSFER_NOTIFICATIONS:
+                download = await self.transfers.handle(frame)
+                if download is not None:
+                    self.download.set_result(download)
+            elif frame.type is NotificationTypes.BROADCAST_MESSAGE and frame.payload.text.startswith('at:'):
+                self.chat_latencies.append(time.monotonic() - float(frame.payload.text[3:]))
+            elif frame.type is NotificationTypes.PING:
+                await self.send(actions.PongActionFrame())
+
+
+def peak_rss(pid: int) -> tuple[int, int]:
+    """Current and peak resident memory of a process in bytes."""
+    fields = dict(line.split(':', 1) for line in Path(f'/proc/{pid}/status').read_text().splitlines())
+    return int(fields['VmRSS'].split()[0]) * 1024, int(fields['VmHWM'].split()[0]) * 1024
+
+
+async def chat(peer: Peer, done: asyncio.Event) -> None:
+    while not done.is_set():
+        payload = actions.BroadcastMessagePayload(text=f'at:{time.monotonic()}')
+        await peer.send(actions.BroadcastMessageActionFrame(payload=payload))
+        await asyncio.sleep(CHAT_INTERVAL)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'payload.bin'
+        digest = hashlib.sha256()
+        with path.open('wb') as file:
+            for _ in range(FILE_SIZE // 2 ** 20):
+                block = os.urandom(2 ** 20)
+                digest.update(block)
+                file.write(block)
+
+        port = free_port()
+        env = os.environ | {'SERVER_HOST': '127.0.0.1', 'SERVER_PORT': str(port)}
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'server.main'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            await wait_for_server(port)
+            sender = await Peer.connect(port, 'sender')
+            recipients = [await Peer.connect(port, f'recipient-{index}') for index in range(RECIPIENTS)]
+            talker = await Peer.connect(port, 'talker')
+            peers = [sender, *recipients, talker]
+            listeners = [asyncio.ensure_future(peer.listen()) for peer in peers]
+            await asyncio.sleep(0.5)
+            rss_before, _ = peak_rss(server.pid)
+
+            done = asyncio.Event()
+            chatter = asyncio.ensure_future(chat(talker, done))
+            started_at = time.perf_counter()
+            sent = await sender.transfers.upload(path, [UserId(f'recipient-{index}') for index in range(RECIPIENTS)])
+            downloads = await asyncio.gather(*(peer.download for peer in recipients))
+            elapsed = time.perf_counter() - started_at
+            done.set()
+            await chatter
+            _, rss_peak = peak_rss(server.pid)
+            for listener in listeners:
+                listener.cancel()
+        finally:
+            server.terminate()
+            server.wait()
+
+    intact = sum(peer.sink.hash.digest() == digest.digest() for peer in recipients)
+    latencies = recipients[0].chat_latencies
+    print(f'{FILE_SIZE / 2 ** 20:,.0f} MiB to {RECIPIENTS} recipients, sent: {sent}, intact copies: {intact}')
+    print(f'{FILE_SIZE * RECIPIENTS / elapsed / 2 ** 20:,.1f} MiB/s delivered in {elapsed:.1f} s')
+    print(f'received: {", ".join(f"{download.received / 2 ** 20:,.0f} MiB" for download in downloads)}')
+    print(f'server RSS: {rss_before / 2 ** 20:.0f} MiB before, {rss_peak / 2 ** 20:.0f} MiB peak')
+    print(
+        f'chat during the transfer: {len(latencies)} messages, '
+        f'p50 {statistics.median(latencies) * 1e3:.1f} ms, max {max(latencies) * 1e3:.1f} ms'
+    )
+
+
+if __name__ == '__main__':
+    run(main())
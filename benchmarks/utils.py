@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from server.src.models import Client, ClientManager
+
+
+class FakeStreamWriter:
+    __slots__ = ('writes', 'bytes_written', '_peername')
+
+    def __init__(self, peername: tuple[str, int] = ('127.0.0.1', 0)) -> None:
+        self.writes = 0
+        self.bytes_written = 0
+        self._peername = peername
+
+    @property
+    def transport(self) -> 'FakeStreamWriter':
+        return self
+
+    def abort(self) -> None:
+        pass
+
+    def set_write_buffer_limits(self, high: int | None = None, low: int | None = None) -> None:
+        pass
+
+    def get_extra_info(self, name: str, default=None):
+        return self._peername if name == 'peername' else default
+
+    def write(self, data: bytes) -> None:
+        self.writes += 1
+        self.bytes_written += len(data)
+
+    def writelines(self, data: list[bytes]) -> None:
+        self.writes += 1
+        self.bytes_written += sum(map(len, data))
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+async def measure(func: Callable[[], Awaitable[None]], repeat: int) -> float:
+    """Returns the best wall time of a single call in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def run(coro: Awaitable[None]) -> None:
+    asyncio.run(coro)
+
+
+def populate(manager: ClientManager, size: int, writers: list[FakeStreamWriter] | None = None) -> list[Client]:
+    writers = writers if writers is not None else []
+    writers.extend(FakeStreamWriter() for _ in range(size))
+    clients = [manager.create(asyncio.StreamReader(), writer) for writer in writers[-size:]]
+    for client in clients:
+        client.start()
+    return clients
+
+
+async def depopulate(manager: ClientManager) -> None:
+    for client in list(manager.all()):
+        await manager.drop(client)
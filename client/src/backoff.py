@@ -0,0 +1,6 @@
+import random
+
+
+def reconnect_delay(attempt: int, base: float, cap: float) -> float:
+    """Full jitter: anything up to the exponential backoff, clients dropped together don't come back together."""
+    return random.uniform(0, min(cap, base * 2 ** min(attempt, 32)))
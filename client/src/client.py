@@ -1,15 +1,24 @@
 import asyncio
+from pathlib import Path
 from types import TracebackType
-from typing import Self, Type
+from typing import BinaryIO, Self, Type
 
 from aioconsole import ainput
+from pydantic import ValidationError
 
+from client.src.backoff import reconnect_delay
 from client.src.printer import Printer
 from client.src.settings import ClientSettings
+from client.src.transfers import Transfers
 from shared.schemas import actions
-from shared.schemas.actions import ActionTypes, ActionFrame
-from shared.schemas.notifications import NotificationFrame
-from shared.transport import DataTransport
+from shared.schemas.actions import ActionFrame
+from shared.schemas.notifications import AnyNotificationFrame, NotificationTypes, notification_frame_adapter
+from shared.schemas.types import SessionToken, UserId
+from shared.transport import DataTransport, Framing
+
+TRANSFER_NOTIFICATIONS = frozenset({
+    NotificationTypes.FILE_CREDIT, NotificationTypes.FILE_CHUNK, NotificationTypes.FILE_END,
+})
 
 
 class Client:
@@ -18,49 +27,238 @@ class Client:
         self._printer = Printer()
         self._transport: DataTransport | None = None
         self._receiver: asyncio.Task | None = None
+        self._transfers = Transfers(
+            self.send, self._open_download, settings.max_file_size if settings.accept_files else None,
+        )
+        self._uploads: set[asyncio.Task] = set()
+        self._connected = False
+        self._closing = False
+        # what the server needs to give this client its name back after a reconnect
+        self._token: SessionToken | None = None
+        self._username: UserId | None = None
+        self._last_seq = 0
+        # the server forgets presence subscriptions with the connection, they are renewed after a reconnect
+        self._following_presence = False
 
     async def __aenter__(self) -> Self:
         self._printer.info(f"Connecting to {self._settings.host}:{self._settings.port}...")
         try:
-            reader, writer = await asyncio.open_connection(self._settings.host, self._settings.port)
+            await self._connect()
         except ConnectionRefusedError as error:
             self._printer.error("Connection refused")
             raise error
-        self._transport = DataTransport(writer, reader)
         self._receiver = asyncio.ensure_future(self._receive_data())
         self._printer.success("Successfully connected")
         return self
 
     async def __aexit__(self, exc_type: Type[BaseException], exc: BaseException, tb: TracebackType) -> None:
         self._printer.info("Disconnecting from the server...")
+        self._closing = True
         self._receiver.cancel()
-        await self._transport.close()
+        try:
+            await self._transport.close()
+        except ConnectionError:
+            pass
         self._printer.success("Successfully disconnected")
 
+    async def _connect(self) -> None:
+        reader, writer = await asyncio.open_connection(self._settings.host, self._settings.port)
+        self._transport = DataTransport(writer, reader)
+        if self._settings.framing is not Framing.LINE:
+            await self._transport.negotiate(self._settings.framing, self._settings.compression)
+        if self._token is not None:
+            payload = actions.ResumePayload(token=self._token, last_seq=self._last_seq)
+            await self._transport.transfer(actions.ResumeActionFrame(payload=payload).model_dump_json())
+        self._connected = True
+
+    async def _reconnect(self) -> bool:
+        self._connected = False
+        self._transport.abort()
+        self._transfers.abort()
+        for attempt in range(self._settings.reconnect_attempts):
+            delay = reconnect_delay(attempt, self._settings.reconnect_delay, self._settings.reconnect_max_delay)
+            self._printer.error(f"Connection lost, reconnecting in {delay:.1f} s...")
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except OSError:
+                continue
+            self._printer.success("Reconnected")
+            if self._following_presence:
+                await self.send(actions.UsersActionFrame())
+            return True
+        return False
+
     async def _receive_data(self) -> None:
         while True:
-            data = await self._transport.receive()
-            frame = NotificationFrame.model_validate_json(data)
-            self._printer.message(frame)
+            try:
+                data = await self._transport.receive()
+            except ConnectionError:
+                if self._closing:
+                    return
+                if not await self._reconnect():
+                    self._printer.error("Connection to the server is lost")
+                    return
+                continue
+            try:
+                frame = notification_frame_adapter.validate_json(data)
+            except ValidationError:
+                self._printer.error("Received a malformed notification from the server")
+                continue
+            await self._handle_notification(frame)
+
+    async def _handle_notification(self, frame: AnyNotificationFrame) -> None:
+        if frame.seq is not None:
+            self._last_seq = max(self._last_seq, frame.seq)
+        if frame.type is NotificationTypes.SESSION:
+            self._token = frame.payload.token
+            if frame.payload.username == self._username:
+                return
+            self._username = frame.payload.username
+        if frame.type is NotificationTypes.PING:
+            await self.send(actions.PongActionFrame())
+            return
+        if frame.type in TRANSFER_NOTIFICATIONS:
+            await self._handle_transfer(frame)
+            return
+        if frame.type is NotificationTypes.FILE_OFFER:
+            await self._transfers.handle(frame)
+            if not self._transfers.is_downloading(frame.payload.transfer_id):
+                self._printer.error(
+                    f"Declined '{frame.payload.name}' ({frame.payload.size} bytes) from {frame.payload.sender}, "
+                    f"see CLIENT_ACCEPT_FILES and CLIENT_MAX_FILE_SIZE"
+                )
+                return
+        if frame.type is NotificationTypes.PRESENCE and self._printer.missed_presence(frame.payload):
+            await self.send(actions.UsersActionFrame())
+            return
+        self._printer.message(frame)
+
+    async def _handle_transfer(self, frame: AnyNotificationFrame) -> None:
+        download = await self._transfers.handle(frame)
+        if download is not None and download.received == download.size:
+            self._printer.success(f"Saved '{download.name}' from {download.sender}")
+        elif download is not None:
+            self._printer.error(f"Transfer of '{download.name}' from {download.sender} is cancelled")
 
     async def send(self, frame: ActionFrame) -> None:
-        await self._transport.transfer(frame.model_dump_json())
+        if not self._connected:
+            self._printer.error("Not connected to the server, try again later")
+            return
+        try:
+            await self._transport.transfer(frame.model_dump_json())
+        except ConnectionError:
+            self._printer.error("Connection lost, the request is not sent")
+
+    async def _read_statement(self) -> str | None:
+        """Next line typed by the user, None once the connection is lost for good."""
+        reading = asyncio.ensure_future(ainput())
+        await asyncio.wait((reading, self._receiver), return_when=asyncio.FIRST_COMPLETED)
+        if not reading.done():
+            reading.cancel()
+            return None
+        return reading.result()
 
     async def handle_input(self) -> None:
-        while True:
-            statement = await ainput()
+        while (statement := await self._read_statement()) is not None:
             match statement.split():
-                case ["send", *text]:
-                    payload = actions.BroadcastMessagePayload(text=" ".join(text))
-                    frame = actions.BroadcastMessageActionFrame(payload=payload)
+                case ["send", *arguments]:
+                    try:
+                        frame = self._build_message_frame(arguments)
+                    except ValueError as error:
+                        self._printer.error(f"Invalid 'send' options: {error}")
+                        continue
+                    await self.send(frame)
+                case ["join" | "leave" as command, channel]:
+                    try:
+                        payload = actions.ChannelPayload(channel=channel)
+                    except ValidationError:
+                        self._printer.error(f"Invalid channel name: '{channel}'")
+                        continue
+                    if command == "join":
+                        frame = actions.JoinChannelActionFrame(payload=payload)
+                    else:
+                        frame = actions.LeaveChannelActionFrame(payload=payload)
+                    await self.send(frame)
+                case ["rename", username]:
+                    try:
+                        payload = actions.RenamePayload(username=username)
+                    except ValidationError:
+                        self._printer.error(f"Invalid username: '{username}'")
+                        continue
+                    await self.send(actions.RenameActionFrame(payload=payload))
+                case ["sendfile", usernames, path]:
+                    path = Path(path)
+                    if not path.is_file():
+                        self._printer.error(f"No such file: '{path}'")
+                        continue
+                    task = asyncio.ensure_future(self._upload(path, [UserId(name) for name in usernames.split(",")]))
+                    self._uploads.add(task)
+                    task.add_done_callback(self._uploads.discard)
+                case ["report", username]:
+                    frame = actions.ReportActionFrame(payload=actions.ReportPayload(username=username))
+                    await self.send(frame)
+                case ["cancel"]:
+                    frame = actions.CancelActionFrame()
+                    await self.send(frame)
+                case ["history"]:
+                    frame = actions.HistoryActionFrame()
+                    await self.send(frame)
+                case ["users"]:
+                    self._following_presence = True
+                    frame = actions.UsersActionFrame()
+                    await self.send(frame)
+                case ["stats"]:
+                    frame = actions.StatsActionFrame()
                     await self.send(frame)
                 case ["help"]:
-                    frame = ActionFrame(type=ActionTypes.HELP)
+                    frame = actions.HelpActionFrame()
                     await self.send(frame)
                 case ["exit" | "quit" | "logout"]:
-                    frame = ActionFrame(type=ActionTypes.LOGOUT)
+                    # the server closes the connection, that's not a reason to reconnect
+                    self._closing = True
+                    frame = actions.LogoutActionFrame()
                     await self.send(frame)
                     break
                 case _:
                     text = f"Unknown command: '{statement}'. Use 'help' to see available commands."
                     self._printer.error(text)
+
+    async def _upload(self, path: Path, recipients: list[UserId]) -> None:
+        # runs next to the input loop, chat keeps flowing while the file is sent
+        try:
+            sent = await self._transfers.upload(path, recipients)
+        except ValidationError:
+            self._printer.error("Invalid 'sendfile' options")
+            return
+        if sent:
+            self._printer.success(f"Sent '{path.name}'")
+        else:
+            self._printer.error(f"Sending '{path.name}' is cancelled")
+
+    def _open_download(self, name: str) -> BinaryIO:
+        self._settings.downloads_dir.mkdir(parents=True, exist_ok=True)
+        path = self._settings.downloads_dir / name
+        copy = 1
+        while path.exists():
+            path = self._settings.downloads_dir / f"{Path(name).stem} ({copy}){Path(name).suffix}"
+            copy += 1
+        return path.open('wb')
+
+    @staticmethod
+    def _build_message_frame(arguments: list[str]) -> ActionFrame:
+        options: dict[str, str] = {}
+        while len(arguments) > 1 and arguments[0] in ("-u", "--username", "-c", "--channel", "-t", "--time"):
+            option, value, *arguments = arguments
+            options[option.lstrip("-")[0]] = value
+
+        text = " ".join(arguments)
+        delay = float(options["t"]) if "t" in options else None
+        if "c" in options:
+            payload = actions.ChannelMessagePayload(text=text, channel=options["c"], delay=delay)
+            return actions.ChannelMessageActionFrame(payload=payload)
+        if "u" in options:
+            payload = actions.SendMessagePayload(text=text, to=options["u"], delay=delay)
+            return actions.SendMessageActionFrame(payload=payload)
+        payload = actions.BroadcastMessagePayload(text=text, delay=delay)
+        return actions.BroadcastMessageActionFrame(payload=payload)
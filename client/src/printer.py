@@ -1,7 +1,8 @@
 from enum import StrEnum
 
-from shared.schemas.notifications import NotificationFrame, NotificationTypes, PrivateMessageNotificationPayload, \
-    BroadcastMessageNotificationPayload, ErrorNotificationPayload
+from shared.schemas.notifications import AnyNotificationFrame, NotificationTypes, PresenceChange, PresenceEvents, \
+    PresenceNotificationPayload
+from shared.schemas.types import UserId
 
 
 class Colors(StrEnum):
@@ -13,23 +14,93 @@ class Colors(StrEnum):
 
 
 class Printer:
-    def message(self, frame: NotificationFrame) -> None:
-        match NotificationTypes(frame.type):
+    def __init__(self) -> None:
+        # kept up to date from presence deltas once the first `users` reply arrives
+        self._roster: set[UserId] = set()
+        self._roster_version: int | None = None
+
+    @property
+    def roster(self) -> set[UserId]:
+        return self._roster
+
+    def missed_presence(self, payload: PresenceNotificationPayload) -> bool:
+        """
+        Whether changes before the delta never arrived, the roster can't be fixed from deltas then. Further deltas
+        are ignored until a fresh `users` snapshot replaces the roster.
+        """
+        if self._roster_version is None or payload.version - len(payload.changes) <= self._roster_version:
+            return False
+        self._roster_version = None
+        return True
+
+    def message(self, frame: AnyNotificationFrame) -> None:
+        payload = frame.payload
+        match frame.type:
             case NotificationTypes.PRIVATE_MESSAGE:
-                payload = PrivateMessageNotificationPayload.model_validate(frame.payload)
                 text = f'{payload.sender} >>> {payload.text}'
                 print(self._with_color(text, Colors.BLUE))
 
             case NotificationTypes.BROADCAST_MESSAGE:
-                payload = BroadcastMessageNotificationPayload.model_validate(frame.payload)
                 text = f'{payload.sender} >>> {payload.text}'
                 print(self._with_color(text, Colors.GREEN))
 
+            case NotificationTypes.CHANNEL_MESSAGE:
+                text = f'#{payload.channel} {payload.sender} >>> {payload.text}'
+                print(self._with_color(text, Colors.GREEN))
+
+            case NotificationTypes.STATS:
+                latency = ', '.join(
+                    f'{action} {p99 * 1e3:.2f} ms' for action, p99 in payload.handler_latency_p99.items()
+                )
+                text = (
+                    f'Clients: {payload.clients}, outbound queue: {payload.outbound_queue_depth}\n'
+                    f'Frames in/out: {payload.frames_in}/{payload.frames_out}, '
+                    f'bytes in/out: {payload.bytes_in}/{payload.bytes_out}\n'
+                    f'Loop lag p99: {payload.loop_lag_p99 * 1e3:.2f} ms\n'
+                    f'Handler latency p99: {latency}'
+                )
+                print(self._with_color(text, Colors.YELLOW))
+
             case NotificationTypes.ERROR:
-                payload = ErrorNotificationPayload.model_validate(frame.payload)
                 text = f'Error: {payload.text}'
                 print(self._with_color(text, Colors.RED))
 
+            case NotificationTypes.FILE_OFFER:
+                text = f"{payload.sender} is sending you '{payload.name}' ({payload.size} bytes)"
+                print(self._with_color(text, Colors.BLUE))
+
+            case NotificationTypes.SESSION:
+                text = f'You are {payload.username}'
+                print(self._with_color(text, Colors.YELLOW))
+
+            case NotificationTypes.USERS:
+                self._roster = set(payload.users)
+                self._roster_version = payload.version
+                text = f'Online ({len(payload.users)}): {", ".join(payload.users)}'
+                print(self._with_color(text, Colors.YELLOW))
+
+            case NotificationTypes.PRESENCE:
+                if self._roster_version is None or payload.version <= self._roster_version:
+                    return
+                # the snapshot can already have the first changes of a delta that was collected around it
+                skipped = len(payload.changes) - (payload.version - self._roster_version)
+                self._roster_version = payload.version
+                for change in payload.changes[skipped:]:
+                    print(self._with_color(self._apply(change), Colors.YELLOW))
+
+    def _apply(self, change: PresenceChange) -> str:
+        match change.event:
+            case PresenceEvents.JOIN:
+                self._roster.add(change.username)
+                return f'{change.username} joined the chat'
+            case PresenceEvents.LEAVE:
+                self._roster.discard(change.username)
+                return f'{change.username} left the chat'
+            case PresenceEvents.RENAME:
+                self._roster.discard(change.previous)
+                self._roster.add(change.username)
+                return f'{change.previous} is now known as {change.username}'
+
     def info(self, text: str) -> None:
         print(self._with_color(text, Colors.YELLOW))
 
@@ -1,9 +1,20 @@
+from pathlib import Path
 from typing import Final
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+from shared.transport import Framing
+
 
 class ClientSettings(BaseSettings):
     host: Final[str] = Field(..., alias='SERVER_HOST')
     port: Final[int] = Field(..., alias='SERVER_PORT')
+    framing: Framing = Field(Framing.LINE, alias='CLIENT_FRAMING')
+    compression: bool = Field(False, alias='CLIENT_COMPRESSION')
+    downloads_dir: Path = Field(Path('downloads'), alias='CLIENT_DOWNLOADS_DIR')
+    accept_files: bool = Field(False, alias='CLIENT_ACCEPT_FILES')
+    max_file_size: int = Field(100 * 1024 * 1024, alias='CLIENT_MAX_FILE_SIZE', ge=0)
+    reconnect_attempts: int = Field(10, alias='CLIENT_RECONNECT_ATTEMPTS', ge=0)
+    reconnect_delay: float = Field(0.5, alias='CLIENT_RECONNECT_DELAY', gt=0)
+    reconnect_max_delay: float = Field(30.0, alias='CLIENT_RECONNECT_MAX_DELAY', gt=0)
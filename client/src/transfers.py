@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import binascii
+import uuid
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable
+
+from shared.schemas import actions
+from shared.schemas.actions import ActionFrame, FILE_CHUNK_SIZE
+from shared.schemas.notifications import AnyNotificationFrame, NotificationTypes
+from shared.schemas.types import TransferId, UserId
+
+# chunks are written to disk in batches, a thread hop per chunk would cost more than the write itself
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+type Send = Callable[[ActionFrame], Awaitable[None]]
+type OpenSink = Callable[[str], BinaryIO]
+
+
+class Upload:
+    __slots__ = ('_path', '_credit', '_granted', '_cancelled')
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._credit = 0
+        self._granted = asyncio.Event()
+        self._cancelled = False
+
+    def grant(self, chunks: int) -> None:
+        self._credit += chunks
+        self._granted.set()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        self._granted.set()
+
+    async def run(self, transfer_id: TransferId, send: Send) -> bool:
+        """Sends the file as far as the server grants credit, returns False if the transfer got cancelled."""
+        with self._path.open('rb') as file:
+            seq = 0
+            while chunk := await asyncio.to_thread(file.read, FILE_CHUNK_SIZE):
+                while not self._credit and not self._cancelled:
+                    self._granted.clear()
+                    await self._granted.wait()
+                if self._cancelled:
+                    return False
+                self._credit -= 1
+                payload = actions.FileChunkPayload(
+                    transfer_id=transfer_id,
+                    seq=seq,
+                    data=base64.b64encode(chunk).decode(),
+                )
+                await send(actions.FileChunkActionFrame(payload=payload))
+                seq += 1
+        await send(actions.FileEndActionFrame(payload=actions.FileEndPayload(transfer_id=transfer_id)))
+        return True
+
+
+class Download:
+    __slots__ = ('name', 'sender', 'size', 'received', '_sink', '_buffer', '_next_seq')
+
+    def __init__(self, name: str, sender: UserId, size: int, sink: BinaryIO) -> None:
+        self.name = name
+        self.sender = sender
+        self.size = size
+        self.received = 0
+        self._sink = sink
+        self._buffer = bytearray()
+        self._next_seq = 0
+
+    async def write(self, seq: int, data: str) -> bool:
+        """Appends a chunk, False if it is missing a predecessor, is corrupted or goes past the offered size."""
+        if seq != self._next_seq:
+            return False
+        try:
+            chunk = base64.b64decode(data, validate=True)
+        except binascii.Error:
+            return False
+        if self.received + len(chunk) > self.size:
+            return False
+        self._buffer += chunk
+        self.received += len(chunk)
+        self._next_seq += 1
+        if len(self._buffer) >= WRITE_BUFFER_SIZE:
+            await self._flush()
+        return True
+
+    async def close(self) -> None:
+        await self._flush()
+        await asyncio.to_thread(self._sink.close)
+
+    def discard(self) -> None:
+        """Closes the sink right away, what is still buffered is lost with the cancelled transfer."""
+        self._sink.close()
+
+    async def _flush(self) -> None:
+        data, self._buffer = self._buffer, bytearray()
+        if data:
+            await asyncio.to_thread(self._sink.write, data)
+
+
+class Transfers:
+    """
+    Client side of file transfers: paces uploads by the credit the server grants and acknowledges downloads.
+    Offers larger than `max_size` are declined, every offer is when it is None.
+    """
+
+    def __init__(self, send: Send, open_sink: OpenSink, max_size: int | None) -> None:
+        self._send = send
+        self._open_sink = open_sink
+        self._max_size = max_size
+        self._uploads: dict[TransferId, Upload] = {}
+        self._downloads: dict[TransferId, Download] = {}
+
+    async def upload(self, path: Path, recipients: list[UserId]) -> bool:
+        transfer_id = TransferId(uuid.uuid4().hex)
+        upload = self._uploads[transfer_id] = Upload(path)
+        payload = actions.FileOfferPayload(
+            transfer_id=transfer_id,
+            name=path.name,
+            size=path.stat().st_size,
+            to=recipients,
+        )
+        try:
+            await self._send(actions.FileOfferActionFrame(payload=payload))
+            return await upload.run(transfer_id, self._send)
+        finally:
+            del self._uploads[transfer_id]
+
+    async def handle(self, frame: AnyNotificationFrame) -> Download | None:
+        """Applies a transfer notification, returns the download it finished or cancelled, if any."""
+        payload = frame.payload
+        match frame.type:
+            case NotificationTypes.FILE_CREDIT:
+                if (upload := self._uploads.get(payload.transfer_id)) is not None:
+                    upload.grant(payload.chunks)
+            case NotificationTypes.FILE_OFFER:
+                if self._max_size is None or payload.size > self._max_size:
+                    end = actions.FileEndPayload(transfer_id=payload.transfer_id, cancelled=True)
+                    await self._send(actions.FileEndActionFrame(payload=end))
+                    return None
+                # only the base name is kept, a sender must not pick where the file lands
+                name = Path(payload.name).name
+                sink = await asyncio.to_thread(self._open_sink, name)
+                self._downloads[payload.transfer_id] = Download(name, payload.sender, payload.size, sink)
+            case NotificationTypes.FILE_CHUNK:
+                download = self._downloads.get(payload.transfer_id)
+                if download is None:
+                    return None
+                if await download.write(payload.seq, payload.data):
+                    ack = actions.FileAckPayload(transfer_id=payload.transfer_id, seq=payload.seq)
+                    await self._send(actions.FileAckActionFrame(payload=ack))
+                    return None
+                end = actions.FileEndPayload(transfer_id=payload.transfer_id, cancelled=True)
+                await self._send(actions.FileEndActionFrame(payload=end))
+                return await self._close(payload.transfer_id)
+            case NotificationTypes.FILE_END:
+                if (upload := self._uploads.get(payload.transfer_id)) is not None:
+                    upload.cancel()
+                return await self._close(payload.transfer_id)
+        return None
+
+    def is_downloading(self, transfer_id: TransferId) -> bool:
+        return transfer_id in self._downloads
+
+    def abort(self) -> None:
+        """Cancels every transfer, the server forgets them when the connection drops."""
+        for upload in self._uploads.values():
+            upload.cancel()
+        for download in self._downloads.values():
+            download.discard()
+        self._downloads.clear()
+
+    async def _close(self, transfer_id: TransferId) -> Download | None:
+        download = self._downloads.pop(transfer_id, None)
+        if download is not None:
+            await download.close()
+        return download
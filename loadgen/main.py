@@ -0,0 +1,16 @@
+import json
+
+from loadgen.src.runner import run
+from loadgen.src.settings import LoadgenSettings
+
+
+def main():
+    settings = LoadgenSettings()
+    report = json.dumps(run(settings), indent=2)
+    print(report)
+    if settings.output is not None:
+        settings.output.write_text(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+import time
+from multiprocessing.connection import Connection
+
+from loadgen.src.scenarios import SCENARIOS, LoadStats
+from loadgen.src.settings import LoadgenSettings, Scenario
+from loadgen.src.simulated_client import SimulatedClient
+from shared.schemas.types import ChannelName
+
+START_DELAY = 1.0
+PERCENTILES = {'p50': 0.5, 'p99': 0.99, 'p999': 0.999}
+
+
+async def _connect(settings: LoadgenSettings, count: int) -> list[SimulatedClient]:
+    # the server accepts a limited backlog, a burst of thousands of connects would be dropped and retried by TCP
+    clients = []
+    for offset in range(0, count, settings.connect_batch):
+        batch = min(settings.connect_batch, count - offset)
+        clients.extend(await asyncio.gather(*(SimulatedClient.connect(settings) for _ in range(batch))))
+    return clients
+
+
+async def _run_worker(settings: LoadgenSettings, index: int, count: int, conn: Connection) -> LoadStats:
+    clients = await _connect(settings, count)
+    names = []
+    if settings.scenario is Scenario.DM_MESH:
+        channels = (ChannelName(f'loadgen-{index}-{position}') for position in range(count))
+        names = await asyncio.gather(*(client.discover_name(channel) for client, channel in zip(clients, channels)))
+    conn.send(names)
+
+    names, start_at = await asyncio.to_thread(conn.recv)
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    stats = LoadStats()
+    await SCENARIOS[settings.scenario](clients, names, settings, start_at + settings.duration, stats)
+    for client in clients:
+        await client.close()
+    return stats
+
+
+def _worker(settings: LoadgenSettings, index: int, count: int, conn: Connection) -> None:
+    conn.send(asyncio.run(_run_worker(settings, index, count, conn)))
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run(settings: LoadgenSettings) -> dict:
+    """Spreads the clients over processes, starts them together and merges what they measured."""
+    context = multiprocessing.get_context('spawn')
+    processes = min(settings.processes, settings.clients)
+    counts = [settings.clients // processes + (index < settings.clients % processes) for index in range(processes)]
+    pipes = [context.Pipe() for _ in counts]
+    workers = [
+        context.Process(target=_worker, args=(settings, index, count, child), name=f'loadgen-{index}')
+        for index, (count, (_, child)) in enumerate(zip(counts, pipes))
+    ]
+    for worker in workers:
+        worker.start()
+
+    names = [name for parent, _ in pipes for name in parent.recv()]
+    start_at = time.monotonic() + START_DELAY
+    for parent, _ in pipes:
+        parent.send((names, start_at))
+    results: list[LoadStats] = [parent.recv() for parent, _ in pipes]
+    for worker in workers:
+        worker.join()
+
+    latencies = sorted(latency for result in results for latency in result.latencies)
+    sent = sum(result.sent for result in results)
+    received = sum(result.received for result in results)
+    return {
+        'scenario': settings.scenario,
+        'clients': settings.clients,
+        'processes': processes,
+        'duration': settings.duration,
+        'rate': settings.rate,
+        'sent': sent,
+        'received': received,
+        'errors': sum(result.errors for result in results),
+        'sent_per_second': round(sent / settings.duration, 1),
+        'received_per_second': round(received / settings.duration, 1),
+        'latency_ms': {name: round(_percentile(latencies, q) * 1e3, 3) for name, q in PERCENTILES.items()}
+        | {'max': round(latencies[-1] * 1e3 if latencies else 0.0, 3)},
+    }
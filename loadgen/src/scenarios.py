@@ -0,0 +1,141 @@
+import asyncio
+import random
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from loadgen.src.settings import LoadgenSettings, Scenario
+from loadgen.src.simulated_client import SimulatedClient, stamp, stamp_age
+from shared.schemas import actions
+from shared.schemas.actions import ActionFrame
+from shared.schemas.notifications import NotificationTypes
+from shared.schemas.types import UserId
+
+GRACE_PERIOD = 1.0
+
+
+@dataclass
+class LoadStats:
+    sent: int = 0
+    received: int = 0
+    errors: int = 0
+    latencies: array = field(default_factory=lambda: array('d'))
+
+
+type FrameFactory = Callable[[], ActionFrame]
+type ScenarioRunner = Callable[
+    [list[SimulatedClient], list[UserId], LoadgenSettings, float, LoadStats],
+    Awaitable[None],
+]
+
+
+async def _produce(
+    client: SimulatedClient,
+    make_frame: FrameFactory,
+    rate: float,
+    deadline: float,
+    stats: LoadStats,
+) -> None:
+    interval = 1 / rate
+    await asyncio.sleep(random.uniform(0, interval))
+    while time.monotonic() < deadline:
+        try:
+            await client.send(make_frame())
+        except ConnectionError:
+            stats.errors += 1
+            return
+        stats.sent += 1
+        await asyncio.sleep(interval)
+
+
+async def _consume(client: SimulatedClient, stats: LoadStats) -> None:
+    while True:
+        try:
+            frame = await client.receive()
+        except ConnectionError:
+            stats.errors += 1
+            return
+        age = stamp_age(getattr(frame.payload, 'text', ''))
+        if age is not None:
+            stats.received += 1
+            stats.latencies.append(age)
+
+
+async def _exchange(
+    clients: list[SimulatedClient],
+    make_frame: FrameFactory,
+    settings: LoadgenSettings,
+    deadline: float,
+    stats: LoadStats,
+) -> None:
+    consumers = [asyncio.ensure_future(_consume(client, stats)) for client in clients]
+    await asyncio.gather(*(_produce(client, make_frame, settings.rate, deadline, stats) for client in clients))
+    await asyncio.sleep(GRACE_PERIOD)
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+
+async def broadcast_storm(
+    clients: list[SimulatedClient],
+    names: list[UserId],
+    settings: LoadgenSettings,
+    deadline: float,
+    stats: LoadStats,
+) -> None:
+    def make_frame() -> ActionFrame:
+        return actions.BroadcastMessageActionFrame(payload=actions.BroadcastMessagePayload(text=stamp()))
+
+    await _exchange(clients, make_frame, settings, deadline, stats)
+
+
+async def dm_mesh(
+    clients: list[SimulatedClient],
+    names: list[UserId],
+    settings: LoadgenSettings,
+    deadline: float,
+    stats: LoadStats,
+) -> None:
+    def make_frame() -> ActionFrame:
+        payload = actions.SendMessagePayload(text=stamp(), to=random.choice(names))
+        return actions.SendMessageActionFrame(payload=payload)
+
+    await _exchange(clients, make_frame, settings, deadline, stats)
+
+
+async def churn(
+    clients: list[SimulatedClient],
+    names: list[UserId],
+    settings: LoadgenSettings,
+    deadline: float,
+    stats: LoadStats,
+) -> None:
+    """Every client reconnects, makes one request and waits for the reply, over and over."""
+    async def cycle(client: SimulatedClient) -> None:
+        while time.monotonic() < deadline:
+            await client.close()
+            started_at = time.monotonic()
+            try:
+                client = await SimulatedClient.connect(settings)
+                await client.send(actions.HelpActionFrame())
+                stats.sent += 1
+                # the server greets a new connection with its session first, help is answered with an error frame
+                while (await client.receive()).type is not NotificationTypes.ERROR:
+                    pass
+            except OSError:
+                stats.errors += 1
+                await asyncio.sleep(0.1)
+                continue
+            stats.received += 1
+            stats.latencies.append(time.monotonic() - started_at)
+        await client.close()
+
+    await asyncio.gather(*(cycle(client) for client in clients))
+
+
+SCENARIOS: dict[Scenario, ScenarioRunner] = {
+    Scenario.BROADCAST_STORM: broadcast_storm,
+    Scenario.DM_MESH: dm_mesh,
+    Scenario.CHURN: churn,
+}
@@ -0,0 +1,29 @@
+import os
+from enum import StrEnum
+from pathlib import Path
+from typing import Final
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from shared.transport import Framing
+
+
+class Scenario(StrEnum):
+    BROADCAST_STORM = 'broadcast-storm'
+    DM_MESH = 'dm-mesh'
+    CHURN = 'churn'
+
+
+class LoadgenSettings(BaseSettings):
+    host: Final[str] = Field(..., alias='SERVER_HOST')
+    port: Final[int] = Field(..., alias='SERVER_PORT')
+    framing: Framing = Field(Framing.LENGTH, alias='LOADGEN_FRAMING')
+    compression: bool = Field(False, alias='LOADGEN_COMPRESSION')
+    scenario: Scenario = Field(Scenario.BROADCAST_STORM, alias='LOADGEN_SCENARIO')
+    clients: int = Field(1000, alias='LOADGEN_CLIENTS', gt=0)
+    processes: int = Field(os.cpu_count() or 1, alias='LOADGEN_PROCESSES', gt=0)
+    duration: float = Field(10.0, alias='LOADGEN_DURATION', gt=0)
+    rate: float = Field(1.0, alias='LOADGEN_RATE', gt=0)
+    connect_batch: int = Field(50, alias='LOADGEN_CONNECT_BATCH', gt=0)
+    output: Path | None = Field(None, alias='LOADGEN_OUTPUT')
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import Self
+
+from loadgen.src.settings import LoadgenSettings
+from shared.schemas import actions
+from shared.schemas.actions import ActionFrame
+from shared.schemas.notifications import AnyNotificationFrame, NotificationTypes, notification_frame_adapter
+from shared.schemas.types import ChannelName, UserId
+from shared.transport import DataTransport, Framing
+
+STAMP_PREFIX = 'lg:'
+
+
+def stamp() -> str:
+    return f'{STAMP_PREFIX}{time.monotonic_ns()}'
+
+
+def stamp_age(text: str) -> float | None:
+    if not text.startswith(STAMP_PREFIX):
+        return None
+    return (time.monotonic_ns() - int(text[len(STAMP_PREFIX):])) / 1e9
+
+
+class SimulatedClient:
+    def __init__(self, transport: DataTransport) -> None:
+        self._transport = transport
+
+    @classmethod
+    async def connect(cls, settings: LoadgenSettings) -> Self:
+        reader, writer = await asyncio.open_connection(settings.host, settings.port)
+        transport = DataTransport(writer, reader)
+        if settings.framing is not Framing.LINE:
+            await transport.negotiate(settings.framing, settings.compression)
+        return cls(transport)
+
+    async def send(self, frame: ActionFrame) -> None:
+        await self._transport.transfer(frame.model_dump_json())
+
+    async def receive(self) -> AnyNotificationFrame:
+        while True:
+            frame = notification_frame_adapter.validate_json(await self._transport.receive())
+            if frame.type is not NotificationTypes.PING:
+                return frame
+            await self.send(actions.PongActionFrame())
+
+    async def close(self) -> None:
+        self._transport.abort()
+
+    async def discover_name(self, channel: ChannelName) -> UserId:
+        """The server names clients itself, so learn it from the echo of a message to a channel of our own."""
+        await self.send(actions.JoinChannelActionFrame(payload=actions.ChannelPayload(channel=channel)))
+        payload = actions.ChannelMessagePayload(channel=channel, text='whoami')
+        await self.send(actions.ChannelMessageActionFrame(payload=payload))
+        while True:
+            frame = await self.receive()
+            if frame.type is NotificationTypes.CHANNEL_MESSAGE and frame.payload.channel == channel:
+                break
+        await self.send(actions.LeaveChannelActionFrame(payload=actions.ChannelPayload(channel=channel)))
+        return frame.payload.sender
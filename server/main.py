@@ -1,22 +1,46 @@
 import asyncio
 
+from server.src.cluster import Supervisor
 from server.src.handlers import SendMessageHandler, BroadcastMessageHandler, UnknownActionHandler, LogoutHandler, \
-    BaseErrorHandler
+    BaseErrorHandler, HistoryHandler, CancelHandler, JoinChannelHandler, LeaveChannelHandler, ChannelMessageHandler, \
+    StatsHandler, ReportHandler, PongHandler, RenameHandler, UsersHandler, FileOfferHandler, FileChunkHandler, \
+    FileAckHandler, FileEndHandler, TransferErrorHandler, ResumeHandler, SessionErrorHandler
 from server.src.server import Server
+from server.src.sessions import SessionError
 from server.src.settings import ServerSettings
+from server.src.transfers import TransferError
 from shared.schemas.actions import ActionTypes
 
 
-async def main():
-    settings = ServerSettings()
-    server = Server(settings) \
+def build_server(settings: ServerSettings) -> Server:
+    return Server(settings) \
         .on_action(ActionTypes.SEND_MESSAGE, SendMessageHandler) \
         .on_action(ActionTypes.BROADCAST_MESSAGE, BroadcastMessageHandler) \
         .on_action(ActionTypes.HELP, UnknownActionHandler) \
         .on_action(ActionTypes.LOGOUT, LogoutHandler) \
+        .on_action(ActionTypes.HISTORY, HistoryHandler) \
+        .on_action(ActionTypes.CANCEL, CancelHandler) \
+        .on_action(ActionTypes.JOIN_CHANNEL, JoinChannelHandler) \
+        .on_action(ActionTypes.LEAVE_CHANNEL, LeaveChannelHandler) \
+        .on_action(ActionTypes.CHANNEL_MESSAGE, ChannelMessageHandler) \
+        .on_action(ActionTypes.STATS, StatsHandler) \
+        .on_action(ActionTypes.REPORT, ReportHandler) \
+        .on_action(ActionTypes.PONG, PongHandler) \
+        .on_action(ActionTypes.RENAME, RenameHandler) \
+        .on_action(ActionTypes.USERS, UsersHandler) \
+        .on_action(ActionTypes.FILE_OFFER, FileOfferHandler) \
+        .on_action(ActionTypes.FILE_CHUNK, FileChunkHandler) \
+        .on_action(ActionTypes.FILE_ACK, FileAckHandler) \
+        .on_action(ActionTypes.FILE_END, FileEndHandler) \
+        .on_action(ActionTypes.RESUME, ResumeHandler) \
         .on_unknown_action(UnknownActionHandler) \
-        .on_exception(Exception, BaseErrorHandler)
+        .on_exception(Exception, BaseErrorHandler) \
+        .on_exception(TransferError, TransferErrorHandler) \
+        .on_exception(SessionError, SessionErrorHandler)
+
 
+async def serve(settings: ServerSettings) -> None:
+    server = build_server(settings)
     try:
         await server.start()
         await server.serve()
@@ -24,5 +48,20 @@ async def main():
         await server.stop()
 
 
+def run_worker(settings: ServerSettings) -> None:
+    try:
+        asyncio.run(serve(settings))
+    except KeyboardInterrupt:
+        pass
+
+
+async def main():
+    settings = ServerSettings()
+    if settings.workers > 1:
+        await Supervisor(settings, run_worker).run()
+    else:
+        await serve(settings)
+
+
 if __name__ == '__main__':
     asyncio.run(main())
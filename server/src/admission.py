@@ -0,0 +1,172 @@
+import time
+from enum import Enum, auto
+from typing import Self
+
+from server.src.models.client import Client, ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.actions import ActionTypes
+from shared.schemas.types import UserId
+
+TYPE_KEY = b'"type"'
+DEFAULT_BUCKET = b''
+MUTED_ACTIONS = frozenset(
+    action.encode()
+    for action in (
+        ActionTypes.SEND_MESSAGE, ActionTypes.BROADCAST_MESSAGE, ActionTypes.CHANNEL_MESSAGE, ActionTypes.FILE_OFFER,
+    )
+)
+
+
+class Verdict(Enum):
+    ADMIT = auto()
+    THROTTLE = auto()
+    DROP = auto()
+    MUTED = auto()
+
+
+def sniff_action(data: bytes) -> bytes:
+    """
+    Value of "type" when it is the first key of the frame, only good for picking a bucket, the frame is validated
+    properly later. A "type" anywhere else could be a nested one, so nothing is sniffed then.
+    """
+    key = data.find(b'"')
+    if key < 0 or data[:key].strip() != b'{' or not data.startswith(TYPE_KEY, key):
+        return DEFAULT_BUCKET
+    start = data.find(b'"', key + len(TYPE_KEY))
+    end = data.find(b'"', start + 1)
+    if start < 0 or end < 0 or data[key + len(TYPE_KEY):start].strip() != b':':
+        return DEFAULT_BUCKET
+    return data[start + 1:end]
+
+
+class TokenBucket:
+    __slots__ = ('_capacity', '_rate', '_tokens', '_updated_at', 'throttled')
+
+    def __init__(self, capacity: int, rate: float, now: float) -> None:
+        self._capacity = capacity
+        self._rate = rate
+        self._tokens = float(capacity)
+        self._updated_at = now
+        self.throttled = False
+
+    def take(self, now: float) -> bool:
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class ClientAdmission:
+    __slots__ = ('buckets', 'muted_until', 'reporters')
+
+    def __init__(self) -> None:
+        self.buckets: dict[bytes, TokenBucket] = {}
+        self.muted_until = 0.0
+        # admission states of the reporting connections, a resumed session keeps its state and so counts once
+        self.reporters: set[ClientAdmission] = set()
+
+
+class AdmissionControl:
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        self._clients: dict[Client, ClientAdmission] = {}
+        self._rate = 0.0
+        self._rates: dict[bytes, float] = {}
+        self._capacities: dict[bytes, int] = {}
+        self._strictest = DEFAULT_BUCKET
+        self._mute_reports = 2
+        self._mute_duration = 600.0
+
+    def __new__(cls) -> 'AdmissionControl':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._rate = settings.rate_limit
+        self._capacities = {
+            action.encode(): settings.rate_limit_capacities.get(action, settings.rate_limit_capacity)
+            for action in ActionTypes
+        }
+        self._rates = {action.encode(): settings.rate_limit_rates.get(action, self._rate) for action in ActionTypes}
+        self._strictest = min(self._rates, key=lambda action: (self._rates[action], self._capacities[action]))
+        self._mute_reports = settings.mute_reports
+        self._mute_duration = settings.mute_duration
+        ClientManager.get_current().add_listener(self)
+        return self
+
+    def admit(self, client: Client, data: bytes) -> Verdict:
+        """Decides on a raw frame before it is parsed, every line costs a token even if it isn't valid JSON."""
+        return self._admit(self._clients[client], sniff_action(data))
+
+    def recheck(self, client: Client, data: bytes, action: ActionTypes) -> Verdict:
+        """Admits the parsed type as well when it isn't the sniffed one, only a crafted frame can tell them apart."""
+        parsed = action.encode()
+        if parsed == sniff_action(data):
+            return Verdict.ADMIT
+        return self._admit(self._clients[client], parsed)
+
+    def _admit(self, state: ClientAdmission, action: bytes) -> Verdict:
+        if action not in self._capacities:
+            # the frame could be anything, it pays like the most limited action and is held back by a mute
+            action = self._strictest
+            muted = True
+        else:
+            muted = action in MUTED_ACTIONS
+        now = time.monotonic()
+        if self._rate:
+            bucket = state.buckets.get(action)
+            if bucket is None:
+                bucket = state.buckets[action] = TokenBucket(self._capacities[action], self._rates[action], now)
+            if not bucket.take(now):
+                if bucket.throttled:
+                    return Verdict.DROP
+                bucket.throttled = True
+                return Verdict.THROTTLE
+            bucket.throttled = False
+        if state.muted_until and muted:
+            if now < state.muted_until:
+                return Verdict.MUTED
+            state.muted_until = 0.0
+        return Verdict.ADMIT
+
+    def muted_for(self, client: Client) -> float:
+        return max(0.0, self._clients[client].muted_until - time.monotonic())
+
+    def has_reported(self, client: Client, reporter: Client) -> bool:
+        return self._clients[reporter] in self._clients[client].reporters
+
+    def report(self, client: Client, reporter: Client) -> bool:
+        """Counts a report against `client` and returns True if it got the client muted."""
+        state = self._clients[client]
+        state.reporters.add(self._clients[reporter])
+        if len(state.reporters) < self._mute_reports:
+            return False
+        state.reporters.clear()
+        state.muted_until = time.monotonic() + self._mute_duration
+        return True
+
+    def state(self, client: Client) -> ClientAdmission:
+        return self._clients[client]
+
+    def restore(self, client: Client, state: ClientAdmission) -> None:
+        """Hands a resumed session its buckets and mute back, a reconnect doesn't lift them."""
+        self._clients[client] = state
+
+    def on_connect(self, client: Client) -> None:
+        self._clients[client] = ClientAdmission()
+
+    def on_disconnect(self, client: Client) -> None:
+        self._clients.pop(client, None)
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        pass
@@ -0,0 +1,3 @@
+from .bus import MessageBus
+from .hub import BusHub
+from .supervisor import Supervisor
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Self, override
+
+from server.src.cluster.protocol import BusMessageTypes, RELAYED_MESSAGES, encode_message, read_message
+from server.src.models.client import Client, ClientManager
+from server.src.models.history import GENERAL_CHANNEL, PUBLIC_CHANNEL_PREFIX, HistoryStore, private_channel
+from server.src.models.mailbox import Deposit, Mailbox
+from server.src.presence import Presence
+from server.src.services.base import BackgroundService
+from server.src.settings import ServerSettings
+from shared.schemas.types import ChannelName, UserId
+
+
+class MessageBus(BackgroundService):
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._enabled = False
+        self._worker_id = 0
+        self._path = Path()
+        self._buffer_size = 4 * 1024 * 1024
+        self._dropped = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._directory: dict[UserId, int] = {}
+        self._claims: dict[UserId, asyncio.Future[bool]] = {}
+        self._clients = ClientManager.get_current()
+        self._history = HistoryStore.get_current()
+        self._mailbox = Mailbox.get_current()
+        self._presence = Presence.get_current()
+        self._logger = logging.getLogger("bus")
+
+    def __new__(cls) -> 'MessageBus':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._enabled = settings.workers > 1
+        self._worker_id = settings.worker_id
+        self._path = settings.cluster_socket
+        self._buffer_size = settings.bus_buffer_size
+        return self
+
+    @override
+    async def start(self) -> None:
+        if not self._enabled:
+            return
+        self._reader, self._writer = await asyncio.open_unix_connection(self._path)
+        self._write(BusMessageTypes.HELLO, b"%d" % self._worker_id)
+        for client in self._clients.all():
+            self.on_connect(client)
+        self._clients.add_listener(self)
+        await super().start()
+
+    @override
+    async def stop(self) -> None:
+        if self._writer is None:
+            return
+        self._clients.remove_listener(self)
+        await super().stop()
+        self._writer.close()
+        self._reader = self._writer = None
+
+    def locate(self, user_id: UserId) -> int | None:
+        return self._directory.get(user_id)
+
+    async def claim(self, user_id: UserId) -> bool:
+        """Reserves a name across workers, False if another worker has it or is claiming it."""
+        if self._writer is None:
+            return True
+        if user_id in self._claims:
+            return False
+        claim = self._claims[user_id] = asyncio.get_running_loop().create_future()
+        self._write(BusMessageTypes.CLAIM, user_id.encode())
+        try:
+            return await claim
+        finally:
+            del self._claims[user_id]
+
+    def unclaim(self, user_id: UserId) -> None:
+        """Gives up a claimed name that ended up unused or stopped being held."""
+        self._write(BusMessageTypes.LEAVE, user_id.encode())
+
+    def publish(self, channel: str, data: bytes) -> None:
+        self._write(BusMessageTypes.BROADCAST, channel.encode(), data)
+
+    def send_direct(self, user_id: UserId, data: bytes) -> None:
+        self._write(BusMessageTypes.DIRECT, user_id.encode(), data)
+
+    def on_connect(self, client: Client) -> None:
+        self._write(BusMessageTypes.JOIN, client.user.id.encode())
+
+    def on_disconnect(self, client: Client) -> None:
+        # a name held for a session stays claimed, it is given up when the session expires
+        if not self._clients.is_held(client.user.id):
+            self._write(BusMessageTypes.LEAVE, client.user.id.encode())
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        self._write(BusMessageTypes.LEAVE, old_id.encode())
+        self._write(BusMessageTypes.JOIN, client.user.id.encode())
+
+    def _write(self, kind: BusMessageTypes, *fields: bytes) -> None:
+        if self._writer is None:
+            return
+        if kind in RELAYED_MESSAGES:
+            if self._writer.transport.get_write_buffer_size() > self._buffer_size:
+                if not self._dropped:
+                    self._logger.warning("Message bus can't keep up, dropping messages to other workers")
+                self._dropped += 1
+                return
+            if self._dropped:
+                self._logger.warning("Message bus caught up, %s messages were dropped", self._dropped)
+                self._dropped = 0
+        self._writer.write(encode_message(kind, *fields))
+
+    @override
+    async def _run(self) -> None:
+        try:
+            while True:
+                kind, fields = await read_message(self._reader)
+                await self._dispatch(kind, fields)
+        except ConnectionError:
+            self._logger.error("Connection to the message bus is lost")
+            for claim in self._claims.values():
+                claim.set_result(False)
+
+    async def _dispatch(self, kind: BusMessageTypes, fields: list[bytes]) -> None:
+        match kind:
+            case BusMessageTypes.JOIN:
+                user_id = UserId(fields[0].decode())
+                self._directory[user_id] = int(fields[1])
+                self._presence.joined(user_id)
+            case BusMessageTypes.LEAVE:
+                user_id = UserId(fields[0].decode())
+                if self._directory.pop(user_id, None) is not None:
+                    self._presence.left(user_id)
+            case BusMessageTypes.CLAIMED:
+                claim = self._claims.get(UserId(fields[0].decode()))
+                if claim is not None and not claim.done():
+                    claim.set_result(fields[1] == b"1")
+            case BusMessageTypes.BROADCAST:
+                channel, data = fields[0].decode(), fields[1]
+                if channel == GENERAL_CHANNEL:
+                    await self._clients.broadcast(self._history.record_relayed(data, channel))
+                elif channel.startswith(PUBLIC_CHANNEL_PREFIX):
+                    name = ChannelName(channel.removeprefix(PUBLIC_CHANNEL_PREFIX))
+                    await self._clients.publish(name, self._history.record_relayed(data, channel))
+            case BusMessageTypes.DIRECT:
+                user_id = UserId(fields[0].decode())
+                receiver = self._clients.get(user_id)
+                if receiver is not None:
+                    await receiver.send_encoded(self._history.record_relayed(fields[1], private_channel(user_id)))
+                elif self._mailbox.accepts(user_id):
+                    # the receiver left after the sending worker looked them up
+                    if self._mailbox.deposit(user_id, self._history.record_relayed(fields[1])) is not Deposit.KEPT:
+                        self._logger.warning("A message relayed to '%s' can't be kept in the mailbox", user_id)
@@ -0,0 +1,106 @@
+import asyncio
+import contextlib
+import logging
+from pathlib import Path
+
+from server.src.cluster.protocol import BusMessageTypes, RELAYED_MESSAGES, encode_message, read_message
+
+
+class BusHub:
+    def __init__(self, path: Path, buffer_size: int = 4 * 1024 * 1024) -> None:
+        self._path = path
+        self._buffer_size = buffer_size
+        self._server: asyncio.Server | None = None
+        self._workers: dict[int, asyncio.StreamWriter] = {}
+        self._dropped: dict[int, int] = {}
+        self._directory: dict[bytes, int] = {}
+        self._logger = logging.getLogger("bus.hub")
+
+    async def start(self) -> None:
+        self._path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._serve_worker, path=self._path)
+        self._logger.info("Message bus is listening on %s", self._path)
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in self._workers.values():
+            writer.close()
+        self._server = None
+        self._path.unlink(missing_ok=True)
+
+    async def _serve_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            kind, fields = await read_message(reader)
+        except ConnectionError:
+            return
+        if kind is not BusMessageTypes.HELLO:
+            self._logger.error("Worker did not introduce itself, closing the connection")
+            writer.close()
+            return
+
+        worker_id = int(fields[0])
+        self._workers[worker_id] = writer
+        self._dropped[worker_id] = 0
+        self._logger.info("Worker %s joined the bus", worker_id)
+        for user_id, owner in self._directory.items():
+            writer.write(encode_message(BusMessageTypes.JOIN, user_id, b"%d" % owner))
+
+        with contextlib.suppress(ConnectionError):
+            while True:
+                kind, fields = await read_message(reader)
+                self._route(worker_id, kind, fields)
+
+        self._logger.warning("Worker %s left the bus", worker_id)
+        del self._workers[worker_id]
+        del self._dropped[worker_id]
+        for user_id in [user_id for user_id, owner in self._directory.items() if owner == worker_id]:
+            self._route(worker_id, BusMessageTypes.LEAVE, [user_id])
+
+    def _route(self, worker_id: int, kind: BusMessageTypes, fields: list[bytes]) -> None:
+        match kind:
+            case BusMessageTypes.BROADCAST:
+                self._send_others(worker_id, kind, encode_message(kind, *fields))
+            case BusMessageTypes.DIRECT:
+                owner = self._directory.get(fields[0])
+                if owner in self._workers:
+                    self._send(owner, kind, encode_message(kind, *fields))
+            case BusMessageTypes.JOIN:
+                self._directory[fields[0]] = worker_id
+                self._send_others(worker_id, kind, encode_message(kind, fields[0], b"%d" % worker_id))
+            case BusMessageTypes.LEAVE:
+                if self._directory.get(fields[0]) == worker_id:
+                    del self._directory[fields[0]]
+                    self._send_others(worker_id, kind, encode_message(kind, fields[0]))
+            case BusMessageTypes.CLAIM:
+                # the hub sees claims one at a time, so of two workers renaming to the same name only one gets it
+                owner = self._directory.setdefault(fields[0], worker_id)
+                granted = owner == worker_id
+                if granted:
+                    self._send_others(worker_id, BusMessageTypes.JOIN, encode_message(
+                        BusMessageTypes.JOIN, fields[0], b"%d" % worker_id,
+                    ))
+                self._send(worker_id, BusMessageTypes.CLAIMED, encode_message(
+                    BusMessageTypes.CLAIMED, fields[0], b"%d" % granted,
+                ))
+
+    def _send_others(self, worker_id: int, kind: BusMessageTypes, message: bytes) -> None:
+        for other_id in self._workers:
+            if other_id != worker_id:
+                self._send(other_id, kind, message)
+
+    def _send(self, worker_id: int, kind: BusMessageTypes, message: bytes) -> None:
+        writer = self._workers[worker_id]
+        if kind in RELAYED_MESSAGES:
+            if writer.transport.get_write_buffer_size() > self._buffer_size:
+                if not self._dropped[worker_id]:
+                    self._logger.warning("Worker %s can't keep up, dropping messages relayed to it", worker_id)
+                self._dropped[worker_id] += 1
+                return
+            if self._dropped[worker_id]:
+                self._logger.warning(
+                    "Worker %s caught up, %s messages were dropped", worker_id, self._dropped[worker_id],
+                )
+                self._dropped[worker_id] = 0
+        writer.write(message)
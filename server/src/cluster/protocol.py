@@ -0,0 +1,45 @@
+import asyncio
+import struct
+from enum import IntEnum
+
+MESSAGE_HEADER = struct.Struct("!BI")
+FIELD_HEADER = struct.Struct("!I")
+
+
+class BusMessageTypes(IntEnum):
+    HELLO = 1
+    BROADCAST = 2
+    DIRECT = 3
+    JOIN = 4
+    LEAVE = 5
+    CLAIM = 6
+    CLAIMED = 7
+
+
+# messages that carry chat traffic, a peer that can't keep up loses these but never the directory updates
+RELAYED_MESSAGES = frozenset({BusMessageTypes.BROADCAST, BusMessageTypes.DIRECT})
+
+
+def encode_message(kind: BusMessageTypes, *fields: bytes) -> bytes:
+    parts = []
+    for field in fields:
+        parts.append(FIELD_HEADER.pack(len(field)))
+        parts.append(field)
+    body = b"".join(parts)
+    return MESSAGE_HEADER.pack(kind, len(body)) + body
+
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[BusMessageTypes, list[bytes]]:
+    try:
+        kind, size = MESSAGE_HEADER.unpack(await reader.readexactly(MESSAGE_HEADER.size))
+        body = await reader.readexactly(size)
+    except asyncio.IncompleteReadError as error:
+        raise ConnectionError("Bus connection is closed") from error
+
+    fields, offset = [], 0
+    while offset < size:
+        length, = FIELD_HEADER.unpack_from(body, offset)
+        offset += FIELD_HEADER.size
+        fields.append(body[offset:offset + length])
+        offset += length
+    return BusMessageTypes(kind), fields
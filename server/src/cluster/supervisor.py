@@ -0,0 +1,54 @@
+import asyncio
+import logging.config
+import multiprocessing
+import signal
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+from server.src.cluster.hub import BusHub
+from server.src.settings import ServerSettings
+
+type WorkerTarget = Callable[[ServerSettings], None]
+
+
+class Supervisor:
+    def __init__(self, settings: ServerSettings, target: WorkerTarget) -> None:
+        logging.config.dictConfig(settings.logging)
+        self._settings = settings
+        self._target = target
+        self._hub = BusHub(settings.cluster_socket, settings.bus_buffer_size)
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: list[BaseProcess] = []
+        self._logger = logging.getLogger("supervisor")
+
+    async def run(self) -> None:
+        stopped = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+        await self._hub.start()
+        try:
+            for worker_id in range(self._settings.workers):
+                self._workers.append(self._spawn(worker_id))
+            self._logger.info(
+                "Started %s workers on %s:%s", len(self._workers), self._settings.host, self._settings.port,
+            )
+            workers_exited = asyncio.gather(*(asyncio.to_thread(worker.join) for worker in self._workers))
+            await asyncio.wait(
+                (workers_exited, asyncio.ensure_future(stopped.wait())), return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            await self._shutdown()
+
+    def _spawn(self, worker_id: int) -> BaseProcess:
+        settings = self._settings.model_copy(update={'worker_id': worker_id})
+        worker = self._context.Process(target=self._target, args=(settings,), name=f"chat-worker-{worker_id}")
+        worker.start()
+        return worker
+
+    async def _shutdown(self) -> None:
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in self._workers:
+            await asyncio.to_thread(worker.join)
+        await self._hub.stop()
+        self._logger.info("All workers are stopped")
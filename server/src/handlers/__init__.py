@@ -1,6 +1,18 @@
 from .base_error_handler import BaseErrorHandler
 from .base_handler import BaseHandler
 from .broadcast_handler import BroadcastMessageHandler
+from .cancel_handler import CancelHandler
+from .channel_handler import ChannelMessageHandler, JoinChannelHandler, LeaveChannelHandler
+from .deferrable_handler import DeferrableHandler
+from .history_handler import HistoryHandler
 from .logout_handler import LogoutHandler
 from .message_handler import SendMessageHandler
+from .pong_handler import PongHandler
+from .rename_handler import RenameHandler
+from .report_handler import ReportHandler
+from .session_handler import ResumeHandler, SessionErrorHandler
+from .stats_handler import StatsHandler
+from .transfer_handler import FileAckHandler, FileChunkHandler, FileEndHandler, FileOfferHandler, \
+    TransferErrorHandler
 from .unknown_handler import UnknownActionHandler
+from .users_handler import UsersHandler
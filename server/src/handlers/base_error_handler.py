@@ -1,5 +1,9 @@
 import datetime as dt
+import logging
 
+from pydantic import BaseModel
+
+from server.src.handlers.base_handler import request_ids
 from server.src.models.client import ClientManager, Client, LoggerLike
 from shared.schemas.notifications import ErrorNotificationPayload, ErrorNotificationFrame
 
@@ -7,16 +11,24 @@ from shared.schemas.notifications import ErrorNotificationPayload, ErrorNotifica
 class BaseErrorHandler:
     clients: ClientManager = ClientManager.get_current()
 
-    __slots__ = ('_payload', '_client', '_logger', '_error')
+    __slots__ = ('_payload', '_client', '_logger', '_error', '_request_id')
 
-    def __init__(self, payload: dict, client: Client, error: Exception, logger: LoggerLike) -> None:
+    def __init__(
+        self,
+        payload: BaseModel | None,
+        client: Client,
+        error: Exception,
+        logger: LoggerLike,
+        request_id: int | None = None,
+    ) -> None:
         self._payload = payload
         self._client = client
         self._logger = logger
         self._error = error
+        self._request_id = request_id
 
     @property
-    def payload(self) -> dict:
+    def payload(self) -> BaseModel | None:
         return self._payload
 
     @property
@@ -31,10 +43,18 @@ class BaseErrorHandler:
     def error(self) -> Exception:
         return self._error
 
+    @property
+    def request_id(self) -> int:
+        if self._request_id is None:
+            self._request_id = next(request_ids)
+        return self._request_id
+
     async def __call__(self, *args, **kwargs) -> None:
-        self._logger.info(f"Handling error from '{self._client.user.id}'...")
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info("Handling error of request #%s from '%s'...", self.request_id, self._client.user.id)
         await self.handle()
-        self._logger.info(f"Error from '{self._client.user.id}' handled successfully")
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info("Error of request #%s handled successfully", self.request_id)
 
     async def handle(self) -> None:
         payload = ErrorNotificationPayload(
@@ -1,18 +1,31 @@
+import itertools
+import logging
+
 from pydantic import BaseModel
 
+from server.src.cluster.bus import MessageBus
 from server.src.models.client import ClientManager, Client, LoggerLike
+from server.src.models.history import HistoryStore
+from server.src.models.journal import Journal
+from server.src.services.scheduler import Scheduler
+
+request_ids = itertools.count(1)
 
 
 class BaseHandler:
     clients: ClientManager = ClientManager.get_current()
-    payload_validator: BaseModel | None
+    history: HistoryStore = HistoryStore.get_current()
+    journal: Journal = Journal.get_current()
+    scheduler: Scheduler = Scheduler.get_current()
+    bus: MessageBus = MessageBus.get_current()
 
-    __slots__ = ('_payload', '_client', '_logger')
+    __slots__ = ('_payload', '_client', '_logger', '_request_id')
 
-    def __init__(self, payload: dict, client: Client, logger: LoggerLike) -> None:
-        self._payload = self._validate_payload(payload)
+    def __init__(self, payload: BaseModel | None, client: Client, logger: LoggerLike) -> None:
+        self._payload = payload
         self._client = client
         self._logger = logger
+        self._request_id: int | None = None
 
     @property
     def payload(self) -> BaseModel | None:
@@ -26,16 +39,20 @@ class BaseHandler:
     def logger(self) -> LoggerLike:
         return self._logger
 
+    @property
+    def request_id(self) -> int:
+        if self._request_id is None:
+            self._request_id = next(request_ids)
+        return self._request_id
+
     async def __call__(self, *args, **kwargs) -> None:
-        self._logger.info(f"Handling request '{self.__class__.__name__}' from '{self.client.user.id}'...")
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(
+                "Handling request #%s '%s' from '%s'...", self.request_id, type(self).__name__, self._client.user.id,
+            )
         await self.handle()
-        self._logger.info(f"Request '{self.__class__.__name__}' from '{self.client.user.id}' handled successfully")
-
-    def _validate_payload(self, payload: dict) -> BaseModel | None:
-        try:
-            return self.payload_validator.model_validate(payload) if self.payload_validator is not None else None
-        except AttributeError as error:
-            raise NotImplementedError(f"Payload validator is not defined for '{self.__class__.__name__}'") from error
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info("Request #%s handled successfully", self.request_id)
 
     async def handle(self) -> None:
         raise NotImplementedError
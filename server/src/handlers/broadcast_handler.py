@@ -1,23 +1,27 @@
-import asyncio
 import datetime as dt
 from typing import override
 
-from server.src.handlers.base_handler import BaseHandler
-from shared.schemas.actions import BroadcastMessagePayload
+from server.src.handlers.deferrable_handler import DeferrableHandler
+from server.src.models.history import GENERAL_CHANNEL
+from shared.schemas.actions import BroadcastMessageActionFrame, BroadcastMessagePayload
 from shared.schemas.notifications import BroadcastMessageNotificationPayload, \
     BroadcastMessageNotificationFrame
 
 
-class BroadcastMessageHandler(BaseHandler):
-    payload_validator = BroadcastMessagePayload
+class BroadcastMessageHandler(DeferrableHandler):
+    payload: BroadcastMessagePayload
+    frame_type = BroadcastMessageActionFrame
+
+    __slots__ = ()
 
     @override
-    async def handle(self) -> None:
+    async def deliver(self) -> None:
         payload = BroadcastMessageNotificationPayload(
             text=self.payload.text,
             sender=self.client.user.id,
             created_at=dt.datetime.now(dt.UTC),
         )
         frame = BroadcastMessageNotificationFrame(payload=payload)
-        tasks = [client.send(frame) for client in self.clients.all()]
-        await asyncio.gather(*tasks)
+        data = self.history.record(frame, GENERAL_CHANNEL)
+        await self.clients.broadcast(data)
+        self.bus.publish(GENERAL_CHANNEL, data)
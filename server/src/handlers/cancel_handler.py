@@ -0,0 +1,22 @@
+import datetime as dt
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
+
+
+class CancelHandler(BaseHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        entry = self.scheduler.cancel_last(self.client.user.id)
+        if entry is not None:
+            if entry.key is not None:
+                self.journal.complete(entry.key)
+            self.logger.info("Last scheduled message of '%s' cancelled", self.client.user.id)
+            return
+
+        payload = ErrorNotificationPayload(text="There are no scheduled messages", created_at=dt.datetime.now(dt.UTC))
+        frame = ErrorNotificationFrame(payload=payload)
+        await self.client.send(frame)
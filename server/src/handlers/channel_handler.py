@@ -0,0 +1,70 @@
+import datetime as dt
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+from server.src.handlers.deferrable_handler import DeferrableHandler
+from server.src.models.history import public_channel
+from shared.schemas.actions import ChannelMessageActionFrame, ChannelMessagePayload, ChannelPayload
+from shared.schemas.notifications import ChannelMessageNotificationFrame, ChannelMessageNotificationPayload, \
+    ErrorNotificationFrame, ErrorNotificationPayload
+
+
+class ChannelHandler(BaseHandler):
+    payload: ChannelPayload
+
+    __slots__ = ()
+
+    async def _error(self, text: str) -> None:
+        payload = ErrorNotificationPayload(text=text, created_at=dt.datetime.now(dt.UTC))
+        frame = ErrorNotificationFrame(payload=payload)
+        await self.client.send(frame)
+
+
+class JoinChannelHandler(ChannelHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        if not self.clients.join(self.client, self.payload.channel):
+            await self._error(f"You are already in channel '{self.payload.channel}'")
+            return
+        self.logger.info("'%s' joined channel '%s'", self.client.user.id, self.payload.channel)
+
+
+class LeaveChannelHandler(ChannelHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        if not self.clients.leave(self.client, self.payload.channel):
+            await self._error(f"You are not in channel '{self.payload.channel}'")
+            return
+        self.logger.info("'%s' left channel '%s'", self.client.user.id, self.payload.channel)
+
+
+class ChannelMessageHandler(ChannelHandler, DeferrableHandler):
+    payload: ChannelMessagePayload
+    frame_type = ChannelMessageActionFrame
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        if self.payload.channel not in self.client.channels:
+            await self._error(f"You are not in channel '{self.payload.channel}'")
+        else:
+            await super().handle()
+
+    @override
+    async def deliver(self) -> None:
+        payload = ChannelMessageNotificationPayload(
+            text=self.payload.text,
+            sender=self.client.user.id,
+            channel=self.payload.channel,
+            created_at=dt.datetime.now(dt.UTC),
+        )
+        frame = ChannelMessageNotificationFrame(payload=payload)
+        channel = public_channel(self.payload.channel)
+        data = self.history.record(frame, channel)
+        await self.clients.publish(self.payload.channel, data)
+        self.bus.publish(channel, data)
@@ -0,0 +1,47 @@
+import functools
+import time
+from typing import ClassVar, Hashable, override
+
+from server.src.handlers.base_handler import BaseHandler
+from server.src.models.client import DetachedClient
+from shared.schemas.actions import ActionFrame
+
+
+class DeferrableHandler(BaseHandler):
+    """Delivers right away or after `payload.delay`, journaling deferred messages so they outlive a restart."""
+
+    frame_type: ClassVar[type[ActionFrame]]
+
+    __slots__ = ('_entry',)
+
+    @override
+    async def handle(self) -> None:
+        if self.payload.delay is None:
+            await self.deliver()
+            return
+        key = None
+        if self.journal.enabled:
+            frame = self.frame_type(payload=self.payload).model_dump_json().encode()
+            key = self.journal.schedule(time.time() + self.payload.delay, self.client.user.id, frame)
+        self.resume(key, self.payload.delay)
+
+    def resume(self, key: Hashable | None, delay: float) -> None:
+        # entries belong to the name, so a resumed client or a restored sender can still cancel them
+        self._entry = self.scheduler.schedule(
+            delay, self.client.user.id, functools.partial(self._fire, key), key=key,
+        )
+
+    async def _fire(self, key: int | None) -> None:
+        if key is not None:
+            self.journal.complete(key)
+        # the entry follows its sender through resumes and renames, the connection that scheduled it may be gone
+        sender = self._entry.owner
+        client = self.clients.get(sender)
+        if client is not None:
+            self._client = client
+        elif self.client.user.id != sender:
+            self._client = DetachedClient(sender)
+        await self.deliver()
+
+    async def deliver(self) -> None:
+        raise NotImplementedError
@@ -0,0 +1,27 @@
+import heapq
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+from server.src.models.history import GENERAL_CHANNEL, private_channel, public_channel
+from shared.schemas.actions import HistoryPayload
+
+
+class HistoryHandler(BaseHandler):
+    payload: HistoryPayload
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        channels = (GENERAL_CHANNEL, *map(public_channel, self.client.channels))
+        # the name may have been someone else's before, their direct messages are not the client's to read
+        since = max(self.client.named_at, self.payload.since or 0)
+        direct = self.history.since(private_channel(self.client.user.id), since)
+        if self.payload.since is None:
+            entries = heapq.merge(*(self.history.last(channel, self.payload.limit) for channel in channels), direct)
+            entries = list(entries)[-self.payload.limit:]
+        else:
+            entries = heapq.merge(*(self.history.since(channel, self.payload.since) for channel in channels), direct)
+
+        for _, data in entries:
+            await self.client.send_encoded(data)
@@ -1,11 +1,16 @@
 from typing import override
 
 from server.src.handlers.base_handler import BaseHandler
+from server.src.sessions import Sessions
 
 
 class LogoutHandler(BaseHandler):
-    payload_validator = None
+    sessions: Sessions = Sessions.get_current()
+
+    __slots__ = ()
 
     @override
     async def handle(self) -> None:
+        # a user who logs out is not coming back for their name
+        self.sessions.close(self.client)
         await self.clients.drop(self.client)
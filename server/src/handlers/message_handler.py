@@ -1,39 +1,64 @@
 import datetime as dt
 from typing import override
 
-from server.src.handlers.base_handler import BaseHandler
+from server.src.handlers.deferrable_handler import DeferrableHandler
 from server.src.models.client import Client
-from shared.schemas.actions import SendMessagePayload
-from shared.schemas.notifications import BroadcastMessageNotificationPayload, \
-    BroadcastMessageNotificationFrame, ErrorNotificationFrame, ErrorNotificationPayload
+from server.src.models.history import private_channel
+from server.src.models.mailbox import Deposit, Mailbox
+from shared.schemas.actions import SendMessageActionFrame, SendMessagePayload
+from shared.schemas.notifications import PrivateMessageNotificationPayload, \
+    PrivateMessageNotificationFrame, ErrorNotificationFrame, ErrorNotificationPayload
 
 
-class SendMessageHandler(BaseHandler):
-    validator = SendMessagePayload
+class SendMessageHandler(DeferrableHandler):
+    payload: SendMessagePayload
+    frame_type = SendMessageActionFrame
+    mailbox: Mailbox = Mailbox.get_current()
+
+    __slots__ = ()
 
     @override
-    async def handle(self) -> None:
+    async def deliver(self) -> None:
         receiver = self.clients.get(self.payload.to)
-        if receiver is None:
-            await self._receiver_not_found()
-        else:
+        if receiver is not None:
             await self._send_message(receiver)
-
-    async def _receiver_not_found(self) -> None:
-        self.logger.info(f"User '{self.payload.to}' not found")
-        payload = ErrorNotificationPayload(
-            text=f"User '{self.payload.to}' not found",
-            created_at=dt.datetime.now(dt.UTC),
-        )
-        frame = ErrorNotificationFrame(payload=payload)
-        await self.client.send(frame)
+        elif self.bus.locate(self.payload.to) is not None:
+            self.logger.info("Sending message to '%s' on another worker...", self.payload.to)
+            self.bus.send_direct(self.payload.to, self._record(private_channel(self.client.user.id)))
+        elif self.mailbox.accepts(self.payload.to):
+            await self._leave_message()
+        else:
+            self.logger.info("User '%s' not found", self.payload.to)
+            await self._error(f"User '{self.payload.to}' not found")
 
     async def _send_message(self, receiver: Client) -> None:
-        self.logger.info(f"Sending message to '{self.payload.to}'...")
-        payload = BroadcastMessageNotificationPayload(
+        self.logger.info("Sending message to '%s'...", self.payload.to)
+        data = self._record(private_channel(receiver.user.id), private_channel(self.client.user.id))
+        await receiver.send_encoded(data)
+
+    async def _leave_message(self) -> None:
+        self.logger.info("'%s' is offline, leaving the message in their mailbox", self.payload.to)
+        # the mailbox is what the receiver gets, their private history starts when they take the name
+        data = self._record(private_channel(self.client.user.id))
+        match self.mailbox.deposit(self.payload.to, data):
+            case Deposit.TOO_LARGE:
+                self.logger.info("The message to '%s' doesn't fit in a mailbox and is dropped", self.payload.to)
+                await self._error(f"Can't keep the message for '{self.payload.to}', it doesn't fit in a mailbox")
+            case Deposit.FULL:
+                self.logger.warning("Mailboxes are full, the message to '%s' is dropped", self.payload.to)
+                await self._error(
+                    f"Can't keep messages for '{self.payload.to}' until they connect, the server's mailboxes are full"
+                )
+
+    def _record(self, *channels: str) -> bytes:
+        payload = PrivateMessageNotificationPayload(
             text=self.payload.text,
             sender=self.client.user.id,
+            to=self.payload.to,
             created_at=dt.datetime.now(dt.UTC),
         )
-        frame = BroadcastMessageNotificationFrame(payload=payload)
-        await receiver.send(frame)
+        return self.history.record(PrivateMessageNotificationFrame(payload=payload), *channels)
+
+    async def _error(self, text: str) -> None:
+        payload = ErrorNotificationPayload(text=text, created_at=dt.datetime.now(dt.UTC))
+        await self.client.send(ErrorNotificationFrame(payload=payload))
@@ -0,0 +1,12 @@
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+
+
+class PongHandler(BaseHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        # the client is marked as alive when any frame is read, the reply itself carries nothing
+        pass
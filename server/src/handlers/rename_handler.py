@@ -0,0 +1,38 @@
+import datetime as dt
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+from server.src.models.client import UsernameTakenError
+from server.src.models.mailbox import Mailbox
+from server.src.sessions import Sessions
+from shared.schemas.actions import RenamePayload
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
+
+
+class RenameHandler(BaseHandler):
+    payload: RenamePayload
+    mailbox: Mailbox = Mailbox.get_current()
+    sessions: Sessions = Sessions.get_current()
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        old_id = self.client.user.id
+        try:
+            # a name taken on this worker is refused before it is claimed from the others
+            self.clients.ensure_available(self.payload.username)
+            if not await self.bus.claim(self.payload.username):
+                raise UsernameTakenError(f"Username '{self.payload.username}' is already taken")
+            if self.clients.get(old_id) is not self.client:
+                # the client left while the other workers were asked
+                self.bus.unclaim(self.payload.username)
+                return
+            self.clients.rename(self.client, self.payload.username)
+        except UsernameTakenError as error:
+            payload = ErrorNotificationPayload(text=str(error), created_at=dt.datetime.now(dt.UTC))
+            await self.client.send(ErrorNotificationFrame(payload=payload))
+            return
+        self.sessions.notify(self.client)
+        self.logger.info("'%s' is now known as '%s'", old_id, self.client.user.id)
+        await self.mailbox.flush(self.client)
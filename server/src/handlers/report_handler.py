@@ -0,0 +1,35 @@
+import datetime as dt
+import math
+from typing import override
+
+from server.src.admission import AdmissionControl
+from server.src.handlers.base_handler import BaseHandler
+from server.src.models.client import Client
+from shared.schemas.actions import ReportPayload
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
+
+
+class ReportHandler(BaseHandler):
+    payload: ReportPayload
+    admission: AdmissionControl = AdmissionControl.get_current()
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        target = self.clients.get(self.payload.username)
+        if target is None:
+            await self._notify(self.client, f"User '{self.payload.username}' not found")
+        elif target is self.client:
+            await self._notify(self.client, "You can't report yourself")
+        elif self.admission.has_reported(target, self.client):
+            await self._notify(self.client, f"You have already reported '{self.payload.username}'")
+        elif self.admission.report(target, self.client):
+            self.logger.info("'%s' is muted after reports", self.payload.username)
+            minutes = math.ceil(self.admission.muted_for(target) / 60)
+            await self._notify(target, f"You can't send messages for {minutes} minutes after reports")
+
+    @staticmethod
+    async def _notify(client: Client, text: str) -> None:
+        payload = ErrorNotificationPayload(text=text, created_at=dt.datetime.now(dt.UTC))
+        await client.send(ErrorNotificationFrame(payload=payload))
@@ -0,0 +1,61 @@
+import datetime as dt
+import heapq
+import itertools
+from typing import override
+
+from server.src.admission import AdmissionControl
+from server.src.handlers.base_error_handler import BaseErrorHandler
+from server.src.handlers.base_handler import BaseHandler
+from server.src.models.history import GENERAL_CHANNEL, private_channel, public_channel
+from server.src.models.mailbox import Mailbox
+from server.src.sessions import Sessions
+from shared.schemas.actions import ResumePayload
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
+
+
+class ResumeHandler(BaseHandler):
+    payload: ResumePayload
+    sessions: Sessions = Sessions.get_current()
+    mailbox: Mailbox = Mailbox.get_current()
+    admission: AdmissionControl = AdmissionControl.get_current()
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        session = await self.sessions.take(self.client, self.payload.token)
+        old_id = self.client.user.id
+        self.clients.resume(self.client, session.user_id)
+        self.client.named_at = session.opened_at
+        self.admission.restore(self.client, session.admission)
+        for channel in session.channels:
+            self.clients.join(self.client, channel)
+
+        # messages from before the session started were never meant for this client
+        since = max(self.payload.last_seq, session.opened_at)
+        # direct messages that came while the user was away wait in the mailbox, replaying them would duplicate
+        direct = self.history.since(private_channel(session.user_id), since)
+        entries = heapq.merge(
+            *(self.history.since(channel, since) for channel in (
+                GENERAL_CHANNEL, *map(public_channel, session.channels),
+            )),
+            itertools.takewhile(lambda entry: entry[0] <= session.left_at, direct),
+        )
+        frames = [data for _, data in entries]
+        if frames:
+            await self.client.send_encoded_many(frames)
+        await self.mailbox.flush(self.client)
+        self.sessions.open(self.client)
+        self.logger.info(
+            "'%s' resumed the session of '%s', %s missed messages replayed", old_id, session.user_id, len(frames),
+        )
+
+
+class SessionErrorHandler(BaseErrorHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        self.logger.info("'%s' can't resume the session: %s", self.client.user.id, self.error)
+        payload = ErrorNotificationPayload(text=str(self.error), created_at=dt.datetime.now(dt.UTC))
+        await self.client.send(ErrorNotificationFrame(payload=payload))
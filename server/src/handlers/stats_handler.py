@@ -0,0 +1,31 @@
+import datetime as dt
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+from server.src.metrics import Metrics
+from shared.schemas.notifications import StatsNotificationFrame, StatsNotificationPayload
+
+
+class StatsHandler(BaseHandler):
+    metrics: Metrics = Metrics.get_current()
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        totals = self.metrics.transport_totals()
+        depths = self.metrics.outbound_depths()
+        payload = StatsNotificationPayload(
+            clients=len(depths),
+            outbound_queue_depth=sum(depths),
+            frames_in=totals.frames_in,
+            frames_out=totals.frames_out,
+            bytes_in=totals.bytes_in,
+            bytes_out=totals.bytes_out,
+            loop_lag_p99=self.metrics.loop_lag.quantile(0.99),
+            handler_latency_p99={
+                action: histogram.quantile(0.99) for action, histogram in self.metrics.handler_latency.items()
+            },
+            created_at=dt.datetime.now(dt.UTC),
+        )
+        await self.client.send(StatsNotificationFrame(payload=payload))
@@ -0,0 +1,92 @@
+import datetime as dt
+from typing import override
+
+from server.src.handlers.base_error_handler import BaseErrorHandler
+from server.src.handlers.base_handler import BaseHandler
+from server.src.transfers import TransferError, TransferRelay
+from shared.schemas.actions import FileAckPayload, FileChunkPayload, FileEndPayload, FileOfferPayload
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload, \
+    FileChunkNotificationFrame, FileChunkNotificationPayload, FileOfferNotificationFrame, \
+    FileOfferNotificationPayload
+
+
+class TransferHandler(BaseHandler):
+    relay: TransferRelay = TransferRelay.get_current()
+
+    __slots__ = ()
+
+
+class TransferErrorHandler(BaseErrorHandler):
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        self.logger.info("Transfer of '%s' failed: %s", self.client.user.id, self.error)
+        payload = ErrorNotificationPayload(text=str(self.error), created_at=dt.datetime.now(dt.UTC))
+        await self.client.send(ErrorNotificationFrame(payload=payload))
+
+
+class FileOfferHandler(TransferHandler):
+    payload: FileOfferPayload
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        recipients = []
+        for user_id in dict.fromkeys(self.payload.to):
+            recipient = self.clients.get(user_id)
+            if recipient is None or recipient is self.client:
+                raise TransferError(f"User '{user_id}' can't receive files from you")
+            recipients.append(recipient)
+        self.relay.offer(self.payload.transfer_id, self.client, recipients, self.payload.size)
+        self.logger.info(
+            "'%s' offers '%s' (%s bytes) to %s users",
+            self.client.user.id, self.payload.name, self.payload.size, len(recipients),
+        )
+        payload = FileOfferNotificationPayload(
+            transfer_id=self.payload.transfer_id,
+            sender=self.client.user.id,
+            name=self.payload.name,
+            size=self.payload.size,
+        )
+        data = self.client.encode(FileOfferNotificationFrame(payload=payload))
+        for recipient in recipients:
+            await recipient.send_encoded(data)
+
+
+class FileChunkHandler(TransferHandler):
+    payload: FileChunkPayload
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        # encoded once and shared by every recipient, the server never decodes the chunk itself
+        payload = FileChunkNotificationPayload(
+            transfer_id=self.payload.transfer_id,
+            seq=self.payload.seq,
+            data=self.payload.data,
+        )
+        data = self.client.encode(FileChunkNotificationFrame(payload=payload))
+        self.relay.relay(self.client, self.payload.transfer_id, self.payload.seq, data)
+
+
+class FileAckHandler(TransferHandler):
+    payload: FileAckPayload
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        self.relay.acknowledge(self.client, self.payload.transfer_id, self.payload.seq)
+
+
+class FileEndHandler(TransferHandler):
+    payload: FileEndPayload
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        self.relay.end(self.client, self.payload.transfer_id, self.payload.cancelled)
@@ -1,14 +1,12 @@
 import datetime as dt
 from typing import override
 
-from pydantic import TypeAdapter
-
 from server.src.handlers.base_handler import BaseHandler
 from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
 
 
 class UnknownActionHandler(BaseHandler):
-    validator = TypeAdapter(dict)
+    __slots__ = ()
 
     @override
     async def handle(self) -> None:
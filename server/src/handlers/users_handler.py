@@ -0,0 +1,21 @@
+from typing import override
+
+from server.src.handlers.base_handler import BaseHandler
+from server.src.presence import Presence
+from shared.schemas.actions import UsersPayload
+
+
+class UsersHandler(BaseHandler):
+    payload: UsersPayload
+    presence: Presence = Presence.get_current()
+
+    __slots__ = ()
+
+    @override
+    async def handle(self) -> None:
+        # subscribing and taking the snapshot in one step leaves no gap between its version and the first delta
+        if self.payload.subscribe:
+            self.presence.subscribe(self.client)
+        else:
+            self.presence.unsubscribe(self.client)
+        await self.client.send_encoded(self.presence.snapshot())
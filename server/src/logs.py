@@ -0,0 +1,96 @@
+import copy
+import logging
+import logging.config
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import override
+
+from server.src.settings import LogMode, ServerSettings
+
+EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class SamplingFilter(logging.Filter):
+    """Passes only a share of records below WARNING."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self._rate = rate
+
+    @override
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self._rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket over records below WARNING, refilled at `per_second` and holding a second's worth."""
+
+    def __init__(self, per_second: float) -> None:
+        super().__init__()
+        self._rate = per_second
+        self._tokens = per_second
+        self._updated_at = time.monotonic()
+
+    @override
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self._rate, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    def __init__(self, records: queue.Queue) -> None:
+        super().__init__(records)
+        self.dropped = 0
+
+    @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # args and the traceback may change under the listener thread, so they are turned into text here. The rest
+        # of the formatting, which the stock handler also does on the caller's thread, is left to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    @override
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(settings: ServerSettings) -> QueueListener | None:
+    logging.config.dictConfig(settings.logging)
+    for logger in (logging.getLogger(), *logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger):
+            logger.filters = [
+                item for item in logger.filters if not isinstance(item, (SamplingFilter, RateLimitFilter))
+            ]
+    for name, rate in settings.log_sampling.items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
+    for name, per_second in settings.log_rate_limits.items():
+        logging.getLogger(name).addFilter(RateLimitFilter(per_second))
+
+    if settings.log_mode is not LogMode.QUEUE:
+        return None
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    for handler in handlers:
+        root.removeHandler(handler)
+    records: queue.Queue[logging.LogRecord] = queue.Queue(settings.log_queue_size)
+    root.addHandler(DeferredQueueHandler(records))
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
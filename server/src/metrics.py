@@ -0,0 +1,164 @@
+import dataclasses
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Mapping, Self
+
+from server.src.models.client import Client, ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.types import UserId
+from shared.transport import TransportStats
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    __slots__ = ('_bounds', '_counts', '_sum')
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._bounds = bounds
+        self._counts = array('Q', bytes(8 * (len(bounds) + 1)))
+        self._sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-th observation, the last finite bound for the overflow bucket.
+        An empty histogram has no quantiles, 0.0 stands for them.
+        """
+        count = self.count
+        if not count:
+            return 0.0
+        rank, seen = q * count, 0
+        for bound, count in zip(self._bounds, self._counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self._bounds[-1]
+
+    def render(self, name: str, labels: str = '') -> Iterator[str]:
+        prefix = f'{labels},' if labels else ''
+        cumulative = 0
+        for bound, count in zip(self._bounds, self._counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        cumulative += self._counts[-1]
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}'
+        suffix = f'{{{labels}}}' if labels else ''
+        yield f'{name}_sum{suffix} {self._sum}'
+        yield f'{name}_count{suffix} {cumulative}'
+
+
+class Metrics:
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        self._clients = ClientManager.get_current()
+        self._handler_latency: dict[str, Histogram] = {}
+        self._loop_lag = Histogram()
+        self._retired = TransportStats()
+        self._rejected: dict[str, int] = {}
+        self._journal_failures = 0
+
+    def __new__(cls) -> 'Metrics':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._clients = ClientManager.get_current()
+        self._clients.add_listener(self)
+        return self
+
+    @property
+    def handler_latency(self) -> Mapping[str, Histogram]:
+        return self._handler_latency
+
+    @property
+    def loop_lag(self) -> Histogram:
+        return self._loop_lag
+
+    def observe_request(self, action: str, seconds: float) -> None:
+        histogram = self._handler_latency.get(action)
+        if histogram is None:
+            histogram = self._handler_latency[action] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_rejection(self, reason: str) -> None:
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+
+    def observe_journal_failure(self) -> None:
+        self._journal_failures += 1
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        self._loop_lag.observe(seconds)
+
+    def on_connect(self, client: Client) -> None:
+        pass
+
+    def on_disconnect(self, client: Client) -> None:
+        stats = client.transport_stats
+        self._retired.frames_in += stats.frames_in
+        self._retired.frames_out += stats.frames_out
+        self._retired.bytes_in += stats.bytes_in
+        self._retired.bytes_out += stats.bytes_out
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        pass
+
+    def transport_totals(self) -> TransportStats:
+        totals = dataclasses.replace(self._retired)
+        for client in self._clients.all():
+            stats = client.transport_stats
+            totals.frames_in += stats.frames_in
+            totals.frames_out += stats.frames_out
+            totals.bytes_in += stats.bytes_in
+            totals.bytes_out += stats.bytes_out
+        return totals
+
+    def outbound_depths(self) -> list[int]:
+        return [client.outbound_size for client in self._clients.all()]
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        return '\n'.join(self._render()) + '\n'
+
+    def _render(self) -> Iterator[str]:
+        yield '# TYPE chat_handler_latency_seconds histogram'
+        for action, histogram in self._handler_latency.items():
+            yield from histogram.render('chat_handler_latency_seconds', f'action="{action}"')
+        yield '# TYPE chat_rejected_requests_total counter'
+        for reason, count in self._rejected.items():
+            yield f'chat_rejected_requests_total{{reason="{reason}"}} {count}'
+        yield '# TYPE chat_journal_failures_total counter'
+        yield f'chat_journal_failures_total {self._journal_failures}'
+        yield '# TYPE chat_loop_lag_seconds histogram'
+        yield from self._loop_lag.render('chat_loop_lag_seconds')
+
+        totals = self.transport_totals()
+        yield '# TYPE chat_transport_frames_total counter'
+        yield f'chat_transport_frames_total{{direction="in"}} {totals.frames_in}'
+        yield f'chat_transport_frames_total{{direction="out"}} {totals.frames_out}'
+        yield '# TYPE chat_transport_bytes_total counter'
+        yield f'chat_transport_bytes_total{{direction="in"}} {totals.bytes_in}'
+        yield f'chat_transport_bytes_total{{direction="out"}} {totals.bytes_out}'
+
+        depths = self.outbound_depths()
+        yield '# TYPE chat_clients gauge'
+        yield f'chat_clients {len(depths)}'
+        yield '# TYPE chat_outbound_queue_depth gauge'
+        yield f'chat_outbound_queue_depth {sum(depths)}'
+        yield '# TYPE chat_outbound_queue_depth_max gauge'
+        yield f'chat_outbound_queue_depth_max {max(depths, default=0)}'
@@ -1,2 +1,3 @@
-from .client import Client, ClientManager
+from .client import Client, ClientListener, ClientManager, DetachedClient, UsernameTakenError
+from .history import GENERAL_CHANNEL, HistoryStore, private_channel, public_channel
 from .user import User
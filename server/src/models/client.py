@@ -1,51 +1,251 @@
 import asyncio
 import logging
+import time
 from logging import Logger
-from typing import Set, Self
+from typing import AbstractSet, Protocol, Self, ValuesView
 
 from server.src.models.user import User
-from server.src.utils import usernames_generator
+from server.src.settings import OverflowPolicy, ServerSettings
+from server.src.utils import UserIdAllocator
 from shared.schemas.notifications import NotificationFrame
-from shared.schemas.types import UserId
-from shared.transport import DataTransport
+from shared.schemas.types import ChannelName, UserId
+from shared.transport import (
+    DataTransport,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_COMPRESSION_THRESHOLD,
+    DEFAULT_MAX_FRAME_SIZE,
+    Framing,
+    shared_frames,
+    TransportFlags,
+    TransportStats,
+)
 
 type LoggerLike = Logger | logging.LoggerAdapter
 
 
+class UsernameTakenError(ValueError):
+    pass
+
+
 class Client:
+    __slots__ = (
+        '_transport', '_supported_flags', '_user', '_outbound', '_queue_size', '_overflow_policy',
+        '_write_batch_size', '_write_coalesce_window', '_wakeup', '_writer_task', '_channels', '_last_seen',
+        '_named_at', '_credited',
+    )
 
     def __init__(
         self,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
-        user: User
+        user: User,
+        queue_size: int = 1024,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+        write_batch_size: int = 1,
+        write_coalesce_window: float = 0.0,
+        compression: bool = True,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
     ) -> None:
-        self._transport = DataTransport(writer=writer, reader=reader)
+        self._transport = DataTransport(
+            writer=writer,
+            reader=reader,
+            max_frame_size=max_frame_size,
+            compression_level=compression_level,
+            compression_threshold=compression_threshold,
+        )
+        self._supported_flags = TransportFlags.LENGTH_FRAMING
+        if compression:
+            self._supported_flags |= TransportFlags.COMPRESSION
         self._user = user
+        # a bare list and a future only while the writer waits, an asyncio.Queue costs ~3 KiB per connection
+        self._outbound: list[bytes] = []
+        # ids of queued frames already bounded by a credit window, the overflow policy leaves them alone
+        self._credited: set[int] | None = None
+        self._queue_size = queue_size
+        self._overflow_policy = overflow_policy
+        self._write_batch_size = write_batch_size
+        self._write_coalesce_window = write_coalesce_window
+        self._wakeup: asyncio.Future[None] | None = None
+        self._writer_task: asyncio.Task | None = None
+        self._channels: set[ChannelName] = set()
+        self._last_seen = time.monotonic()
+        # history seq when the client took its current name, a name passes between users and so do its DMs
+        self._named_at = 0
 
     @property
     def user(self) -> User:
         return self._user
 
+    @property
+    def channels(self) -> set[ChannelName]:
+        return self._channels
+
+    @property
+    def named_at(self) -> int:
+        return self._named_at
+
+    @named_at.setter
+    def named_at(self, seq: int) -> None:
+        self._named_at = seq
+
+    @property
+    def last_seen(self) -> float:
+        return self._last_seen
+
+    @property
+    def framing(self) -> Framing:
+        return self._transport.framing
+
+    @property
+    def outbound_size(self) -> int:
+        return len(self._outbound)
+
+    @property
+    def transport_stats(self) -> TransportStats:
+        return self._transport.stats
+
     def __str__(self):
         return f'Client(username={self._user.id} address={self._transport})'
 
+    async def handshake(self, timeout: float) -> None:
+        await self._transport.accept(timeout, self._supported_flags)
+
+    def start(self) -> None:
+        self._writer_task = asyncio.ensure_future(self._write_outbound())
+
     async def close(self):
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
         await self._transport.close()
 
-    async def listen(self) -> str:
-        return await self._transport.receive()
+    def abort(self) -> None:
+        self._transport.abort()
+
+    async def listen(self) -> bytes:
+        data = await self._transport.receive()
+        self._last_seen = time.monotonic()
+        return data
+
+    @staticmethod
+    def encode(frame: NotificationFrame) -> bytes:
+        return DataTransport.encode(frame.model_dump_json())
 
     async def send(self, frame: NotificationFrame) -> None:
-        await self._transport.transfer(frame.model_dump_json())
+        await self.send_encoded(self.encode(frame))
+
+    async def send_encoded(self, data: bytes) -> None:
+        self.enqueue(data)
+
+    def enqueue(self, data: bytes, credited: bool = False) -> None:
+        if credited:
+            if self._credited is None:
+                self._credited = set()
+            self._credited.add(id(data))
+        elif len(self._outbound) - len(self._credited or ()) >= self._queue_size:
+            self._handle_overflow(data)
+            return
+        self._outbound.append(data)
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def send_encoded_many(self, frames: list[bytes]) -> None:
+        """Writes frames right away in a single batch, ahead of anything waiting in the outbound queue."""
+        await self._transport.transfer_encoded_many(frames)
+
+    def _handle_overflow(self, data: bytes) -> None:
+        match self._overflow_policy:
+            case OverflowPolicy.DROP_OLDEST:
+                credited = self._credited or ()
+                del self._outbound[next(i for i, frame in enumerate(self._outbound) if id(frame) not in credited)]
+                self._outbound.append(data)
+            case OverflowPolicy.DROP_NEWEST:
+                pass
+            case OverflowPolicy.DISCONNECT:
+                self._transport.abort()
+
+    async def _write_outbound(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._outbound:
+                self._wakeup = loop.create_future()
+                await self._wakeup
+                self._wakeup = None
+            if self._write_coalesce_window:
+                await asyncio.sleep(self._write_coalesce_window)
+            batch = self._outbound[:self._write_batch_size]
+            del self._outbound[:len(batch)]
+            if self._credited:
+                self._credited.difference_update(map(id, batch))
+            try:
+                if len(batch) == 1:
+                    await self._transport.transfer_encoded(batch[0])
+                else:
+                    await self._transport.transfer_encoded_many(batch)
+            except ConnectionError:
+                self._transport.abort()
+                return
+
+
+class DetachedClient:
+    """Stands in for the sender of a scheduled message restored after a restart."""
+
+    __slots__ = ('_user', '_channels')
+
+    def __init__(self, user_id: UserId) -> None:
+        self._user = User(id=user_id)
+        self._channels: set[ChannelName] = set()
+
+    @property
+    def user(self) -> User:
+        return self._user
+
+    @property
+    def channels(self) -> set[ChannelName]:
+        return self._channels
+
+    def __str__(self):
+        return f'DetachedClient(username={self._user.id})'
+
+    async def send(self, frame: NotificationFrame) -> None:
+        pass
+
+    async def send_encoded(self, data: bytes) -> None:
+        pass
+
+
+class ClientListener(Protocol):
+    def on_connect(self, client: Client) -> None:
+        ...
+
+    def on_disconnect(self, client: Client) -> None:
+        ...
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        ...
 
 
 class ClientManager:
     _instance: Self | None = None
 
     def __init__(self) -> None:
-        self._clients: Set[Client] = set()
-        self._free_usernames = usernames_generator()
+        self._clients: dict[UserId, Client] = {}
+        self._channels: dict[ChannelName, set[Client]] = {}
+        # names of disconnected users kept for them until they resume or their session expires
+        self._held: set[UserId] = set()
+        self._user_ids = UserIdAllocator()
+        self._queue_size = 1024
+        self._overflow_policy = OverflowPolicy.DROP_OLDEST
+        self._max_frame_size = DEFAULT_MAX_FRAME_SIZE
+        self._write_batch_size = 1
+        self._write_coalesce_window = 0.0
+        self._compression = True
+        self._compression_level = DEFAULT_COMPRESSION_LEVEL
+        self._compression_threshold = DEFAULT_COMPRESSION_THRESHOLD
+        self._write_buffer_limits = (64 * 1024, 16 * 1024)
+        self._listeners: list[ClientListener] = []
 
     def __new__(cls) -> 'ClientManager':
         if cls._instance is None:
@@ -58,19 +258,136 @@ class ClientManager:
             return cls()
         return cls._instance
 
+    def configure(self, settings: ServerSettings) -> Self:
+        self._queue_size = settings.outbound_queue_size
+        self._overflow_policy = settings.outbound_overflow_policy
+        self._max_frame_size = settings.max_frame_size
+        self._write_batch_size = settings.write_batch_size
+        self._write_coalesce_window = settings.write_coalesce_us / 1_000_000
+        self._compression = settings.compression
+        self._compression_level = settings.compression_level
+        self._compression_threshold = settings.compression_threshold
+        self._write_buffer_limits = (settings.write_buffer_high, settings.write_buffer_low)
+        self._user_ids = UserIdAllocator(offset=settings.worker_id, stride=settings.workers)
+        return self
+
+    def add_listener(self, listener: ClientListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ClientListener) -> None:
+        self._listeners.remove(listener)
+
     def create(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Client:
-        generated_id = UserId(next(self._free_usernames))
-        user = User(id=generated_id)
-        client = Client(reader=reader, writer=writer, user=user)
-        self._clients.add(client)
+        writer.transport.set_write_buffer_limits(*self._write_buffer_limits)
+        user = User(id=self._user_ids.acquire())
+        client = Client(
+            reader=reader,
+            writer=writer,
+            user=user,
+            queue_size=self._queue_size,
+            overflow_policy=self._overflow_policy,
+            max_frame_size=self._max_frame_size,
+            write_batch_size=self._write_batch_size,
+            write_coalesce_window=self._write_coalesce_window,
+            compression=self._compression,
+            compression_level=self._compression_level,
+            compression_threshold=self._compression_threshold,
+        )
+        self._clients[user.id] = client
+        for listener in self._listeners:
+            listener.on_connect(client)
         return client
 
-    def get(self, username: str) -> Client | None:
-        return next(filter(lambda client: client.user.username == username, self._clients), None)
+    def get(self, user_id: UserId) -> Client | None:
+        return self._clients.get(user_id)
+
+    def ensure_available(self, user_id: UserId) -> None:
+        if user_id in self._clients or user_id in self._held or self._user_ids.is_reserved(user_id):
+            raise UsernameTakenError(f"Username '{user_id}' is already taken")
+
+    def rename(self, client: Client, new_id: UserId) -> None:
+        self.ensure_available(new_id)
+        self._rebind(client, new_id)
+
+    def is_generated(self, user_id: UserId) -> bool:
+        """Whether the name is one handed out on connect, those are recycled and belong to nobody once released."""
+        return self._user_ids.is_reserved(user_id)
+
+    def hold(self, user_id: UserId) -> None:
+        """Keeps the name of a disconnecting user from anyone else, must be called from `on_disconnect`."""
+        self._held.add(user_id)
+
+    def is_held(self, user_id: UserId) -> bool:
+        return user_id in self._held
+
+    def release(self, user_id: UserId) -> None:
+        if user_id in self._held:
+            self._held.discard(user_id)
+            self._user_ids.release(user_id)
+
+    def resume(self, client: Client, user_id: UserId) -> None:
+        """Gives a reconnected client the name held for it."""
+        if user_id not in self._held:
+            raise UsernameTakenError(f"Username '{user_id}' is not held")
+        self._held.discard(user_id)
+        self._rebind(client, user_id)
+
+    def _rebind(self, client: Client, new_id: UserId) -> None:
+        del self._clients[client.user.id]
+        self._user_ids.release(client.user.id)
+        old_id, client.user.id = client.user.id, new_id
+        self._clients[new_id] = client
+        for listener in self._listeners:
+            listener.on_rename(client, old_id)
 
     async def drop(self, client: Client) -> None:
+        if self._clients.get(client.user.id) is client:
+            del self._clients[client.user.id]
+            # listeners see the channels the client was in
+            for listener in self._listeners:
+                listener.on_disconnect(client)
+            for channel in list(client.channels):
+                self.leave(client, channel)
+            if client.user.id not in self._held:
+                self._user_ids.release(client.user.id)
         await client.close()
-        self._clients.remove(client)
 
-    def all(self) -> Set[Client]:
-        return self._clients
+    def all(self) -> ValuesView[Client]:
+        return self._clients.values()
+
+    async def broadcast(self, data: bytes) -> None:
+        # every compressing recipient gets the same bytes, so the frame is deflated once instead of per connection
+        shared_frames.share(data)
+        for client in self._clients.values():
+            await client.send_encoded(data)
+
+    def join(self, client: Client, channel: ChannelName) -> bool:
+        if channel in client.channels:
+            return False
+        members = self._channels.get(channel)
+        if members is None:
+            members = self._channels[channel] = set()
+        members.add(client)
+        client.channels.add(channel)
+        return True
+
+    def leave(self, client: Client, channel: ChannelName) -> bool:
+        if channel not in client.channels:
+            return False
+        client.channels.discard(channel)
+        members = self._channels[channel]
+        members.discard(client)
+        if not members:
+            del self._channels[channel]
+        return True
+
+    def members(self, channel: ChannelName) -> AbstractSet[Client]:
+        return self._channels.get(channel, frozenset())
+
+    async def publish(self, channel: ChannelName, data: bytes) -> None:
+        members = self.members(channel)
+        if len(members) > 1:
+            shared_frames.share(data)
+        for client in members:
+            await client.send_encoded(data)
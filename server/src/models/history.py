@@ -0,0 +1,177 @@
+import itertools
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator, Self
+
+from server.src.models.client import Client, ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.notifications import NotificationFrame
+from shared.schemas.types import ChannelName, UserId
+
+if TYPE_CHECKING:
+    from server.src.models.journal import Journal
+
+GENERAL_CHANNEL = 'general'
+PUBLIC_CHANNEL_PREFIX = '#'
+
+# frames are encoded with `seq` as their last field
+SEQ_FIELD = b',"seq":'
+
+type HistoryEntry = tuple[int, bytes]
+
+
+def private_channel(user_id: UserId) -> str:
+    return f'@{user_id}'
+
+
+def public_channel(channel: ChannelName) -> str:
+    return f'{PUBLIC_CHANNEL_PREFIX}{channel}'
+
+
+class RingBuffer:
+    __slots__ = ('_capacity', '_seqs', '_frames', '_start', '_size')
+
+    def __init__(self, capacity: int) -> None:
+        # slots are added as the buffer fills up, most channels never see `capacity` messages
+        self._capacity = capacity
+        self._seqs = array('Q')
+        self._frames: list[bytes] = []
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, seq: int, data: bytes) -> None:
+        if self._size < self._capacity:
+            # the start only moves once the buffer is full, until then it grows at the end
+            self._seqs.append(seq)
+            self._frames.append(data)
+            self._size += 1
+            return
+        index = self._start
+        self._start = (self._start + 1) % self._capacity
+        self._seqs[index] = seq
+        self._frames[index] = data
+
+    def last(self, count: int) -> Iterator[HistoryEntry]:
+        return self._iterate(max(0, self._size - count))
+
+    def since(self, seq: int) -> Iterator[HistoryEntry]:
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._seqs[(self._start + middle) % self._capacity] <= seq:
+                low = middle + 1
+            else:
+                high = middle
+        return self._iterate(low)
+
+    def _iterate(self, offset: int) -> Iterator[HistoryEntry]:
+        for position in range(offset, self._size):
+            index = (self._start + position) % self._capacity
+            yield self._seqs[index], self._frames[index]
+
+
+class HistoryStore:
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        self._channels: dict[str, RingBuffer] = {}
+        self._seqs = itertools.count(1)
+        self._last_seq = 0
+        self._capacity = 100
+        self._max_channels = 10_000
+        self._journal: 'Journal | None' = None
+
+    def __new__(cls) -> 'HistoryStore':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings, journal: 'Journal | None' = None) -> Self:
+        self._capacity = settings.history_size
+        self._max_channels = settings.history_channels
+        self._journal = journal
+        ClientManager.get_current().add_listener(self)
+        return self
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def record(self, frame: NotificationFrame, *channels: str) -> bytes:
+        frame.seq = self._last_seq = next(self._seqs)
+        data = Client.encode(frame)
+        self._append(frame.seq, data, channels)
+        return data
+
+    def record_relayed(self, data: bytes, *channels: str) -> bytes:
+        """Records a frame encoded by another worker, only its seq is swapped for a local one."""
+        seq = self._last_seq = next(self._seqs)
+        head, _, _ = data.rpartition(SEQ_FIELD)
+        data = b"%b%b%d}\n" % (head, SEQ_FIELD, seq)
+        self._append(seq, data, channels)
+        return data
+
+    def _append(self, seq: int, data: bytes, channels: tuple[str, ...]) -> None:
+        channels = tuple(dict.fromkeys(channels))
+        for channel in channels:
+            self._buffer(channel).append(seq, data)
+        if self._journal is not None and channels:
+            self._journal.append_frame(seq, channels, data)
+
+    def restore(self, channel: str, entries: Iterable[HistoryEntry]) -> None:
+        buffer = self._buffer(channel)
+        for seq, data in entries:
+            buffer.append(seq, data)
+
+    def continue_after(self, seq: int) -> None:
+        self._seqs = itertools.count(seq + 1)
+        self._last_seq = seq
+
+    def on_connect(self, client: Client) -> None:
+        client.named_at = self._last_seq
+
+    def on_disconnect(self, client: Client) -> None:
+        pass
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        client.named_at = self._last_seq
+        # private history is only shown from when a name was taken, nobody can see what is left under the old one
+        self.forget(private_channel(old_id))
+
+    def forget(self, channel: str) -> None:
+        self._channels.pop(channel, None)
+
+    def _buffer(self, channel: str) -> RingBuffer:
+        if channel == GENERAL_CHANNEL:
+            buffer = self._channels.get(channel)
+            if buffer is None:
+                buffer = self._channels[channel] = RingBuffer(self._capacity)
+            return buffer
+        # the other channels are kept in the order they were last written to, the stalest one goes first
+        buffer = self._channels.pop(channel, None)
+        if buffer is None:
+            if len(self._channels) >= self._max_channels:
+                del self._channels[next(name for name in self._channels if name != GENERAL_CHANNEL)]
+            buffer = RingBuffer(self._capacity)
+        self._channels[channel] = buffer
+        return buffer
+
+    def last(self, channel: str, count: int) -> Iterator[HistoryEntry]:
+        buffer = self._channels.get(channel)
+        return buffer.last(count) if buffer is not None else iter(())
+
+    def since(self, channel: str, seq: int) -> Iterator[HistoryEntry]:
+        buffer = self._channels.get(channel)
+        return buffer.since(seq) if buffer is not None else iter(())
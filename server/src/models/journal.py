@@ -0,0 +1,307 @@
+import asyncio
+import itertools
+import logging
+import mmap
+import os
+import queue
+import struct
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import BinaryIO, Iterator, Self, override
+
+from server.src.metrics import Metrics
+from server.src.models.history import HistoryEntry, HistoryStore
+from server.src.services.base import BackgroundService
+from server.src.settings import ServerSettings
+from shared.schemas.types import UserId
+
+RECORD_HEADER = struct.Struct('!BQHI')
+RECORD_TRAILER = struct.Struct('!I')
+SCHEDULE_HEADER = struct.Struct('!d')
+CHANNEL_SEPARATOR = '\x00'
+SEGMENT_GLOB = 'segment-*.log'
+
+
+class JournalRecordTypes(IntEnum):
+    FRAME = 1
+    SCHEDULE = 2
+    DONE = 3
+
+
+type JournalRecord = tuple[JournalRecordTypes, int, bytes, bytes]
+
+
+def encode_record(kind: JournalRecordTypes, id: int, key: bytes, data: bytes) -> bytes:
+    # the trailing size lets replay walk a segment from its end without reading it from the start
+    size = RECORD_HEADER.size + len(key) + len(data) + RECORD_TRAILER.size
+    return b''.join((RECORD_HEADER.pack(kind, id, len(key), len(data)), key, data, RECORD_TRAILER.pack(size)))
+
+
+def segment_path(directory: Path, index: int) -> Path:
+    return directory / f'segment-{index:08d}.log'
+
+
+@dataclass(slots=True)
+class PendingMessage:
+    id: int
+    when: float
+    sender: UserId
+    frame: bytes
+
+
+class Journal(BackgroundService):
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._directory: Path | None = None
+        self._segment_size = 64 * 1024 * 1024
+        self._segments = 16
+        self._fsync_interval = 0.05
+        self._records: queue.SimpleQueue[JournalRecord | None] = queue.SimpleQueue()
+        self._ids = itertools.count(1)
+        self._pending: list[PendingMessage] = []
+        self._tail: tuple[Path, int] | None = None
+        self._failed = False
+        self._history = HistoryStore.get_current()
+        self._logger = logging.getLogger('journal')
+
+    def __new__(cls) -> 'Journal':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._directory = settings.journal_dir
+        if self._directory is not None and settings.workers > 1:
+            self._directory = self._directory / f'worker-{settings.worker_id}'
+        self._segment_size = settings.journal_segment_size
+        self._segments = settings.journal_segments
+        self._fsync_interval = settings.journal_fsync_interval
+        self._history = HistoryStore.get_current()
+        return self
+
+    @property
+    def enabled(self) -> bool:
+        return self._directory is not None
+
+    def pending(self) -> list[PendingMessage]:
+        """Scheduled messages that were neither sent nor cancelled before the last shutdown."""
+        return self._pending
+
+    def append_frame(self, seq: int, channels: tuple[str, ...], data: bytes) -> None:
+        if not self._failed:
+            self._records.put((JournalRecordTypes.FRAME, seq, CHANNEL_SEPARATOR.join(channels).encode(), data))
+
+    def schedule(self, when: float, sender: UserId, frame: bytes) -> int:
+        id = next(self._ids)
+        if not self._failed:
+            self._records.put((JournalRecordTypes.SCHEDULE, id, sender.encode(), SCHEDULE_HEADER.pack(when) + frame))
+        return id
+
+    def complete(self, id: int) -> None:
+        if not self._failed:
+            self._records.put((JournalRecordTypes.DONE, id, b'', b''))
+
+    @override
+    async def start(self) -> None:
+        if self._directory is None:
+            return
+        self._directory.mkdir(parents=True, exist_ok=True)
+        started_at = time.perf_counter()
+        channels, last_seq, last_id, self._pending = await asyncio.to_thread(self._replay)
+        for channel, entries in channels.items():
+            self._history.restore(channel, reversed(entries))
+        self._history.continue_after(last_seq)
+        self._ids = itertools.count(last_id + 1)
+        self._logger.info(
+            'Replayed %s channels and %s scheduled messages in %.3f s',
+            len(channels), len(self._pending), time.perf_counter() - started_at,
+        )
+        await super().start()
+
+    @override
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._records.put(None)
+        await self._task
+        self._task = None
+
+    @override
+    async def _run(self) -> None:
+        try:
+            await asyncio.to_thread(self._write_loop)
+        except Exception:
+            # records are dropped from now on instead of piling up in memory behind a dead writer
+            self._logger.exception('Journal writer failed, nothing is persisted until restart')
+            self._failed = True
+            self._records = queue.SimpleQueue()
+            Metrics.get_current().observe_journal_failure()
+
+    def _existing_segments(self) -> list[Path]:
+        return sorted(self._directory.glob(SEGMENT_GLOB))
+
+    def _replay(self) -> tuple[dict[str, list[HistoryEntry]], int, int, list[PendingMessage]]:
+        capacity = self._history.capacity
+        channels: dict[str, list[HistoryEntry]] = {}
+        keys: dict[bytes, list[list[HistoryEntry]]] = {}
+        done: set[int] = set()
+        pending: dict[int, PendingMessage] = {}
+        last_seq = last_id = 0
+        self._tail = None
+        for path in reversed(self._existing_segments()):
+            with path.open('rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    self._tail = self._tail or (path, 0)
+                    continue
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    valid_end = self._valid_end(path, buffer)
+                    self._tail = self._tail or (path, valid_end)
+                    for kind, id, key, start, end in self._read_backwards(buffer, valid_end):
+                        match kind:
+                            case JournalRecordTypes.FRAME:
+                                # seqs only grow, so the newest frame carries the highest one
+                                last_seq = last_seq or id
+                                targets = keys.get(key)
+                                if targets is None:
+                                    targets = keys[key] = [
+                                        channels.setdefault(channel, [])
+                                        for channel in key.decode().split(CHANNEL_SEPARATOR)
+                                    ]
+                                frame = None
+                                for entries in targets:
+                                    if len(entries) < capacity:
+                                        frame = frame or buffer[start:end]
+                                        entries.append((id, frame))
+                            case JournalRecordTypes.SCHEDULE:
+                                last_id = max(last_id, id)
+                                if id not in done and id not in pending:
+                                    when, = SCHEDULE_HEADER.unpack_from(buffer, start)
+                                    frame = buffer[start + SCHEDULE_HEADER.size:end]
+                                    pending[id] = PendingMessage(id, when, UserId(key.decode()), frame)
+                            case JournalRecordTypes.DONE:
+                                last_id = max(last_id, id)
+                                done.add(id)
+        return channels, last_seq, last_id, sorted(pending.values(), key=lambda message: message.when)
+
+    @staticmethod
+    def _read_backwards(buffer: mmap.mmap, end: int) -> Iterator[tuple[int, int, bytes, int, int]]:
+        """Yields kind, id, key and the bounds of the data, newest record first."""
+        unpack_trailer, unpack_header = RECORD_TRAILER.unpack_from, RECORD_HEADER.unpack_from
+        trailer_size, header_size = RECORD_TRAILER.size, RECORD_HEADER.size
+        while end > 0:
+            end -= unpack_trailer(buffer, end - trailer_size)[0]
+            kind, id, key_size, data_size = unpack_header(buffer, end)
+            data_start = end + header_size + key_size
+            yield kind, id, buffer[end + header_size:data_start], data_start, data_start + data_size
+
+    def _valid_end(self, path: Path, buffer: mmap.mmap) -> int:
+        """Offset right after the last whole record, a crash can leave a torn one at the end of the newest segment."""
+        end = len(buffer)
+        if end >= RECORD_TRAILER.size:
+            size, = RECORD_TRAILER.unpack_from(buffer, end - RECORD_TRAILER.size)
+            if RECORD_HEADER.size + RECORD_TRAILER.size <= size <= end:
+                _, _, key_size, data_size = RECORD_HEADER.unpack_from(buffer, end - size)
+                if RECORD_HEADER.size + key_size + data_size + RECORD_TRAILER.size == size:
+                    return end
+
+        offset = 0
+        while offset + RECORD_HEADER.size <= end:
+            _, _, key_size, data_size = RECORD_HEADER.unpack_from(buffer, offset)
+            size = RECORD_HEADER.size + key_size + data_size + RECORD_TRAILER.size
+            trailer_at = offset + size - RECORD_TRAILER.size
+            if offset + size > end or RECORD_TRAILER.unpack_from(buffer, trailer_at)[0] != size:
+                break
+            offset += size
+        self._logger.warning('Dropping %s bytes of a torn record at the end of %s', end - offset, path.name)
+        return offset
+
+    def _write_loop(self) -> None:
+        pending = {
+            message.id: encode_record(
+                JournalRecordTypes.SCHEDULE, message.id, message.sender.encode(),
+                SCHEDULE_HEADER.pack(message.when) + message.frame,
+            )
+            for message in self._pending
+        }
+        index, file, written = self._open_tail(pending)
+        try:
+            dirty, synced_at, stopped = False, time.monotonic(), False
+            while not stopped:
+                records, stopped = self._drain(self._fsync_interval if dirty else None)
+                if records:
+                    written += self._write_records(file, records, pending)
+                    dirty = True
+                if written >= self._segment_size:
+                    self._sync(file)
+                    file.close()
+                    index += 1
+                    file, written = self._open_segment(index, pending)
+                    dirty, synced_at = True, time.monotonic()
+                elif dirty and (stopped or time.monotonic() - synced_at >= self._fsync_interval):
+                    self._sync(file)
+                    dirty, synced_at = False, time.monotonic()
+            self._sync(file)
+        finally:
+            file.close()
+
+    def _open_tail(self, pending: dict[int, bytes]) -> tuple[int, BinaryIO, int]:
+        """Reopens the newest segment found by replay, or starts the next one when it is full."""
+        if self._tail is not None and self._tail[1] < self._segment_size:
+            # the scheduled messages are already in there, only a torn record left by a crash has to go
+            path, written = self._tail
+            os.truncate(path, written)
+            return int(path.stem.split('-')[1]), path.open('ab'), written
+        index = int(self._tail[0].stem.split('-')[1]) + 1 if self._tail is not None else 0
+        return index, *self._open_segment(index, pending)
+
+    def _drain(self, timeout: float | None) -> tuple[list[JournalRecord], bool]:
+        """Waits up to `timeout` for records and takes everything queued, the flag tells whether stop was asked."""
+        try:
+            batch = [self._records.get(timeout=timeout)]
+        except queue.Empty:
+            batch = []
+        while True:
+            try:
+                batch.append(self._records.get_nowait())
+            except queue.Empty:
+                break
+        records = [record for record in batch if record is not None]
+        return records, len(records) < len(batch)
+
+    @staticmethod
+    def _write_records(file: BinaryIO, records: list[JournalRecord], pending: dict[int, bytes]) -> int:
+        chunks = []
+        for record in records:
+            chunk = encode_record(*record)
+            if record[0] is JournalRecordTypes.SCHEDULE:
+                pending[record[1]] = chunk
+            elif record[0] is JournalRecordTypes.DONE:
+                pending.pop(record[1], None)
+            chunks.append(chunk)
+        data = b''.join(chunks)
+        file.write(data)
+        return len(data)
+
+    def _open_segment(self, index: int, pending: dict[int, bytes]) -> tuple[BinaryIO, int]:
+        # carrying unsent scheduled messages forward keeps them inside the segments that survive retention
+        file = segment_path(self._directory, index).open('ab')
+        data = b''.join(pending.values())
+        file.write(data)
+        for path in self._existing_segments()[:-self._segments]:
+            path.unlink()
+        return file, len(data)
+
+    @staticmethod
+    def _sync(file: BinaryIO) -> None:
+        file.flush()
+        os.fsync(file.fileno())
@@ -0,0 +1,165 @@
+import asyncio
+import bisect
+import logging
+import time
+from array import array
+from enum import Enum, auto
+from typing import Self, override
+
+from server.src.models.client import Client, ClientManager
+from server.src.services.base import BackgroundService
+from server.src.settings import ServerSettings
+from shared.schemas.types import UserId
+
+
+class Deposit(Enum):
+    KEPT = auto()
+    # larger than a single mailbox holds
+    TOO_LARGE = auto()
+    # every mailbox together holds as much as they may
+    FULL = auto()
+
+
+class UserMailbox:
+    __slots__ = ('frames', 'expires', 'size')
+
+    def __init__(self) -> None:
+        # frames are kept pre-encoded and their deadlines in a flat array, no tuple or float object per message
+        self.frames: list[bytes] = []
+        self.expires = array('d')
+        self.size = 0
+
+    def evict(self, count: int) -> int:
+        """Drops the `count` oldest frames and returns how many bytes they took."""
+        freed = sum(map(len, self.frames[:count]))
+        del self.frames[:count]
+        del self.expires[:count]
+        self.size -= freed
+        return freed
+
+
+class Mailbox(BackgroundService):
+    """Keeps direct messages to offline users until they connect, the TTL sweep runs as one background task."""
+
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._mailboxes: dict[UserId, UserMailbox] = {}
+        self._size = 0
+        self._user_size = 64 * 1024
+        self._total_size = 64 * 1024 * 1024
+        self._ttl = 24 * 60 * 60.0
+        self._sweep_interval = 60.0
+        self._logger = logging.getLogger("mailbox")
+
+    def __new__(cls) -> 'Mailbox':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._user_size = settings.mailbox_size
+        self._total_size = settings.mailbox_total_size
+        self._ttl = settings.mailbox_ttl
+        self._sweep_interval = settings.mailbox_sweep_interval
+        return self
+
+    @property
+    def enabled(self) -> bool:
+        return self._user_size > 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return sum(len(mailbox.frames) for mailbox in self._mailboxes.values())
+
+    def accepts(self, user_id: UserId) -> bool:
+        """
+        Whether messages to an offline user can be kept. A generated name is only kept for while its session waits
+        for a resume, afterwards it goes to a stranger.
+        """
+        if not self.enabled:
+            return False
+        clients = ClientManager.get_current()
+        return not clients.is_generated(user_id) or clients.is_held(user_id)
+
+    def deposit(self, user_id: UserId, data: bytes) -> Deposit:
+        """Stores a frame for an offline user, the result tells why it could not be kept."""
+        if len(data) > self._user_size:
+            return Deposit.TOO_LARGE
+        if self._size + len(data) > self._total_size:
+            return Deposit.FULL
+        mailbox = self._mailboxes.get(user_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[user_id] = UserMailbox()
+        if mailbox.size + len(data) > self._user_size:
+            # a full mailbox loses its oldest messages rather than the newest one
+            count, excess = 0, mailbox.size + len(data) - self._user_size
+            while excess > 0:
+                excess -= len(mailbox.frames[count])
+                count += 1
+            self._size -= mailbox.evict(count)
+        mailbox.frames.append(data)
+        mailbox.expires.append(time.monotonic() + self._ttl)
+        mailbox.size += len(data)
+        self._size += len(data)
+        return Deposit.KEPT
+
+    async def flush(self, client: Client) -> int:
+        """Writes everything kept for the client at once and returns how many frames were delivered."""
+        user_id = client.user.id
+        mailbox = self._mailboxes.get(user_id)
+        if mailbox is None:
+            return 0
+        self._size -= mailbox.evict(bisect.bisect_right(mailbox.expires, time.monotonic()))
+        frames = mailbox.frames
+        if frames:
+            try:
+                await client.send_encoded_many(frames)
+            except ConnectionError:
+                # the messages stay here for the next connection
+                return 0
+        if self._mailboxes.get(user_id) is mailbox:
+            del self._mailboxes[user_id]
+            self._size -= mailbox.size
+        return len(frames)
+
+    def discard(self, user_id: UserId) -> None:
+        mailbox = self._mailboxes.pop(user_id, None)
+        if mailbox is not None:
+            self._size -= mailbox.size
+
+    def sweep(self, now: float) -> int:
+        """Drops expired messages and returns how many there were."""
+        expired = 0
+        for user_id, mailbox in list(self._mailboxes.items()):
+            count = bisect.bisect_right(mailbox.expires, now)
+            if not count:
+                continue
+            expired += count
+            self._size -= mailbox.evict(count)
+            if not mailbox.frames:
+                del self._mailboxes[user_id]
+        return expired
+
+    @override
+    async def start(self) -> None:
+        if self.enabled:
+            await super().start()
+
+    @override
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            expired = self.sweep(time.monotonic())
+            if expired:
+                self._logger.info("Dropped %s expired messages, %s bytes are still kept", expired, self._size)
@@ -3,6 +3,6 @@ from dataclasses import dataclass
 from shared.schemas.types import UserId
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: UserId
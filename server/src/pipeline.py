@@ -0,0 +1,33 @@
+import asyncio
+from typing import Awaitable, Callable
+
+type Request = Callable[[], Awaitable[None]]
+
+
+class RequestPipeline:
+    __slots__ = ('_window', '_tail', '_tasks')
+
+    def __init__(self, size: int) -> None:
+        self._window = asyncio.Semaphore(size)
+        self._tail: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, request: Request, ordered: bool = True) -> None:
+        await self._window.acquire()
+        task = asyncio.ensure_future(self._run(request, self._tail if ordered else None))
+        if ordered:
+            self._tail = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    async def _run(self, request: Request, previous: asyncio.Task | None) -> None:
+        try:
+            if previous is not None and not previous.done():
+                await asyncio.wait((previous,))
+            await request()
+        finally:
+            self._window.release()
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Self
+
+from server.src.models.client import Client, ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.notifications import PresenceChange, PresenceEvents, PresenceNotificationFrame, \
+    PresenceNotificationPayload, UsersNotificationFrame, UsersNotificationPayload
+from shared.schemas.types import UserId
+
+
+class Presence:
+    """
+    Roster of everyone online, including users of other workers.
+    The `users` snapshot is serialized once per roster version, subscribers get the changes instead. Changes are
+    collected for `interval` seconds and go out as one delta, so a burst of joins costs one write per subscriber.
+    """
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        self._users: set[UserId] = set()
+        self._version = 0
+        self._snapshot: bytes | None = None
+        self._subscribers: set[Client] = set()
+        self._changes: list[PresenceChange] = []
+        self._interval = 0.25
+        self._flush_handle: asyncio.Handle | None = None
+
+    def __new__(cls) -> 'Presence':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._interval = settings.presence_interval
+        manager = ClientManager.get_current()
+        self._users.update(client.user.id for client in manager.all())
+        manager.add_listener(self)
+        return self
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def snapshot(self) -> bytes:
+        if self._snapshot is None:
+            payload = UsersNotificationPayload(version=self._version, users=sorted(self._users))
+            self._snapshot = Client.encode(UsersNotificationFrame(payload=payload))
+        return self._snapshot
+
+    def subscribe(self, client: Client) -> None:
+        self._subscribers.add(client)
+
+    def unsubscribe(self, client: Client) -> None:
+        self._subscribers.discard(client)
+
+    def joined(self, user_id: UserId) -> None:
+        if user_id not in self._users:
+            self._users.add(user_id)
+            self._publish(PresenceEvents.JOIN, user_id)
+
+    def left(self, user_id: UserId) -> None:
+        if user_id in self._users:
+            self._users.discard(user_id)
+            self._publish(PresenceEvents.LEAVE, user_id)
+
+    def on_connect(self, client: Client) -> None:
+        self.joined(client.user.id)
+
+    def on_disconnect(self, client: Client) -> None:
+        self._subscribers.discard(client)
+        self.left(client.user.id)
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        self._users.discard(old_id)
+        self._users.add(client.user.id)
+        self._publish(PresenceEvents.RENAME, client.user.id, old_id)
+
+    def _publish(self, event: PresenceEvents, user_id: UserId, previous: UserId | None = None) -> None:
+        self._version += 1
+        self._snapshot = None
+        if not self._subscribers and self._flush_handle is None:
+            return
+        # a pending delta has to carry every version after its first one, even with nobody subscribed right now
+        self._changes.append(PresenceChange(event=event, username=user_id, previous=previous))
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self._interval, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        changes, self._changes = self._changes, []
+        if not self._subscribers:
+            return
+        # clients subscribed during the interval already have some of these in their snapshot and skip them
+        payload = PresenceNotificationPayload(version=self._version, changes=changes)
+        data = Client.encode(PresenceNotificationFrame(payload=payload))
+        for client in self._subscribers:
+            client.enqueue(data)
@@ -1,20 +1,40 @@
 import asyncio
-import logging.config
-import uuid
+import datetime as dt
+import functools
+import math
+import logging
+import time
 from typing import Callable, Self, Type
 
+from pydantic import BaseModel, ValidationError
+
+from server.src.admission import AdmissionControl, Verdict
 from server.src.handlers.base_error_handler import BaseErrorHandler
 from server.src.handlers.base_handler import BaseHandler
-from server.src.models import ClientManager, Client
+from server.src.handlers.deferrable_handler import DeferrableHandler
+from server.src.logs import configure_logging
+from server.src.metrics import Metrics
+from server.src.cluster.bus import MessageBus
+from server.src.models import ClientManager, Client, DetachedClient, HistoryStore
+from server.src.models.journal import Journal, PendingMessage
+from server.src.models.mailbox import Mailbox
+from server.src.pipeline import RequestPipeline
+from server.src.presence import Presence
+from server.src.services import BackgroundService, IdleSweeper, LoopLagMonitor, MetricsEndpoint, Scheduler
+from server.src.sessions import Sessions
 from server.src.settings import ServerSettings
-from shared.schemas.actions import ActionFrame, ActionTypes
+from server.src.transfers import TransferRelay
+from shared.schemas.actions import ActionTypes, AnyActionFrame, action_frame_adapter
+from shared.schemas.notifications import ErrorNotificationFrame, ErrorNotificationPayload
+
+UNKNOWN_ACTION_ERRORS = frozenset({'union_tag_invalid', 'union_tag_not_found'})
 
 
 class Server:
     def __new__(cls, *args, **kwargs) -> 'Server':
-        logging_config = args[0].logging
-        logging.config.dictConfig(logging_config)
-        return super().__new__(cls)
+        instance = super().__new__(cls)
+        instance._log_listener = configure_logging(args[0])
+        return instance
 
     def __init__(
         self,
@@ -24,15 +44,43 @@ class Server:
         self._server: asyncio.Server | None = None
         self._settings = settings
         self._server_logger = logging.getLogger("server")
-        self._clients = client_manager_factory()
+        self._clients = client_manager_factory().configure(settings)
+        self._journal = Journal.get_current().configure(settings)
+        journal = self._journal if self._journal.enabled else None
+        self._history = HistoryStore.get_current().configure(settings, journal)
+        self._metrics = Metrics.get_current().configure(settings)
+        self._admission = AdmissionControl.get_current().configure(settings)
+        self._mailbox = Mailbox.get_current().configure(settings)
+        Presence.get_current().configure(settings)
+        TransferRelay.get_current().configure(settings)
+        self._sessions = Sessions.get_current().configure(settings)
         self._handlers: dict[ActionTypes, Type[BaseHandler]] = {}
-        self._clients = client_manager_factory()
         self._exception_handlers: dict[Type[Exception], Type[BaseErrorHandler]] = {}
         self._unknown_handler: Type[BaseHandler] | None = None
+        self._services: list[BackgroundService] = [
+            self._journal,
+            Scheduler.get_current().configure(),
+            MessageBus.get_current().configure(settings),
+            LoopLagMonitor(settings.loop_lag_interval),
+            IdleSweeper(settings.heartbeat_interval, settings.idle_timeout),
+            self._mailbox,
+        ]
+        if settings.metrics_port is not None:
+            self._services.append(MetricsEndpoint(settings.metrics_host, settings.metrics_port + settings.worker_id))
 
     async def start(self) -> None:
         self._server_logger.info("Starting server on %s:%s...", self._settings.host, self._settings.port)
-        self._server = await asyncio.start_server(self._main_callback, self._settings.host, self._settings.port)
+        for service in self._services:
+            await service.start()
+        for message in self._journal.pending():
+            self._resume(message)
+        self._server = await asyncio.start_server(
+            self._main_callback,
+            self._settings.host,
+            self._settings.port,
+            reuse_port=self._settings.workers > 1,
+            limit=self._settings.reader_limit,
+        )
         self._server_logger.info("Server is started")
 
     async def serve(self) -> None:
@@ -50,33 +98,128 @@ class Server:
         self._server.close()
         await self._server.wait_closed()
         self._server = None
+        for service in reversed(self._services):
+            await service.stop()
         self._server_logger.debug("Server is stopped")
+        if self._log_listener is not None:
+            self._log_listener.stop()
 
     async def _main_callback(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         client = self._clients.create(reader, writer)
-        self._server_logger.info("New connection from %s", client)
+        try:
+            await client.handshake(self._settings.handshake_timeout)
+        except ConnectionError:
+            self._server_logger.error("Handshake with %s failed", client)
+            await self._clients.drop(client)
+            return
+        client.start()
+        self._server_logger.info("New connection from %s using %s framing", client, client.framing)
+        self._sessions.open(client)
+        pipeline = None
+        if self._settings.max_inflight_requests > 1:
+            pipeline = RequestPipeline(self._settings.max_inflight_requests)
+
         while True:
             try:
                 data = await client.listen()
             except ConnectionError:
                 self._server_logger.error("Connection closed by %s", client)
+                if pipeline is not None:
+                    await pipeline.drain()
                 await self._clients.drop(client)
                 break
 
-            await self._handle_client_request(data, client)
-
-    async def _handle_client_request(self, data: str, client: Client) -> None:
-        logger = logging.LoggerAdapter(self._server_logger, extra={"request_id": str(uuid.uuid4())})
-        frame = ActionFrame.model_validate_json(data)
-
-        Handler = self._handlers.get(frame.type, self._unknown_handler)
-        handler = Handler(frame.payload, client, logger)
+            frame = await self._admit(client, data)
+            if frame is None:
+                continue
+            if pipeline is None:
+                await self._handle_client_request(frame, client)
+            else:
+                ordered = isinstance(frame, ValidationError) or frame.type not in self._settings.unordered_actions
+                await pipeline.submit(functools.partial(self._handle_client_request, frame, client), ordered)
+
+    async def _admit(self, client: Client, data: bytes) -> AnyActionFrame | ValidationError | None:
+        """Parses a frame the admission control lets through, None if it is rejected."""
+        verdict = self._admission.admit(client, data)
+        if verdict is Verdict.ADMIT:
+            frame = self._parse_request(data)
+            if isinstance(frame, ValidationError):
+                return frame
+            verdict = self._admission.recheck(client, data, frame.type)
+            if verdict is Verdict.ADMIT:
+                return frame
+        await self._reject(verdict, client)
+        return None
+
+    async def _reject(self, verdict: Verdict, client: Client) -> None:
+        self._metrics.observe_rejection(verdict.name.lower())
+        match verdict:
+            case Verdict.THROTTLE:
+                self._server_logger.warning("Throttling requests from %s", client)
+                text = "Too many requests, the following ones are dropped until you slow down"
+            case Verdict.MUTED:
+                text = f"You can't send messages for {math.ceil(self._admission.muted_for(client))} more seconds"
+            case _:
+                return
+        payload = ErrorNotificationPayload(text=text, created_at=dt.datetime.now(dt.UTC))
+        await client.send(ErrorNotificationFrame(payload=payload))
+
+    def _resume(self, message: PendingMessage) -> None:
+        frame = action_frame_adapter.validate_json(message.frame)
+        Handler = self._handlers.get(frame.type)
+        if Handler is None or not issubclass(Handler, DeferrableHandler):
+            self._server_logger.warning("Scheduled '%s' from '%s' can't be resumed", frame.type, message.sender)
+            self._journal.complete(message.id)
+            return
+        if self._clients.is_generated(message.sender):
+            # generated names don't survive a restart, the next user to get this one did not write the message
+            self._server_logger.warning("Scheduled '%s' from '%s' is dropped", frame.type, message.sender)
+            self._journal.complete(message.id)
+            return
+        handler = Handler(frame.payload, DetachedClient(message.sender), self._server_logger)
+        handler.resume(message.id, max(0.0, message.when - time.time()))
+
+    @staticmethod
+    def _parse_request(data: bytes) -> AnyActionFrame | ValidationError:
+        try:
+            return action_frame_adapter.validate_json(data)
+        except ValidationError as error:
+            return error
+
+    async def _handle_client_request(self, frame: AnyActionFrame | ValidationError, client: Client) -> None:
+        started_at = time.perf_counter()
+        payload = None
+        if isinstance(frame, ValidationError):
+            if not self._is_unknown_action(frame):
+                await self._handle_error(frame, payload, client)
+                self._metrics.observe_request('invalid', time.perf_counter() - started_at)
+                return
+            action, Handler = 'unknown', self._unknown_handler
+        else:
+            payload = frame.payload
+            action, Handler = frame.type, self._handlers.get(frame.type, self._unknown_handler)
+
+        handler = Handler(payload, client, self._server_logger)
         try:
             await handler()
         except Exception as error:
-            ExcHandler = self._exception_handlers.get(type(error), BaseErrorHandler)
-            exc_handler = ExcHandler(frame.payload, client, error, logger)
-            await exc_handler()
+            await self._handle_error(error, payload, client, handler.request_id)
+        self._metrics.observe_request(action, time.perf_counter() - started_at)
+
+    async def _handle_error(
+        self,
+        error: Exception,
+        payload: BaseModel | None,
+        client: Client,
+        request_id: int | None = None,
+    ) -> None:
+        ExcHandler = self._exception_handlers.get(type(error), BaseErrorHandler)
+        exc_handler = ExcHandler(payload, client, error, self._server_logger, request_id)
+        await exc_handler()
+
+    @staticmethod
+    def _is_unknown_action(error: ValidationError) -> bool:
+        return any(details['type'] in UNKNOWN_ACTION_ERRORS for details in error.errors(include_url=False))
 
     def on_action(self, action_type: ActionTypes, handler: Type[BaseHandler]) -> Self:
         self._handlers[action_type] = handler
@@ -89,3 +232,7 @@ class Server:
     def on_unknown_action(self, handler: Type[BaseHandler]) -> Self:
         self._unknown_handler = handler
         return self
+
+    def with_service(self, service: BackgroundService) -> Self:
+        self._services.append(service)
+        return self
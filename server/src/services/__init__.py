@@ -0,0 +1,5 @@
+from .base import BackgroundService
+from .idle_sweeper import IdleSweeper
+from .loop_lag import LoopLagMonitor
+from .metrics_endpoint import MetricsEndpoint
+from .scheduler import ScheduledEntry, Scheduler
@@ -0,0 +1,27 @@
+import asyncio
+import contextlib
+
+
+class BackgroundService:
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.is_running:
+            raise RuntimeError(f"'{self.__class__.__name__}' is already running")
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        raise NotImplementedError
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import time
+from typing import override
+
+from server.src.models.client import Client, ClientManager
+from server.src.services.base import BackgroundService
+from shared.schemas.notifications import PingNotificationFrame
+
+PING = Client.encode(PingNotificationFrame())
+
+
+class IdleSweeper(BackgroundService):
+    """Pings quiet clients and drops silent ones, one pass over all clients per heartbeat interval."""
+
+    def __init__(self, interval: float, timeout: float) -> None:
+        super().__init__()
+        self._interval = interval
+        self._timeout = timeout
+        self._clients = ClientManager.get_current()
+        self._logger = logging.getLogger("sweeper")
+
+    async def sweep(self, now: float) -> int:
+        idle = []
+        for client in self._clients.all():
+            silence = now - client.last_seen
+            if silence >= self._timeout:
+                idle.append(client)
+            elif silence >= self._interval:
+                await client.send_encoded(PING)
+        for client in idle:
+            self._logger.info("Dropping %s, silent for %.0f s", client, now - client.last_seen)
+            # a dead peer never acknowledges a graceful close, so there is nothing to wait for
+            client.abort()
+            await self._clients.drop(client)
+        return len(idle)
+
+    @override
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.sweep(time.monotonic())
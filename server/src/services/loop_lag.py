@@ -0,0 +1,20 @@
+import asyncio
+from typing import override
+
+from server.src.metrics import Metrics
+from server.src.services.base import BackgroundService
+
+
+class LoopLagMonitor(BackgroundService):
+    def __init__(self, interval: float) -> None:
+        super().__init__()
+        self._interval = interval
+        self._metrics = Metrics.get_current()
+
+    @override
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(self._interval)
+            self._metrics.observe_loop_lag(max(0.0, loop.time() - started_at - self._interval))
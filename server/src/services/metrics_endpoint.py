@@ -0,0 +1,41 @@
+import asyncio
+import contextlib
+import logging
+from typing import override
+
+from server.src.metrics import Metrics
+from server.src.services.base import BackgroundService
+
+RESPONSE_HEADER = (
+    "HTTP/1.1 200 OK\r\n"
+    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+    "Content-Length: {length}\r\n"
+    "Connection: close\r\n"
+    "\r\n"
+)
+
+
+class MetricsEndpoint(BackgroundService):
+    """Serves `Metrics.render()` to any HTTP request, which is all a Prometheus scraper or curl needs."""
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__()
+        self._host = host
+        self._port = port
+        self._metrics = Metrics.get_current()
+        self._logger = logging.getLogger("metrics")
+
+    @override
+    async def _run(self) -> None:
+        server = await asyncio.start_server(self._serve, self._host, self._port)
+        self._logger.info("Metrics are exposed on %s:%s", self._host, self._port)
+        async with server:
+            await server.serve_forever()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        with contextlib.suppress(ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            await reader.readuntil(b"\r\n\r\n")
+            body = self._metrics.render().encode()
+            writer.write(RESPONSE_HEADER.format(length=len(body)).encode() + body)
+            await writer.drain()
+        writer.close()
@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable, Hashable, Self, override
+
+from server.src.models.client import Client, ClientManager
+from server.src.services.base import BackgroundService
+from shared.schemas.types import UserId
+
+type Callback = Callable[[], Awaitable[None]]
+
+
+class ScheduledEntry:
+    __slots__ = ('id', 'when', 'owner', 'callback', 'key', 'cancelled')
+
+    def __init__(self, id: int, when: float, owner: Hashable, callback: Callback, key: Hashable | None = None) -> None:
+        self.id = id
+        self.when = when
+        self.owner = owner
+        self.callback = callback
+        self.key = key
+        self.cancelled = False
+
+
+class Scheduler(BackgroundService):
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._heap: list[tuple[float, int, ScheduledEntry]] = []
+        self._owners: dict[Hashable, dict[int, ScheduledEntry]] = {}
+        self._ids = itertools.count()
+        self._cancelled = 0
+        self._wakeup = asyncio.Event()
+        self._logger = logging.getLogger("scheduler")
+
+    def __new__(cls) -> 'Scheduler':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self) -> Self:
+        ClientManager.get_current().add_listener(self)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def schedule(
+        self, delay: float, owner: Hashable, callback: Callback, key: Hashable | None = None,
+    ) -> ScheduledEntry:
+        when = asyncio.get_running_loop().time() + delay
+        entry = ScheduledEntry(next(self._ids), when, owner, callback, key)
+        heapq.heappush(self._heap, (when, entry.id, entry))
+        self._owners.setdefault(owner, {})[entry.id] = entry
+        if self._heap[0][2] is entry:
+            self._wakeup.set()
+        return entry
+
+    def cancel(self, entry: ScheduledEntry) -> bool:
+        if entry.cancelled or not self._forget(entry):
+            return False
+        entry.cancelled = True
+        self._cancelled += 1
+        if self._cancelled > len(self._heap) // 2:
+            self._compact()
+        return True
+
+    def cancel_last(self, owner: Hashable) -> ScheduledEntry | None:
+        entries = self._owners.get(owner)
+        if not entries:
+            return None
+        entry = entries[next(reversed(entries))]
+        self.cancel(entry)
+        return entry
+
+    def cancel_all(self, owner: Hashable) -> list[ScheduledEntry]:
+        entries = list(self._owners.get(owner, {}).values())
+        for entry in entries:
+            self.cancel(entry)
+        return entries
+
+    def on_connect(self, client: Client) -> None:
+        pass
+
+    def on_disconnect(self, client: Client) -> None:
+        pass
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        # entries are owned by user names, they follow their owner to the new one
+        self.reassign(old_id, client.user.id)
+
+    def reassign(self, owner: Hashable, new_owner: Hashable) -> None:
+        entries = self._owners.pop(owner, None)
+        if not entries:
+            return
+        for entry in entries.values():
+            entry.owner = new_owner
+        # entry ids grow with time, merged entries keep `cancel_last` picking the latest one
+        merged = self._owners.get(new_owner, {}) | entries
+        self._owners[new_owner] = dict(sorted(merged.items()))
+
+    def _forget(self, entry: ScheduledEntry) -> bool:
+        entries = self._owners.get(entry.owner)
+        if entries is None or entries.pop(entry.id, None) is None:
+            return False
+        if not entries:
+            del self._owners[entry.owner]
+        return True
+
+    def _compact(self) -> None:
+        self._heap = [item for item in self._heap if not item[2].cancelled]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    def _pop_due(self, now: float) -> list[ScheduledEntry]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, entry = heapq.heappop(self._heap)
+            if entry.cancelled:
+                self._cancelled -= 1
+                continue
+            self._forget(entry)
+            due.append(entry)
+        return due
+
+    @override
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            timer: asyncio.TimerHandle | None = None
+            if self._heap:
+                timer = loop.call_at(self._heap[0][0], self._wakeup.set)
+            await self._wakeup.wait()
+            if timer is not None:
+                timer.cancel()
+            await self._fire(self._pop_due(loop.time()))
+
+    async def _fire(self, entries: list[ScheduledEntry]) -> None:
+        for entry in entries:
+            try:
+                await entry.callback()
+            except Exception:
+                self._logger.exception("Scheduled callback %s failed", entry.id)
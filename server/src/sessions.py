@@ -0,0 +1,146 @@
+import asyncio
+import secrets
+from typing import Self
+
+from server.src.admission import AdmissionControl, ClientAdmission
+from server.src.cluster.bus import MessageBus
+from server.src.models.client import Client, ClientManager
+from server.src.models.history import HistoryStore, private_channel
+from server.src.models.journal import Journal
+from server.src.models.mailbox import Mailbox
+from server.src.services.scheduler import Scheduler
+from server.src.settings import ServerSettings
+from shared.schemas.notifications import SessionNotificationFrame, SessionNotificationPayload
+from shared.schemas.types import ChannelName, SessionToken, UserId
+
+
+class SessionError(Exception):
+    pass
+
+
+class Session:
+    __slots__ = ('token', 'user_id', 'client', 'channels', 'opened_at', 'left_at', 'expiry', 'admission')
+
+    def __init__(self, token: SessionToken, client: Client, opened_at: int, admission: ClientAdmission) -> None:
+        self.token = token
+        self.user_id = client.user.id
+        self.client: Client | None = client
+        self.channels: frozenset[ChannelName] = frozenset()
+        # history sequence numbers when the session started and when its connection dropped
+        self.opened_at = opened_at
+        self.left_at = opened_at
+        self.expiry: asyncio.TimerHandle | None = None
+        # rate limits and a mute outlive the connection
+        self.admission = admission
+
+
+class Sessions:
+    """
+    Gives every connection a resume token. When a connection drops, its name and channels are kept for `grace`
+    seconds, a client that reconnects with the token within that time gets them back instead of a new identity.
+    Sessions live in the worker that issued them, so they are off when there are several workers: a reconnect lands
+    on any of them and resuming there is not supported.
+    """
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        self._tokens: dict[SessionToken, Session] = {}
+        self._clients: dict[Client, Session] = {}
+        self._grace = 60.0
+
+    def __new__(cls) -> 'Sessions':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._grace = settings.session_grace if settings.workers == 1 else 0.0
+        ClientManager.get_current().add_listener(self)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def open(self, client: Client) -> None:
+        if not self._grace:
+            return
+        token = SessionToken(secrets.token_urlsafe(16))
+        self._tokens[token] = self._clients[client] = Session(
+            token, client, client.named_at, AdmissionControl.get_current().state(client),
+        )
+        self.notify(client)
+
+    def notify(self, client: Client) -> None:
+        """Tells a client the name it has now and the token that gets it back."""
+        session = self._clients.get(client)
+        if session is None:
+            payload = SessionNotificationPayload(token=None, username=client.user.id, grace=0.0)
+        else:
+            payload = SessionNotificationPayload(token=session.token, username=client.user.id, grace=self._grace)
+        client.enqueue(Client.encode(SessionNotificationFrame(payload=payload)))
+
+    def close(self, client: Client) -> None:
+        """Ends the session of a client that leaves on purpose, its name is not kept."""
+        session = self._clients.pop(client, None)
+        if session is not None:
+            del self._tokens[session.token]
+
+    async def take(self, client: Client, token: SessionToken) -> Session:
+        """Detaches a session from its token so `client` can resume it, the caller opens a new one afterwards."""
+        session = self._tokens.get(token)
+        if session is None:
+            raise SessionError("Session is expired or unknown")
+        if session.client is client:
+            raise SessionError("Session is already resumed")
+        del self._tokens[token]
+        if session.client is not None:
+            # the old connection is half-open, the server has not noticed it is gone yet
+            session.client.abort()
+            await ClientManager.get_current().drop(session.client)
+        if session.expiry is not None:
+            session.expiry.cancel()
+        self.close(client)
+        return session
+
+    def on_connect(self, client: Client) -> None:
+        pass
+
+    def on_disconnect(self, client: Client) -> None:
+        session = self._clients.pop(client, None)
+        if session is None:
+            self._released(client.user.id)
+            return
+        session.client = None
+        session.user_id = client.user.id
+        session.channels = frozenset(client.channels)
+        session.left_at = HistoryStore.get_current().last_seq
+        ClientManager.get_current().hold(session.user_id)
+        session.expiry = asyncio.get_running_loop().call_later(self._grace, self._expire, session)
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        pass
+
+    def _expire(self, session: Session) -> None:
+        if self._tokens.get(session.token) is session:
+            del self._tokens[session.token]
+            ClientManager.get_current().release(session.user_id)
+            MessageBus.get_current().unclaim(session.user_id)
+            self._released(session.user_id)
+
+    @staticmethod
+    def _released(user_id: UserId) -> None:
+        """Drops what was left under a name nobody holds anymore, the next one to get the name is someone else."""
+        HistoryStore.get_current().forget(private_channel(user_id))
+        if not ClientManager.get_current().is_generated(user_id):
+            return
+        Mailbox.get_current().discard(user_id)
+        journal = Journal.get_current()
+        for entry in Scheduler.get_current().cancel_all(user_id):
+            if entry.key is not None:
+                journal.complete(entry.key)
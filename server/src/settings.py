@@ -1,12 +1,91 @@
-from typing import Final
+import tempfile
+from enum import StrEnum
+from pathlib import Path
+from typing import Annotated, Final, Self
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings
 
+from shared.schemas.actions import ActionTypes
+from shared.transport import SIZE_MASK
+
+
+class OverflowPolicy(StrEnum):
+    DROP_OLDEST = 'drop-oldest'
+    DROP_NEWEST = 'drop-newest'
+    DISCONNECT = 'disconnect'
+
+
+class LogMode(StrEnum):
+    SYNC = 'sync'
+    QUEUE = 'queue'
+
 
 class ServerSettings(BaseSettings):
     host: Final[str] = Field(..., alias='SERVER_HOST')
     port: Final[int] = Field(..., alias='SERVER_PORT')
+    workers: int = Field(1, alias='SERVER_WORKERS', gt=0)
+    worker_id: int = Field(0, alias='SERVER_WORKER_ID', ge=0)
+    cluster_socket: Path = Field(
+        Path(tempfile.gettempdir()) / 'chat-cluster.sock',
+        alias='SERVER_CLUSTER_SOCKET',
+    )
+    # bytes queued towards a bus peer after which relayed messages to it are dropped
+    bus_buffer_size: int = Field(4 * 1024 * 1024, alias='SERVER_BUS_BUFFER_SIZE', gt=0)
+    outbound_queue_size: int = Field(1024, alias='SERVER_OUTBOUND_QUEUE_SIZE', gt=0)
+    outbound_overflow_policy: OverflowPolicy = Field(OverflowPolicy.DROP_OLDEST, alias='SERVER_OUTBOUND_OVERFLOW_POLICY')
+    write_batch_size: int = Field(64, alias='SERVER_WRITE_BATCH_SIZE', gt=0)
+    write_coalesce_us: int = Field(0, alias='SERVER_WRITE_COALESCE_US', ge=0, le=10_000)
+    max_frame_size: int = Field(1024 * 1024, alias='SERVER_MAX_FRAME_SIZE', gt=0, le=SIZE_MASK)
+    # also the longest frame a line framed client may send
+    reader_limit: int = Field(64 * 1024, alias='SERVER_READER_LIMIT', ge=1024)
+    write_buffer_high: int = Field(64 * 1024, alias='SERVER_WRITE_BUFFER_HIGH', gt=0)
+    write_buffer_low: int = Field(16 * 1024, alias='SERVER_WRITE_BUFFER_LOW', ge=0)
+    compression: bool = Field(True, alias='SERVER_COMPRESSION')
+    compression_threshold: int = Field(256, alias='SERVER_COMPRESSION_THRESHOLD', ge=0)
+    compression_level: int = Field(6, alias='SERVER_COMPRESSION_LEVEL', ge=1, le=9)
+    handshake_timeout: float = Field(1.0, alias='SERVER_HANDSHAKE_TIMEOUT', ge=0)
+    heartbeat_interval: float = Field(15.0, alias='SERVER_HEARTBEAT_INTERVAL', gt=0)
+    idle_timeout: float = Field(45.0, alias='SERVER_IDLE_TIMEOUT', gt=0)
+    session_grace: float = Field(60.0, alias='SERVER_SESSION_GRACE', ge=0)
+    presence_interval: float = Field(0.25, alias='SERVER_PRESENCE_INTERVAL', ge=0)
+    max_inflight_requests: int = Field(1, alias='SERVER_MAX_INFLIGHT_REQUESTS', gt=0)
+    unordered_actions: frozenset[ActionTypes] = Field(
+        frozenset({ActionTypes.HELP, ActionTypes.HISTORY, ActionTypes.STATS, ActionTypes.PONG}),
+        alias='SERVER_UNORDERED_ACTIONS',
+    )
+    rate_limit: float = Field(20.0, alias='SERVER_RATE_LIMIT', ge=0)
+    rate_limit_capacity: int = Field(40, alias='SERVER_RATE_LIMIT_CAPACITY', gt=0)
+    rate_limit_capacities: dict[ActionTypes, Annotated[int, Field(gt=0)]] = Field(
+        {ActionTypes.HISTORY: 5, ActionTypes.STATS: 5, ActionTypes.USERS: 5},
+        alias='SERVER_RATE_LIMIT_CAPACITIES',
+    )
+    # file chunks are paced by the transfer window already, a chat sized rate would cap files at 640 KiB/s
+    rate_limit_rates: dict[ActionTypes, Annotated[float, Field(gt=0)]] = Field(
+        {ActionTypes.FILE_CHUNK: 2000.0, ActionTypes.FILE_ACK: 2000.0},
+        alias='SERVER_RATE_LIMIT_RATES',
+    )
+    mute_reports: int = Field(2, alias='SERVER_MUTE_REPORTS', gt=0)
+    mute_duration: float = Field(600.0, alias='SERVER_MUTE_DURATION', gt=0)
+    history_size: int = Field(100, alias='SERVER_HISTORY_SIZE', gt=0)
+    history_channels: int = Field(10_000, alias='SERVER_HISTORY_CHANNELS', gt=1)
+    transfer_window: int = Field(16, alias='SERVER_TRANSFER_WINDOW', gt=0)
+    transfers_per_client: int = Field(4, alias='SERVER_TRANSFERS_PER_CLIENT', gt=0)
+    mailbox_size: int = Field(64 * 1024, alias='SERVER_MAILBOX_SIZE', ge=0)
+    mailbox_total_size: int = Field(64 * 1024 * 1024, alias='SERVER_MAILBOX_TOTAL_SIZE', ge=0)
+    mailbox_ttl: float = Field(24 * 60 * 60, alias='SERVER_MAILBOX_TTL', gt=0)
+    mailbox_sweep_interval: float = Field(60.0, alias='SERVER_MAILBOX_SWEEP_INTERVAL', gt=0)
+    journal_dir: Path | None = Field(None, alias='SERVER_JOURNAL_DIR')
+    journal_segment_size: int = Field(64 * 1024 * 1024, alias='SERVER_JOURNAL_SEGMENT_SIZE', gt=0)
+    journal_segments: int = Field(16, alias='SERVER_JOURNAL_SEGMENTS', gt=0)
+    journal_fsync_interval: float = Field(0.05, alias='SERVER_JOURNAL_FSYNC_INTERVAL', gt=0)
+    metrics_host: str = Field('127.0.0.1', alias='SERVER_METRICS_HOST')
+    metrics_port: int | None = Field(None, alias='SERVER_METRICS_PORT')
+    loop_lag_interval: float = Field(0.1, alias='SERVER_LOOP_LAG_INTERVAL', gt=0)
+    log_mode: LogMode = Field(LogMode.SYNC, alias='SERVER_LOG_MODE')
+    log_queue_size: int = Field(10_000, alias='SERVER_LOG_QUEUE_SIZE', gt=0)
+    log_sampling: dict[str, Annotated[float, Field(ge=0, le=1)]] = Field({}, alias='SERVER_LOG_SAMPLING')
+    log_rate_limits: dict[str, Annotated[float, Field(gt=0)]] = Field({}, alias='SERVER_LOG_RATE_LIMITS')
     logging: Final[dict] = {
         'version': 1,
         'disable_existing_loggers': False,
@@ -31,3 +110,9 @@ class ServerSettings(BaseSettings):
             },
         },
     }
+
+    @model_validator(mode='after')
+    def check_write_buffer(self) -> Self:
+        if self.write_buffer_low > self.write_buffer_high:
+            raise ValueError('SERVER_WRITE_BUFFER_LOW must not exceed SERVER_WRITE_BUFFER_HIGH')
+        return self
@@ -0,0 +1,152 @@
+import math
+from typing import Self
+
+from server.src.models.client import Client, ClientManager
+from server.src.settings import ServerSettings
+from shared.schemas.actions import FILE_CHUNK_SIZE
+from shared.schemas.notifications import FileCreditNotificationFrame, FileCreditNotificationPayload, \
+    FileEndNotificationFrame, FileEndNotificationPayload
+from shared.schemas.types import TransferId, UserId
+
+
+class TransferError(Exception):
+    pass
+
+
+class Transfer:
+    __slots__ = ('id', 'sender', 'recipients', 'chunks', 'sent', 'granted')
+
+    def __init__(self, transfer_id: TransferId, sender: Client, recipients: list[Client], chunks: int) -> None:
+        self.id = transfer_id
+        self.sender = sender
+        # the last chunk each recipient has acknowledged
+        self.recipients = {recipient: -1 for recipient in recipients}
+        self.chunks = chunks
+        self.sent = 0
+        self.granted = 0
+
+
+class TransferRelay:
+    """
+    Relays file chunks from a sender to its recipients without keeping the file.
+    The sender may only run `window` chunks ahead of the slowest recipient, so a transfer never holds more
+    than `window` chunks on the server whatever the size of the file.
+    """
+    _instance: Self | None = None
+
+    def __init__(self) -> None:
+        self._transfers: dict[TransferId, Transfer] = {}
+        self._window = 16
+        self._per_client = 4
+
+    def __new__(cls) -> 'TransferRelay':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def get_current(cls) -> Self:
+        if cls._instance is None:
+            return cls()
+        return cls._instance
+
+    def configure(self, settings: ServerSettings) -> Self:
+        self._window = settings.transfer_window
+        self._per_client = settings.transfers_per_client
+        ClientManager.get_current().add_listener(self)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._transfers)
+
+    def in_flight(self) -> int:
+        """Chunks relayed but not yet acknowledged by every recipient, summed over all transfers."""
+        return sum(transfer.sent - 1 - min(transfer.recipients.values()) for transfer in self._transfers.values())
+
+    def offer(self, transfer_id: TransferId, sender: Client, recipients: list[Client], size: int) -> Transfer:
+        if transfer_id in self._transfers:
+            raise TransferError(f"Transfer '{transfer_id}' already exists")
+        if sum(transfer.sender is sender for transfer in self._transfers.values()) >= self._per_client:
+            raise TransferError(f"You can't run more than {self._per_client} transfers at once")
+        transfer = self._transfers[transfer_id] = Transfer(
+            transfer_id, sender, recipients, math.ceil(size / FILE_CHUNK_SIZE),
+        )
+        self._grant(transfer)
+        return transfer
+
+    def relay(self, client: Client, transfer_id: TransferId, seq: int, data: bytes) -> None:
+        transfer = self._transfers.get(transfer_id)
+        if transfer is None:
+            # chunks that were already on the wire when the transfer got cancelled
+            return
+        if transfer.sender is not client:
+            raise TransferError(f"You are not sending '{transfer_id}'")
+        if seq != transfer.sent or seq >= transfer.granted or seq >= transfer.chunks:
+            self.cancel(transfer)
+            raise TransferError(f"Chunk {seq} of '{transfer_id}' is out of order or beyond the granted credit")
+        transfer.sent += 1
+        for recipient in transfer.recipients:
+            recipient.enqueue(data, credited=True)
+
+    def acknowledge(self, client: Client, transfer_id: TransferId, seq: int) -> None:
+        transfer = self._transfers.get(transfer_id)
+        if transfer is None or client not in transfer.recipients:
+            return
+        transfer.recipients[client] = max(transfer.recipients[client], min(seq, transfer.sent - 1))
+        self._grant(transfer)
+
+    def end(self, client: Client, transfer_id: TransferId, cancelled: bool) -> None:
+        transfer = self._transfers.get(transfer_id)
+        if transfer is None:
+            return
+        if client is transfer.sender:
+            if not cancelled and transfer.sent < transfer.chunks:
+                self.cancel(transfer)
+                raise TransferError(f"'{transfer_id}' ended after {transfer.sent} of {transfer.chunks} chunks")
+            self._finish(transfer, cancelled)
+        elif client in transfer.recipients:
+            self._drop_recipient(transfer, client)
+
+    def cancel(self, transfer: Transfer) -> None:
+        transfer.sender.enqueue(self._end_frame(transfer.id, True))
+        self._finish(transfer, True)
+
+    def on_connect(self, client: Client) -> None:
+        pass
+
+    def on_disconnect(self, client: Client) -> None:
+        for transfer in list(self._transfers.values()):
+            if transfer.sender is client:
+                self._finish(transfer, True)
+            elif client in transfer.recipients:
+                self._drop_recipient(transfer, client)
+
+    def on_rename(self, client: Client, old_id: UserId) -> None:
+        pass
+
+    def _drop_recipient(self, transfer: Transfer, client: Client) -> None:
+        del transfer.recipients[client]
+        if transfer.recipients:
+            self._grant(transfer)
+        else:
+            self.cancel(transfer)
+
+    def _finish(self, transfer: Transfer, cancelled: bool) -> None:
+        del self._transfers[transfer.id]
+        data = self._end_frame(transfer.id, cancelled)
+        for recipient in transfer.recipients:
+            recipient.enqueue(data)
+
+    def _grant(self, transfer: Transfer) -> None:
+        granted = min(transfer.chunks, min(transfer.recipients.values()) + 1 + self._window)
+        if granted <= transfer.granted:
+            return
+        payload = FileCreditNotificationPayload(transfer_id=transfer.id, chunks=granted - transfer.granted)
+        transfer.sender.enqueue(Client.encode(FileCreditNotificationFrame(payload=payload)))
+        transfer.granted = granted
+
+    @staticmethod
+    def _end_frame(transfer_id: TransferId, cancelled: bool) -> bytes:
+        return Client.encode(FileEndNotificationFrame(payload=FileEndNotificationPayload(
+            transfer_id=transfer_id, cancelled=cancelled,
+        )))
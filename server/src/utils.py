@@ -1,11 +1,68 @@
-from typing import Generator
+from array import array
+from typing import Sequence
 
+from shared.schemas.types import UserId
 
-def usernames_generator() -> Generator[str, None, None]:
-    usernames = {
-        'Gandalf', 'Frodo', 'Aragorn', 'Legolas', 'Gimli', 'Boromir', 'Samwise',
-        'Meriadoc', 'Peregrin', 'Saruman', 'Gollum', 'Sauron', 'Bilbo', 'Galadriel'
-    }
-    while usernames:
-        yield usernames.pop()
+USERNAMES = (
+    'Gandalf', 'Frodo', 'Aragorn', 'Legolas', 'Gimli', 'Boromir', 'Samwise',
+    'Meriadoc', 'Peregrin', 'Saruman', 'Gollum', 'Sauron', 'Bilbo', 'Galadriel'
+)
 
+
+class UserIdAllocator:
+    """
+    Maps user ids (Frodo, Frodo1, ...) to integer slots recycled through a free-list and a bitmap.
+    Allocators of different workers share the id space by taking every `stride`-th slot starting at `offset`.
+    """
+    __slots__ = ('_names', '_indexes', '_offset', '_stride', '_free', '_in_use', '_next')
+
+    def __init__(self, names: Sequence[str] = USERNAMES, offset: int = 0, stride: int = 1) -> None:
+        self._names = tuple(names)
+        self._indexes = {name: index for index, name in enumerate(self._names)}
+        self._offset = offset
+        self._stride = stride
+        self._free = array('Q')
+        self._in_use = bytearray()
+        self._next = 0
+
+    def __len__(self) -> int:
+        return self._next - len(self._free)
+
+    def acquire(self) -> UserId:
+        if self._free:
+            index = self._free.pop()
+        else:
+            index = self._next
+            self._next += 1
+            if index >> 3 >= len(self._in_use):
+                self._in_use.extend(bytes(len(self._in_use) or 64))
+        self._in_use[index >> 3] |= 1 << (index & 7)
+        return self._user_id(index * self._stride + self._offset)
+
+    def release(self, user_id: UserId) -> None:
+        slot = self._slot(user_id)
+        if slot is None or slot < self._offset:
+            return
+        index, remainder = divmod(slot - self._offset, self._stride)
+        if remainder or index >= self._next or not self._in_use[index >> 3] & (1 << (index & 7)):
+            return
+        self._in_use[index >> 3] &= ~(1 << (index & 7))
+        self._free.append(index)
+
+    def is_reserved(self, user_id: str) -> bool:
+        return self._slot(user_id) is not None
+
+    def _user_id(self, slot: int) -> UserId:
+        round_number, index = divmod(slot, len(self._names))
+        name = self._names[index]
+        return UserId(f'{name}{round_number}' if round_number else name)
+
+    def _slot(self, user_id: str) -> int | None:
+        name = user_id.rstrip('0123456789')
+        index = self._indexes.get(name)
+        if index is None:
+            return None
+        digits = user_id[len(name):]
+        if digits.startswith('0'):
+            return None
+        return int(digits or 0) * len(self._names) + index
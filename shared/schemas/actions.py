@@ -1,9 +1,14 @@
+import math
 from enum import StrEnum
-from typing import Literal, Union
+from typing import Annotated, Literal, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
-from shared.schemas.types import UserId
+from shared.schemas.types import ChannelName, SessionToken, TransferId, UserId
+
+# a chunk and its base64 stay well below the 64 KiB line limit of line framing
+FILE_CHUNK_SIZE = 32 * 1024
+ENCODED_FILE_CHUNK_SIZE = 4 * math.ceil(FILE_CHUNK_SIZE / 3)
 
 
 class ActionTypes(StrEnum):
@@ -11,6 +16,21 @@ class ActionTypes(StrEnum):
     BROADCAST_MESSAGE = 'broadcast-message'
     HELP = 'help'
     LOGOUT = 'logout'
+    HISTORY = 'history'
+    CANCEL = 'cancel'
+    JOIN_CHANNEL = 'join-channel'
+    LEAVE_CHANNEL = 'leave-channel'
+    CHANNEL_MESSAGE = 'channel-message'
+    STATS = 'stats'
+    REPORT = 'report'
+    PONG = 'pong'
+    RENAME = 'rename'
+    USERS = 'users'
+    FILE_OFFER = 'file-offer'
+    FILE_CHUNK = 'file-chunk'
+    FILE_ACK = 'file-ack'
+    FILE_END = 'file-end'
+    RESUME = 'resume'
 
 
 class ActionFrame(BaseModel):
@@ -21,6 +41,7 @@ class ActionFrame(BaseModel):
 class SendMessagePayload(BaseModel):
     text: str
     to: UserId
+    delay: float | None = Field(None, gt=0)
 
 
 class SendMessageActionFrame(ActionFrame):
@@ -30,8 +51,177 @@ class SendMessageActionFrame(ActionFrame):
 
 class BroadcastMessagePayload(BaseModel):
     text: str
+    delay: float | None = Field(None, gt=0)
 
 
 class BroadcastMessageActionFrame(ActionFrame):
     type: Literal[ActionTypes.BROADCAST_MESSAGE] = ActionTypes.BROADCAST_MESSAGE
     payload: BroadcastMessagePayload
+
+
+class HistoryPayload(BaseModel):
+    limit: int = Field(20, gt=0)
+    since: int | None = None
+
+
+class HistoryActionFrame(ActionFrame):
+    type: Literal[ActionTypes.HISTORY] = ActionTypes.HISTORY
+    payload: HistoryPayload = HistoryPayload()
+
+
+class HelpActionFrame(ActionFrame):
+    type: Literal[ActionTypes.HELP] = ActionTypes.HELP
+    payload: None = None
+
+
+class LogoutActionFrame(ActionFrame):
+    type: Literal[ActionTypes.LOGOUT] = ActionTypes.LOGOUT
+    payload: None = None
+
+
+class CancelActionFrame(ActionFrame):
+    type: Literal[ActionTypes.CANCEL] = ActionTypes.CANCEL
+    payload: None = None
+
+
+class ChannelPayload(BaseModel):
+    channel: ChannelName = Field(min_length=1, max_length=32, pattern=r'^[\w-]+$')
+
+
+class JoinChannelActionFrame(ActionFrame):
+    type: Literal[ActionTypes.JOIN_CHANNEL] = ActionTypes.JOIN_CHANNEL
+    payload: ChannelPayload
+
+
+class LeaveChannelActionFrame(ActionFrame):
+    type: Literal[ActionTypes.LEAVE_CHANNEL] = ActionTypes.LEAVE_CHANNEL
+    payload: ChannelPayload
+
+
+class ChannelMessagePayload(ChannelPayload):
+    text: str
+    delay: float | None = Field(None, gt=0)
+
+
+class ChannelMessageActionFrame(ActionFrame):
+    type: Literal[ActionTypes.CHANNEL_MESSAGE] = ActionTypes.CHANNEL_MESSAGE
+    payload: ChannelMessagePayload
+
+
+class StatsActionFrame(ActionFrame):
+    type: Literal[ActionTypes.STATS] = ActionTypes.STATS
+    payload: None = None
+
+
+class ReportPayload(BaseModel):
+    username: UserId
+
+
+class ReportActionFrame(ActionFrame):
+    type: Literal[ActionTypes.REPORT] = ActionTypes.REPORT
+    payload: ReportPayload
+
+
+class PongActionFrame(ActionFrame):
+    type: Literal[ActionTypes.PONG] = ActionTypes.PONG
+    payload: None = None
+
+
+class RenamePayload(BaseModel):
+    username: UserId = Field(min_length=1, max_length=32, pattern=r'^[\w-]+$')
+
+
+class RenameActionFrame(ActionFrame):
+    type: Literal[ActionTypes.RENAME] = ActionTypes.RENAME
+    payload: RenamePayload
+
+
+class UsersPayload(BaseModel):
+    subscribe: bool = True
+
+
+class UsersActionFrame(ActionFrame):
+    type: Literal[ActionTypes.USERS] = ActionTypes.USERS
+    payload: UsersPayload = UsersPayload()
+
+
+class FileOfferPayload(BaseModel):
+    transfer_id: TransferId = Field(min_length=1, max_length=64, pattern=r'^[\w-]+$')
+    name: str = Field(min_length=1, max_length=255)
+    size: int = Field(ge=0)
+    to: list[UserId] = Field(min_length=1, max_length=16)
+
+
+class FileOfferActionFrame(ActionFrame):
+    type: Literal[ActionTypes.FILE_OFFER] = ActionTypes.FILE_OFFER
+    payload: FileOfferPayload
+
+
+class FileChunkPayload(BaseModel):
+    transfer_id: TransferId
+    seq: int = Field(ge=0)
+    data: str = Field(max_length=ENCODED_FILE_CHUNK_SIZE)
+
+
+class FileChunkActionFrame(ActionFrame):
+    type: Literal[ActionTypes.FILE_CHUNK] = ActionTypes.FILE_CHUNK
+    payload: FileChunkPayload
+
+
+class FileAckPayload(BaseModel):
+    transfer_id: TransferId
+    seq: int = Field(ge=0)
+
+
+class FileAckActionFrame(ActionFrame):
+    type: Literal[ActionTypes.FILE_ACK] = ActionTypes.FILE_ACK
+    payload: FileAckPayload
+
+
+class FileEndPayload(BaseModel):
+    transfer_id: TransferId
+    cancelled: bool = False
+
+
+class FileEndActionFrame(ActionFrame):
+    type: Literal[ActionTypes.FILE_END] = ActionTypes.FILE_END
+    payload: FileEndPayload
+
+
+class ResumePayload(BaseModel):
+    token: SessionToken = Field(max_length=64)
+    # the highest `seq` the client has seen, only messages after it are replayed
+    last_seq: int = Field(0, ge=0)
+
+
+class ResumeActionFrame(ActionFrame):
+    type: Literal[ActionTypes.RESUME] = ActionTypes.RESUME
+    payload: ResumePayload
+
+
+AnyActionFrame = Annotated[
+    Union[
+        SendMessageActionFrame,
+        BroadcastMessageActionFrame,
+        HistoryActionFrame,
+        HelpActionFrame,
+        LogoutActionFrame,
+        CancelActionFrame,
+        JoinChannelActionFrame,
+        LeaveChannelActionFrame,
+        ChannelMessageActionFrame,
+        StatsActionFrame,
+        ReportActionFrame,
+        PongActionFrame,
+        RenameActionFrame,
+        UsersActionFrame,
+        FileOfferActionFrame,
+        FileChunkActionFrame,
+        FileAckActionFrame,
+        FileEndActionFrame,
+        ResumeActionFrame,
+    ],
+    Field(discriminator='type'),
+]
+
+action_frame_adapter: TypeAdapter[AnyActionFrame] = TypeAdapter(AnyActionFrame)
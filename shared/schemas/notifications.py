@@ -1,21 +1,38 @@
 import datetime as dt
 from enum import StrEnum
-from typing import Literal
+from typing import Annotated, Literal, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
-from shared.schemas.types import UserId
+from shared.schemas.types import ChannelName, SessionToken, TransferId, UserId
 
 
 class NotificationTypes(StrEnum):
     PRIVATE_MESSAGE = 'private-message'
     BROADCAST_MESSAGE = 'broadcast-message'
+    CHANNEL_MESSAGE = 'channel-message'
+    STATS = 'stats'
+    PING = 'ping'
     ERROR = 'error'
+    USERS = 'users'
+    PRESENCE = 'presence'
+    FILE_OFFER = 'file-offer'
+    FILE_CHUNK = 'file-chunk'
+    FILE_END = 'file-end'
+    FILE_CREDIT = 'file-credit'
+    SESSION = 'session'
+
+
+class PresenceEvents(StrEnum):
+    JOIN = 'join'
+    LEAVE = 'leave'
+    RENAME = 'rename'
 
 
 class NotificationFrame(BaseModel):
     type: NotificationTypes
     payload: dict | None = None
+    seq: int | None = None
 
 
 class PrivateMessageNotificationPayload(BaseModel):
@@ -41,6 +58,40 @@ class BroadcastMessageNotificationFrame(NotificationFrame):
     payload: BroadcastMessageNotificationPayload
 
 
+class ChannelMessageNotificationPayload(BaseModel):
+    text: str
+    sender: UserId
+    channel: ChannelName
+    created_at: dt.datetime
+
+
+class ChannelMessageNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.CHANNEL_MESSAGE] = NotificationTypes.CHANNEL_MESSAGE
+    payload: ChannelMessageNotificationPayload
+
+
+class StatsNotificationPayload(BaseModel):
+    clients: int
+    outbound_queue_depth: int
+    frames_in: int
+    frames_out: int
+    bytes_in: int
+    bytes_out: int
+    loop_lag_p99: float
+    handler_latency_p99: dict[str, float]
+    created_at: dt.datetime
+
+
+class StatsNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.STATS] = NotificationTypes.STATS
+    payload: StatsNotificationPayload
+
+
+class PingNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.PING] = NotificationTypes.PING
+    payload: None = None
+
+
 class ErrorNotificationPayload(BaseModel):
     text: str
     created_at: dt.datetime
@@ -49,3 +100,108 @@ class ErrorNotificationPayload(BaseModel):
 class ErrorNotificationFrame(NotificationFrame):
     type: Literal[NotificationTypes.ERROR] = NotificationTypes.ERROR
     payload: ErrorNotificationPayload
+
+
+class UsersNotificationPayload(BaseModel):
+    version: int
+    users: list[UserId]
+
+
+class UsersNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.USERS] = NotificationTypes.USERS
+    payload: UsersNotificationPayload
+
+
+class PresenceChange(BaseModel):
+    event: PresenceEvents
+    username: UserId
+    previous: UserId | None = None
+
+
+class PresenceNotificationPayload(BaseModel):
+    # roster version after the last change, the changes before it have the versions right below
+    version: int
+    changes: list[PresenceChange]
+
+
+class PresenceNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.PRESENCE] = NotificationTypes.PRESENCE
+    payload: PresenceNotificationPayload
+
+
+class FileOfferNotificationPayload(BaseModel):
+    transfer_id: TransferId
+    sender: UserId
+    name: str
+    size: int
+
+
+class FileOfferNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.FILE_OFFER] = NotificationTypes.FILE_OFFER
+    payload: FileOfferNotificationPayload
+
+
+class FileChunkNotificationPayload(BaseModel):
+    transfer_id: TransferId
+    seq: int
+    data: str
+
+
+class FileChunkNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.FILE_CHUNK] = NotificationTypes.FILE_CHUNK
+    payload: FileChunkNotificationPayload
+
+
+class FileEndNotificationPayload(BaseModel):
+    transfer_id: TransferId
+    cancelled: bool = False
+
+
+class FileEndNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.FILE_END] = NotificationTypes.FILE_END
+    payload: FileEndNotificationPayload
+
+
+class FileCreditNotificationPayload(BaseModel):
+    transfer_id: TransferId
+    chunks: int
+
+
+class FileCreditNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.FILE_CREDIT] = NotificationTypes.FILE_CREDIT
+    payload: FileCreditNotificationPayload
+
+
+class SessionNotificationPayload(BaseModel):
+    # None when the server keeps no sessions
+    token: SessionToken | None
+    username: UserId
+    # how long the server keeps the session after the connection drops
+    grace: float
+
+
+class SessionNotificationFrame(NotificationFrame):
+    type: Literal[NotificationTypes.SESSION] = NotificationTypes.SESSION
+    payload: SessionNotificationPayload
+
+
+AnyNotificationFrame = Annotated[
+    Union[
+        PrivateMessageNotificationFrame,
+        BroadcastMessageNotificationFrame,
+        ChannelMessageNotificationFrame,
+        StatsNotificationFrame,
+        PingNotificationFrame,
+        ErrorNotificationFrame,
+        UsersNotificationFrame,
+        PresenceNotificationFrame,
+        FileOfferNotificationFrame,
+        FileChunkNotificationFrame,
+        FileEndNotificationFrame,
+        FileCreditNotificationFrame,
+        SessionNotificationFrame,
+    ],
+    Field(discriminator='type'),
+]
+
+notification_frame_adapter: TypeAdapter[AnyNotificationFrame] = TypeAdapter(AnyNotificationFrame)
@@ -1,3 +1,6 @@
 from typing import NewType
 
 UserId = NewType('UserId', str)
+ChannelName = NewType('ChannelName', str)
+TransferId = NewType('TransferId', str)
+SessionToken = NewType('SessionToken', str)
@@ -1,31 +1,273 @@
 import asyncio
+import struct
+import zlib
+from dataclasses import dataclass
+from enum import StrEnum
+
+from shared.schemas.actions import ActionTypes
+from shared.schemas.notifications import NotificationTypes
+
+HANDSHAKE_MAGIC = b"\x00CHT"
+HANDSHAKE_SIZE = len(HANDSHAKE_MAGIC) + 1
+FRAME_HEADER = struct.Struct("!I")
+DEFAULT_MAX_FRAME_SIZE = 1024 * 1024
+# the top bits of a length header mark compressed frames, no frame gets anywhere near that big
+STREAM_COMPRESSED = 1 << 31
+SHARED_COMPRESSED = 1 << 30
+SIZE_MASK = SHARED_COMPRESSED - 1
+DEFAULT_COMPRESSION_LEVEL = 6
+DEFAULT_COMPRESSION_THRESHOLD = 256
+WINDOW_BITS = -12
+MEMORY_LEVEL = 5
+PRESET_DICTIONARY = "".join((
+    *(f'{{"type":"{kind}","payload":' for kind in (*ActionTypes, *NotificationTypes)),
+    '{"text":"","sender":"","to":"","channel":"","delay":null,"created_at":"2026-01-01T00:00:00.000000Z"},"seq":null}',
+)).encode()
+
+
+class Framing(StrEnum):
+    LINE = 'line'
+    LENGTH = 'length'
+
+
+class TransportFlags:
+    LENGTH_FRAMING = 0b0000_0001
+    COMPRESSION = 0b0000_0010
+
+
+class FrameTooLargeError(ConnectionError):
+    pass
+
+
+def _compressor(level: int) -> 'zlib._Compress':
+    return zlib.compressobj(
+        level, zlib.DEFLATED, WINDOW_BITS, MEMORY_LEVEL, zlib.Z_DEFAULT_STRATEGY, PRESET_DICTIONARY,
+    )
+
+
+def _decompressor() -> 'zlib._Decompress':
+    return zlib.decompressobj(WINDOW_BITS, PRESET_DICTIONARY)
+
+
+class SharedFrames:
+    """Frames fanned out to many connections, compressed once by whichever connection sends one first."""
+
+    def __init__(self, capacity: int = 256) -> None:
+        self._capacity = capacity
+        self._frames: dict[bytes, bytes | None] = {}
+
+    def share(self, raw_data: bytes) -> None:
+        if raw_data in self._frames:
+            return
+        if len(self._frames) >= self._capacity:
+            del self._frames[next(iter(self._frames))]
+        self._frames[raw_data] = None
+
+    def compressed(self, raw_data: bytes, level: int) -> bytes | None:
+        """A self-contained deflate stream of a shared frame, None if the frame isn't shared."""
+        if raw_data not in self._frames:
+            return None
+        data = self._frames[raw_data]
+        if data is None:
+            compressor = _compressor(level)
+            data = self._frames[raw_data] = compressor.compress(raw_data) + compressor.flush()
+        return data
+
+
+shared_frames = SharedFrames()
+
+
+@dataclass(slots=True)
+class TransportStats:
+    frames_in: int = 0
+    frames_out: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
 
 
 class DataTransport:
-    def __init__(self, writer: asyncio.StreamWriter, reader: asyncio.StreamReader) -> None:
+    __slots__ = (
+        '_writer', '_reader', '_address', '_port', '_framing', '_max_frame_size', '_prefix', '_stats',
+        '_compression_level', '_compression_threshold', '_compressing', '_compressor', '_decompressor',
+    )
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        reader: asyncio.StreamReader,
+        max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    ) -> None:
         self._writer = writer
         self._reader = reader
         self._address, self._port = writer.get_extra_info("peername")
+        self._framing = Framing.LINE
+        self._max_frame_size = max_frame_size
+        self._prefix = b""
+        self._stats = TransportStats()
+        self._compression_level = compression_level
+        self._compression_threshold = compression_threshold
+        self._compressing = False
+        # both contexts are created on first use, many connections never see a frame above the threshold
+        self._compressor: zlib._Compress | None = None
+        self._decompressor: zlib._Decompress | None = None
     
     @staticmethod
     def _pack(data: str) -> bytes:
         return data.encode() + b"\n"
-    
-    @staticmethod
-    def _unpack(data: bytes) -> str:
-        return data.decode().strip()
+
+    @property
+    def framing(self) -> Framing:
+        return self._framing
+
+    @property
+    def compressing(self) -> bool:
+        return self._compressing
+
+    @property
+    def stats(self) -> TransportStats:
+        return self._stats
+
+    @classmethod
+    def encode(cls, data: str) -> bytes:
+        return cls._pack(data)
+
+    async def negotiate(self, framing: Framing, compression: bool = False) -> None:
+        flags = TransportFlags.LENGTH_FRAMING if framing is Framing.LENGTH else 0
+        if compression:
+            flags |= TransportFlags.COMPRESSION
+        self._writer.write(HANDSHAKE_MAGIC + bytes((flags,)))
+        await self._writer.drain()
+        try:
+            reply = await self._reader.readexactly(HANDSHAKE_SIZE)
+        except asyncio.IncompleteReadError as error:
+            raise ConnectionError("Connection is closed") from error
+        if not reply.startswith(HANDSHAKE_MAGIC):
+            raise ConnectionError("Unexpected handshake reply")
+        self._apply_flags(reply[-1])
+
+    async def accept(self, timeout: float, supported_flags: int = TransportFlags.LENGTH_FRAMING) -> None:
+        try:
+            first_byte = await asyncio.wait_for(self._reader.readexactly(1), timeout)
+        except TimeoutError:
+            return
+        except asyncio.IncompleteReadError as error:
+            raise ConnectionError("Connection is closed") from error
+        if first_byte != HANDSHAKE_MAGIC[:1]:
+            self._prefix = first_byte
+            return
+
+        try:
+            request = first_byte + await self._reader.readexactly(HANDSHAKE_SIZE - 1)
+        except asyncio.IncompleteReadError as error:
+            raise ConnectionError("Connection is closed") from error
+        if not request.startswith(HANDSHAKE_MAGIC):
+            raise ConnectionError("Malformed handshake")
+        flags = request[-1] & supported_flags
+        if not flags & TransportFlags.LENGTH_FRAMING:
+            # compressed frames are binary, a line based stream can't carry them
+            flags &= ~TransportFlags.COMPRESSION
+        self._writer.write(HANDSHAKE_MAGIC + bytes((flags,)))
+        await self._writer.drain()
+        self._apply_flags(flags)
+
+    def _apply_flags(self, flags: int) -> None:
+        self._framing = Framing.LENGTH if flags & TransportFlags.LENGTH_FRAMING else Framing.LINE
+        self._compressing = self._framing is Framing.LENGTH and bool(flags & TransportFlags.COMPRESSION)
+
+    def _compress(self, raw_data: bytes) -> tuple[int, bytes]:
+        """Header flag and the bytes to put on the wire for a frame."""
+        if len(raw_data) < self._compression_threshold:
+            return 0, raw_data
+        data = shared_frames.compressed(raw_data, self._compression_level)
+        if data is not None:
+            return SHARED_COMPRESSED, data
+        if self._compressor is None:
+            self._compressor = _compressor(self._compression_level)
+        return STREAM_COMPRESSED, self._compressor.compress(raw_data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def _decompress(self, flags: int, data: bytes) -> bytes:
+        if not self._compressing or flags not in (STREAM_COMPRESSED, SHARED_COMPRESSED):
+            raise ConnectionError("Unexpected compressed frame")
+        if flags == SHARED_COMPRESSED:
+            decompressor = _decompressor()
+        elif self._decompressor is None:
+            decompressor = self._decompressor = _decompressor()
+        else:
+            decompressor = self._decompressor
+        try:
+            raw_data = decompressor.decompress(data, self._max_frame_size + 1)
+        except zlib.error as error:
+            raise ConnectionError("Malformed compressed frame") from error
+        if len(raw_data) > self._max_frame_size or decompressor.unconsumed_tail:
+            raise FrameTooLargeError(f"Frame inflates beyond the limit of {self._max_frame_size} bytes")
+        return raw_data
     
     async def transfer(self, data: str) -> None:
-        raw_data = self._pack(data)
-        self._writer.write(raw_data)
+        await self.transfer_encoded(self._pack(data))
+
+    async def transfer_encoded(self, raw_data: bytes) -> None:
+        if self._framing is Framing.LENGTH:
+            flag, data = self._compress(raw_data) if self._compressing else (0, raw_data)
+            # one write per frame, since 3.12 writelines() defers the send to the next loop iteration
+            self._writer.write(FRAME_HEADER.pack(len(data) | flag) + data)
+            self._stats.bytes_out += FRAME_HEADER.size + len(data)
+        else:
+            self._writer.write(raw_data)
+            self._stats.bytes_out += len(raw_data)
+        self._stats.frames_out += 1
+        await self._writer.drain()
+
+    async def transfer_encoded_many(self, frames: list[bytes]) -> None:
+        if self._framing is Framing.LENGTH:
+            chunks = []
+            for raw_data in frames:
+                flag, data = self._compress(raw_data) if self._compressing else (0, raw_data)
+                chunks.append(FRAME_HEADER.pack(len(data) | flag))
+                chunks.append(data)
+            data = b''.join(chunks)
+        else:
+            data = b''.join(frames)
+        self._writer.write(data)
+        self._stats.bytes_out += len(data)
+        self._stats.frames_out += len(frames)
         await self._writer.drain()
     
-    async def receive(self) -> str:
-        raw_data = await self._reader.readline()
+    async def receive(self) -> bytes:
+        if self._framing is Framing.LENGTH:
+            return await self._receive_length_prefixed()
+
+        try:
+            raw_data = await self._reader.readline()
+        except ValueError as error:
+            # a line longer than the reader limit, the stream can't be resynchronised after it
+            raise FrameTooLargeError("Line exceeds the reader limit") from error
         if not raw_data:
             raise ConnectionError("Connection is closed")
-        return self._unpack(raw_data)
-    
+        if self._prefix:
+            raw_data, self._prefix = self._prefix + raw_data, b""
+        self._stats.frames_in += 1
+        self._stats.bytes_in += len(raw_data)
+        return raw_data
+
+    async def _receive_length_prefixed(self) -> bytes:
+        try:
+            header = await self._reader.readexactly(FRAME_HEADER.size)
+            size, = FRAME_HEADER.unpack(header)
+            flags, size = size & ~SIZE_MASK, size & SIZE_MASK
+            if size > self._max_frame_size:
+                raise FrameTooLargeError(f"Frame of {size} bytes exceeds the limit of {self._max_frame_size} bytes")
+            raw_data = await self._reader.readexactly(size)
+        except asyncio.IncompleteReadError as error:
+            raise ConnectionError("Connection is closed") from error
+        self._stats.frames_in += 1
+        self._stats.bytes_in += FRAME_HEADER.size + size
+        return self._decompress(flags, raw_data) if flags else raw_data
+
+    def abort(self) -> None:
+        self._writer.transport.abort()
+
     async def close(self) -> None:
         self._writer.close()
         await self._writer.wait_closed()
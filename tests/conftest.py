@@ -0,0 +1,26 @@
+import pytest
+
+from server.src.metrics import Metrics
+from server.src.models.client import ClientManager
+from server.src.models.history import HistoryStore
+from server.src.models.journal import Journal
+from server.src.models.mailbox import Mailbox
+from server.src.services.scheduler import Scheduler
+from server.src.settings import ServerSettings
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons():
+    services = (ClientManager, HistoryStore, Journal, Mailbox, Metrics, Scheduler)
+    for service in services:
+        service._instance = None
+    yield
+    for service in services:
+        service._instance = None
+
+
+@pytest.fixture
+def make_settings():
+    def make(**values) -> ServerSettings:
+        return ServerSettings(SERVER_HOST='127.0.0.1', SERVER_PORT=0, **values)
+    return make
@@ -0,0 +1,19 @@
+import pytest
+
+from server.src.admission import DEFAULT_BUCKET, sniff_action
+
+
+@pytest.mark.parametrize(('data', 'action'), [
+    (b'{"type":"send-message","payload":{"text":"hi"}}', b'send-message'),
+    (b' { "type" : "history" , "payload": {}}', b'history'),
+    (b'{"payload":{"type":"help"},"type":"stats"}', DEFAULT_BUCKET),
+    (b'{"typed":"help"}', DEFAULT_BUCKET),
+    (b'["type","help"]', DEFAULT_BUCKET),
+    (b'{"type":"help', DEFAULT_BUCKET),
+    (b'{"type" "help"}', DEFAULT_BUCKET),
+    (b'{"type":', DEFAULT_BUCKET),
+    (b'', DEFAULT_BUCKET),
+    (b'not json', DEFAULT_BUCKET),
+])
+def test_sniff_action(data, action):
+    assert sniff_action(data) == action
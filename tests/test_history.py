@@ -0,0 +1,42 @@
+from server.src.models.history import GENERAL_CHANNEL, HistoryStore, RingBuffer
+
+
+def fill(buffer: RingBuffer, seqs: range) -> None:
+    for seq in seqs:
+        buffer.append(seq, b'frame-%d' % seq)
+
+
+def test_ring_buffer_keeps_the_last_capacity_entries_after_wrapping():
+    buffer = RingBuffer(4)
+    fill(buffer, range(1, 11))
+    assert len(buffer) == 4
+    assert list(buffer.last(10)) == [(seq, b'frame-%d' % seq) for seq in range(7, 11)]
+    assert [seq for seq, _ in buffer.last(2)] == [9, 10]
+
+
+def test_ring_buffer_since_before_and_after_wrapping():
+    buffer = RingBuffer(5)
+    fill(buffer, range(10, 40, 10))
+    assert [seq for seq, _ in buffer.since(0)] == [10, 20, 30]
+    assert [seq for seq, _ in buffer.since(15)] == [20, 30]
+    fill(buffer, range(40, 90, 10))
+    # the start now sits in the middle of the slots
+    assert [seq for seq, _ in buffer.since(0)] == [40, 50, 60, 70, 80]
+    for seq in (40, 45, 60, 79):
+        assert [entry for entry, _ in buffer.since(seq)] == [entry for entry in range(50, 90, 10) if entry > seq]
+    assert list(buffer.since(80)) == []
+
+
+def test_history_store_evicts_the_stalest_channel_but_not_general(make_settings):
+    history = HistoryStore().configure(make_settings(SERVER_HISTORY_SIZE=2, SERVER_HISTORY_CHANNELS=3))
+    history.restore(GENERAL_CHANNEL, [(1, b'g')])
+    history.restore('#a', [(2, b'a')])
+    history.restore('#b', [(3, b'b')])
+    # writing to #a makes #b the stalest channel
+    history.restore('#a', [(4, b'a')])
+    history.restore('#c', [(5, b'c')])
+    assert list(history.last('#b', 10)) == []
+    assert [seq for seq, _ in history.last('#a', 10)] == [2, 4]
+    assert list(history.last(GENERAL_CHANNEL, 10)) == [(1, b'g')]
+    history.forget('#a')
+    assert list(history.since('#a', 0)) == []
@@ -0,0 +1,96 @@
+import asyncio
+import os
+
+from server.src.metrics import Metrics
+from server.src.models.history import GENERAL_CHANNEL, HistoryStore
+from server.src.models.journal import Journal, SEGMENT_GLOB
+from shared.schemas.types import UserId
+
+
+def restart(settings) -> tuple[Journal, HistoryStore]:
+    """Journal and history of a freshly started process."""
+    HistoryStore._instance = None
+    Journal._instance = None
+    history = HistoryStore().configure(settings)
+    return Journal().configure(settings), history
+
+
+def frame(seq: int) -> bytes:
+    return b'{"text":"%d","seq":%d}\n' % (seq, seq)
+
+
+async def write_frames(journal: Journal, seqs: range, pause: float = 0.0) -> None:
+    await journal.start()
+    for seq in seqs:
+        journal.append_frame(seq, (GENERAL_CHANNEL,), frame(seq))
+        if pause:
+            await asyncio.sleep(pause)
+    await journal.stop()
+
+
+def test_replay_drops_a_record_torn_in_the_middle(tmp_path, make_settings):
+    settings = make_settings(SERVER_JOURNAL_DIR=tmp_path)
+    journal, _ = restart(settings)
+    asyncio.run(write_frames(journal, range(1, 6)))
+    segment, = tmp_path.glob(SEGMENT_GLOB)
+    os.truncate(segment, segment.stat().st_size - 7)
+
+    journal, history = restart(settings)
+    asyncio.run(write_frames(journal, range(5, 7)))
+    assert [seq for seq, _ in history.last(GENERAL_CHANNEL, 10)] == [1, 2, 3, 4]
+    assert history.last_seq == 4
+
+    # the torn bytes were cut off before writing on, the records after them are readable
+    journal, history = restart(settings)
+    asyncio.run(write_frames(journal, range(0)))
+    assert list(history.last(GENERAL_CHANNEL, 10)) == [(seq, frame(seq)) for seq in range(1, 7)]
+
+
+def test_unsent_scheduled_messages_survive_segment_retention(tmp_path, make_settings):
+    settings = make_settings(
+        SERVER_JOURNAL_DIR=tmp_path, SERVER_JOURNAL_SEGMENT_SIZE=128, SERVER_JOURNAL_SEGMENTS=2,
+        SERVER_HISTORY_SIZE=3,
+    )
+    journal, _ = restart(settings)
+
+    async def run() -> None:
+        await journal.start()
+        kept = journal.schedule(100.0, UserId('Frodo'), b'kept')
+        sent = journal.schedule(50.0, UserId('Sam'), b'sent')
+        journal.complete(sent)
+        assert (kept, sent) == (1, 2)
+        await journal.stop()
+
+    asyncio.run(run())
+    first = sorted(tmp_path.glob(SEGMENT_GLOB))[0]
+    asyncio.run(write_frames(journal, range(1, 21), pause=0.005))
+    segments = sorted(tmp_path.glob(SEGMENT_GLOB))
+    assert first not in segments
+    assert len(segments) == 2
+
+    journal, history = restart(settings)
+    asyncio.run(write_frames(journal, range(0)))
+    pending, = journal.pending()
+    assert (pending.id, pending.when, pending.sender, pending.frame) == (1, 100.0, 'Frodo', b'kept')
+    assert [seq for seq, _ in history.last(GENERAL_CHANNEL, 10)] == [18, 19, 20]
+    # the carried message keeps its id, new ones are numbered after it
+    assert journal.schedule(1.0, UserId('Frodo'), b'next') == 2
+
+
+def test_a_failed_writer_stops_queueing_records(tmp_path, make_settings, monkeypatch):
+    def fail() -> None:
+        raise OSError('disk is gone')
+
+    journal, _ = restart(make_settings(SERVER_JOURNAL_DIR=tmp_path))
+    monkeypatch.setattr(journal, '_write_loop', fail)
+
+    async def run() -> None:
+        await journal.start()
+        await journal._task
+        journal.append_frame(1, (GENERAL_CHANNEL,), frame(1))
+        journal.complete(journal.schedule(1.0, UserId('Frodo'), b'lost'))
+        assert journal._records.empty()
+        await journal.stop()
+
+    asyncio.run(run())
+    assert 'chat_journal_failures_total 1\n' in Metrics.get_current().render()
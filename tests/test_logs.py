@@ -0,0 +1,32 @@
+import io
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from server.src.logs import DeferredQueueHandler
+
+
+def test_queued_records_keep_the_message_and_traceback_of_the_moment_they_were_logged():
+    records = queue.Queue()
+    stream = io.StringIO()
+    listener = QueueListener(records, logging.StreamHandler(stream))
+    logger = logging.getLogger('tests.logs')
+    logger.propagate = False
+    logger.addHandler(handler := DeferredQueueHandler(records))
+    try:
+        users = ['Frodo']
+        logger.warning('Online: %s', users)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception('Failed for %s', users)
+        users.append('Sam')
+        listener.start()
+        listener.stop()
+    finally:
+        logger.removeHandler(handler)
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "Online: ['Frodo']"
+    assert lines[1] == "Failed for ['Frodo']"
+    assert lines[2] == 'Traceback (most recent call last):'
+    assert lines[-1] == 'ValueError: boom'
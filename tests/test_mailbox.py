@@ -0,0 +1,20 @@
+from server.src.models.mailbox import Deposit, Mailbox
+
+
+def test_deposit_tells_an_oversized_message_from_full_mailboxes(make_settings):
+    mailbox = Mailbox().configure(make_settings(SERVER_MAILBOX_SIZE=10, SERVER_MAILBOX_TOTAL_SIZE=25))
+    assert mailbox.deposit('Frodo', b'x' * 11) is Deposit.TOO_LARGE
+    assert mailbox.deposit('Frodo', b'x' * 10) is Deposit.KEPT
+    assert mailbox.deposit('Sam', b'x' * 10) is Deposit.KEPT
+    assert mailbox.deposit('Gollum', b'x' * 6) is Deposit.FULL
+    assert mailbox.size == 20
+
+
+def test_a_full_user_mailbox_drops_its_oldest_messages(make_settings):
+    mailbox = Mailbox().configure(make_settings(SERVER_MAILBOX_SIZE=10))
+    for data in (b'aaaa', b'bbbb', b'cc', b'dddd'):
+        assert mailbox.deposit('Frodo', data) is Deposit.KEPT
+    assert mailbox._mailboxes['Frodo'].frames == [b'bbbb', b'cc', b'dddd']
+    assert mailbox.size == 10
+    mailbox.discard('Frodo')
+    assert mailbox.size == 0
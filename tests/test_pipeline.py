@@ -0,0 +1,70 @@
+import asyncio
+
+from server.src.pipeline import RequestPipeline
+
+
+def request(log: list[str], name: str, delay: float):
+    async def handle() -> None:
+        log.append(f'{name} started')
+        await asyncio.sleep(delay)
+        log.append(f'{name} done')
+    return handle
+
+
+def test_ordered_requests_run_one_after_another():
+    log = []
+
+    async def run() -> None:
+        pipeline = RequestPipeline(4)
+        await pipeline.submit(request(log, 'slow', 0.03))
+        await pipeline.submit(request(log, 'fast', 0.0))
+        await pipeline.drain()
+
+    asyncio.run(run())
+    assert log == ['slow started', 'slow done', 'fast started', 'fast done']
+
+
+def test_unordered_requests_overtake_ordered_ones():
+    log = []
+
+    async def run() -> None:
+        pipeline = RequestPipeline(4)
+        await pipeline.submit(request(log, 'slow', 0.03))
+        await pipeline.submit(request(log, 'help', 0.0), ordered=False)
+        await pipeline.submit(request(log, 'next', 0.0))
+        await pipeline.drain()
+
+    asyncio.run(run())
+    assert log.index('help done') < log.index('slow done') < log.index('next started')
+
+
+def test_submit_waits_while_the_window_is_full():
+    async def run() -> None:
+        pipeline = RequestPipeline(2)
+        release = asyncio.Event()
+        await pipeline.submit(release.wait)
+        await pipeline.submit(release.wait, ordered=False)
+        third = asyncio.ensure_future(pipeline.submit(release.wait))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        release.set()
+        await asyncio.wait_for(third, 1)
+        await pipeline.drain()
+
+    asyncio.run(run())
+
+
+def test_a_failed_request_does_not_block_the_next_one():
+    log = []
+
+    async def fail() -> None:
+        raise ValueError
+
+    async def run() -> None:
+        pipeline = RequestPipeline(1)
+        await pipeline.submit(fail)
+        await pipeline.submit(request(log, 'next', 0.0))
+        await pipeline.drain()
+
+    asyncio.run(run())
+    assert log == ['next started', 'next done']
@@ -0,0 +1,75 @@
+import asyncio
+
+from server.src.services.scheduler import Scheduler
+
+
+async def noop() -> None:
+    pass
+
+
+def test_cancelled_entries_stay_in_the_heap_until_half_of_it_is_cancelled():
+    async def run() -> None:
+        scheduler = Scheduler()
+        entries = [scheduler.schedule(60.0 + index, 'Frodo', noop) for index in range(6)]
+        assert scheduler.cancel(entries[0])
+        assert not scheduler.cancel(entries[0])
+        assert scheduler.cancel(entries[1])
+        assert scheduler.cancel(entries[2])
+        assert (len(scheduler), len(scheduler._heap)) == (3, 6)
+        scheduler.cancel(entries[3])
+        assert (len(scheduler), len(scheduler._heap)) == (2, 2)
+
+    asyncio.run(run())
+
+
+def test_due_entries_come_out_in_order_without_the_cancelled_ones():
+    async def run() -> None:
+        scheduler = Scheduler()
+        late = scheduler.schedule(2.0, 'Frodo', noop)
+        early = scheduler.schedule(1.0, 'Sam', noop)
+        cancelled = scheduler.schedule(0.5, 'Sam', noop)
+        scheduler.schedule(60.0, 'Sam', noop)
+        scheduler.cancel(cancelled)
+        assert scheduler._pop_due(asyncio.get_running_loop().time() + 5) == [early, late]
+        assert len(scheduler) == len(scheduler._heap) == 1
+        assert scheduler.cancel_all('Frodo') == []
+
+    asyncio.run(run())
+
+
+def test_entries_follow_their_owner_to_a_new_name():
+    async def run() -> None:
+        scheduler = Scheduler()
+        first = scheduler.schedule(60.0, 'Gandalf', noop)
+        second = scheduler.schedule(60.0, 'Frodo', noop)
+        third = scheduler.schedule(60.0, 'Gandalf', noop)
+        scheduler.reassign('Gandalf', 'Frodo')
+        assert first.owner == third.owner == 'Frodo'
+        assert scheduler.cancel_last('Frodo') is third
+        assert scheduler.cancel_last('Frodo') is second
+        assert scheduler.cancel_last('Gandalf') is None
+        assert scheduler.cancel_all('Frodo') == [first]
+        assert len(scheduler) == 0
+
+    asyncio.run(run())
+
+
+def test_callbacks_fire_when_due():
+    fired = []
+
+    def record(delay: float):
+        async def callback() -> None:
+            fired.append(delay)
+        return callback
+
+    async def run() -> None:
+        scheduler = Scheduler()
+        await scheduler.start()
+        for delay in (0.03, 0.01, 0.02):
+            scheduler.schedule(delay, 'Frodo', record(delay))
+        scheduler.cancel(scheduler.schedule(0.015, 'Frodo', noop))
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert fired == [0.01, 0.02, 0.03]
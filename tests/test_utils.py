@@ -0,0 +1,61 @@
+import pytest
+
+from server.src.utils import UserIdAllocator
+
+
+def test_ids_are_handed_out_in_order_and_wrap_with_a_round_number():
+    allocator = UserIdAllocator(names=('Frodo', 'Sam'))
+    assert [allocator.acquire() for _ in range(5)] == ['Frodo', 'Sam', 'Frodo1', 'Sam1', 'Frodo2']
+    assert len(allocator) == 5
+
+
+def test_released_ids_are_reused_before_new_ones():
+    allocator = UserIdAllocator(names=('Frodo', 'Sam'))
+    for _ in range(4):
+        allocator.acquire()
+    allocator.release('Sam')
+    allocator.release('Frodo1')
+    assert len(allocator) == 2
+    assert allocator.acquire() == 'Frodo1'
+    assert allocator.acquire() == 'Sam'
+    assert allocator.acquire() == 'Frodo2'
+
+
+@pytest.mark.parametrize('user_id', ['Sam', 'Frodo9', 'Frodo01', 'Bilbo', 'frodo'])
+def test_releasing_an_id_that_is_not_in_use_changes_nothing(user_id):
+    allocator = UserIdAllocator(names=('Frodo', 'Sam'))
+    allocator.acquire()
+    allocator.release('Frodo')
+    allocator.release('Frodo')
+    allocator.release(user_id)
+    assert len(allocator) == 0
+    assert allocator.acquire() == 'Frodo'
+    assert allocator.acquire() == 'Sam'
+
+
+def test_bitmap_grows_past_its_first_block():
+    allocator = UserIdAllocator(names=('Frodo',))
+    ids = [allocator.acquire() for _ in range(1000)]
+    allocator.release(ids[777])
+    assert allocator.acquire() == ids[777]
+    assert allocator.acquire() == 'Frodo1000'
+
+
+def test_workers_share_the_id_space_without_overlapping():
+    workers = [UserIdAllocator(names=('Frodo', 'Sam'), offset=offset, stride=3) for offset in range(3)]
+    ids = [worker.acquire() for _ in range(4) for worker in workers]
+    assert len(set(ids)) == len(ids)
+    # an id of another worker is reserved everywhere but released only by its owner
+    assert workers[0].is_reserved('Sam')
+    workers[0].release('Sam')
+    assert len(workers[0]) == 4
+    workers[1].release('Sam')
+    assert workers[1].acquire() == 'Sam'
+
+
+def test_is_reserved():
+    allocator = UserIdAllocator(names=('Frodo', 'Sam'))
+    assert allocator.is_reserved('Frodo')
+    assert allocator.is_reserved('Sam42')
+    assert not allocator.is_reserved('Sam042')
+    assert not allocator.is_reserved('Gandalf')